@@ -0,0 +1,4 @@
+"""
+AI硬件分析项目 - 基准测试
+离线测量解析、清洗和验证的吞吐量与峰值内存，与保存的基线比较发现性能退化
+"""
@@ -0,0 +1,80 @@
+"""
+合成数据集 - 生成与爬虫输出结构一致的淘宝商品和小红书笔记记录，用于清洗和验证的基准测试
+"""
+
+import random
+from typing import Dict, List, Any
+
+BRANDS = ['小度', '天猫精灵', '小爱同学', '华为', 'Apple', '科大讯飞', '阿尔法蛋', '优必选']
+KINDS = ['智能音箱', 'AI学习机', '翻译笔', '陪伴机器人', '降噪耳机', '儿童早教机', 'AR眼镜']
+LOCATIONS = ['上海', '北京', '广东 深圳', '浙江 杭州', '江苏 苏州', '安徽 合肥']
+TOPICS = ['#AI陪伴#', '#智能音箱#', '#好物分享#', '#数码测评#', '#学习机推荐#']
+
+# 清洗前的原始取值，包含需要规范化的价格区间、万/千单位、HTML实体和多余空白
+PRICES = ['¥1,299.00', '199-299', '¥99.90', '¥2499.00', '399', '', None, '面议']
+SALES = ['1.2万+人付款', '1000+人付款', '356人收货', '8.5万+人付款', '', None]
+COUNTS = ['1.2万', '356', 128, '10w+', '1千', '0', None]
+
+
+def make_dataset(size: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    生成合成数据集
+
+    约60%为淘宝商品、40%为小红书笔记，约3%的记录标题过短或缺少内容，验证时判为无效。
+    相同的 size 和 seed 总是生成相同的数据。
+
+    Args:
+        size: 记录数
+        seed: 随机种子
+
+    Returns:
+        记录列表
+    """
+    rng = random.Random(seed)
+    names = [(brand, kind) for brand in BRANDS for kind in KINDS]
+    titles = [f'{brand}{kind} 官方正品 <b>{kind}</b> 人工智能语音控制' for brand, kind in names]
+    notes = [
+        f'入手{brand}{kind}一个月的真实感受，语音识别很灵敏&nbsp;孩子每天都在用。\n优点：响应快 {" ".join(rng.sample(TOPICS, 2))}'
+        for brand, kind in names
+    ]
+    shops = [f' {brand}官方旗舰店 ' for brand in BRANDS]
+
+    records = []
+    for i in range(size):
+        invalid = rng.random() < 0.03
+        if rng.random() < 0.6:
+            title = rng.choice(titles)
+            records.append({
+                'platform': '淘宝',
+                'title': 'AI' if invalid else title,
+                'content': title,
+                'price': rng.choice(PRICES),
+                'sales': rng.choice(SALES),
+                'shop_name': rng.choice(shops),
+                'location': rng.choice(LOCATIONS),
+                'likes': 0,
+                'comments_count': 0,
+                'shares': 0,
+                'source_url': f'https://item.taobao.com/item.htm?id={600000000000 + i}',
+                'publish_date': '2024-05-01',
+                'product_type': 'AI音箱',
+                'tags': ['AI音箱'],
+            })
+        else:
+            records.append({
+                'platform': '小红书',
+                'title': rng.choice(titles)[:20],
+                'content': '' if invalid else rng.choice(notes),
+                'price': 0,
+                'sales': 0,
+                'likes': rng.choice(COUNTS),
+                'comments_count': rng.choice(COUNTS),
+                'shares': rng.choice(COUNTS),
+                'source_url': f'https://www.xiaohongshu.com/explore/{i:024x}',
+                'publish_date': '2024-05-01',
+                'product_type': '陪伴机器人',
+                'tags': ['AI陪伴'],
+                'user_id': f'{rng.getrandbits(64):016x}',
+                'username': f'数码达人{i % 1000}',
+            })
+    return records
@@ -0,0 +1,305 @@
+"""
+基准测试 - 离线测量页面解析、数据清洗和验证的吞吐量（条/秒）与峰值内存
+
+页面解析使用 fixtures 目录中保存的搜索页（淘宝HTML、小红书API JSON和带初始状态的HTML），
+清洗和验证使用 benchmarks/datasets.py 生成的合成数据集，不访问网络。
+
+用法:
+    python benchmarks/run_benchmarks.py                      # 运行并与基线比较（只报告）
+    python benchmarks/run_benchmarks.py --save-baseline      # 运行并保存为基线
+    python benchmarks/run_benchmarks.py --check              # 有退化时以非零状态退出
+    python benchmarks/run_benchmarks.py --sizes 1000,100000 --filter clean_dataset
+"""
+
+import gc
+import sys
+import functools
+import json
+import time
+import logging
+import platform
+import tracemalloc
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Any, Callable, Iterator, Optional, Tuple
+import os
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import BENCHMARK_CONFIG
+from crawler.taobao_crawler import TaobaoCrawler
+from crawler.xiaohongshu_crawler import XiaoHongShuCrawler
+from crawler.data_validator import DataValidator
+from crawler.http_utils import build_response
+from benchmarks.datasets import make_dataset
+
+KEYWORD = '智能音箱'
+
+# (名称, 每次调用处理的条数, 被测函数)
+Benchmark = Tuple[str, int, Callable[[], Any]]
+
+
+def size_label(size: int) -> str:
+    """数据集规模的简写，如 1000 -> 1k，1000000 -> 1m"""
+    for unit, factor in (('m', 1_000_000), ('k', 1_000)):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{unit}"
+    return str(size)
+
+
+def load_fixture(name: str, url: str, content_type: str):
+    """
+    读取保存的页面，构建成抓取时得到的响应对象
+
+    Args:
+        name: fixtures 目录中的文件名
+        url: 响应URL
+        content_type: Content-Type 响应头
+
+    Returns:
+        requests.Response对象
+    """
+    content = (Path(BENCHMARK_CONFIG['fixtures_dir']) / name).read_bytes()
+    return build_response(url, 200, {'Content-Type': content_type}, content)
+
+
+def parser_benchmarks() -> Iterator[Benchmark]:
+    """页面解析基准：单条 parse_item 和整页 parse_search_page（含HTML/JSON解析）"""
+    taobao = TaobaoCrawler()
+    xiaohongshu = XiaoHongShuCrawler()
+    # 每页的INFO日志不计入解析耗时
+    for crawler in (taobao, xiaohongshu):
+        crawler.logger.setLevel(logging.WARNING)
+
+    taobao_page = load_fixture('taobao_search.html', 'https://s.taobao.com/search', 'text/html; charset=utf-8')
+    elements = taobao.extract_page_items(taobao_page)
+    yield 'taobao.parse_item', len(elements), lambda: [taobao.parse_item(element) for element in elements]
+    yield 'taobao.parse_search_page', len(elements), lambda: taobao.parse_search_page(taobao_page, KEYWORD, 1)
+
+    api_page = load_fixture('xiaohongshu_search.json', 'https://edith.xiaohongshu.com/api/sns/web/v1/search/notes',
+                            'application/json; charset=utf-8')
+    notes = xiaohongshu.extract_page_items(api_page)
+    yield 'xiaohongshu.parse_item', len(notes), lambda: [xiaohongshu.parse_item(note) for note in notes]
+    yield 'xiaohongshu.parse_search_page[json]', len(notes), \
+        lambda: xiaohongshu.parse_search_page(api_page, KEYWORD, 1)
+
+    html_page = load_fixture('xiaohongshu_search.html', 'https://www.xiaohongshu.com/search_result',
+                             'text/html; charset=utf-8')
+    feeds = xiaohongshu.extract_page_items(html_page)
+    yield 'xiaohongshu.parse_search_page[html]', len(feeds), \
+        lambda: xiaohongshu.parse_search_page(html_page, KEYWORD, 1)
+
+
+def dataset_benchmarks(sizes: List[int], selected: Callable[[str], bool]) -> Iterator[Benchmark]:
+    """清洗和验证基准：每个规模的合成数据集只在有选中的基准时生成"""
+    validator = DataValidator()
+    for size in sizes:
+        label = size_label(size)
+        names = [f'clean_dataset[{label}]', f'validate_dataset[{label}]']
+        if not any(map(selected, names)):
+            continue
+        data = make_dataset(size)
+        yield names[0], size, functools.partial(validator.clean_dataset, data)
+        yield names[1], size, functools.partial(validator.validate_dataset, data)
+
+
+def measure(func: Callable[[], Any], items: int, repeats: int, min_seconds: float,
+            trace_memory: bool = True) -> Dict[str, Any]:
+    """
+    测量吞吐量和峰值内存
+
+    每次测量循环调用至少 min_seconds 秒，取 repeats 次中最快的一次；
+    峰值内存在计时之外用 tracemalloc 单独调用一次测得，只统计调用期间新分配的内存。
+
+    Args:
+        func: 被测函数
+        items: 每次调用处理的条数
+        repeats: 重复测量次数
+        min_seconds: 每次测量至少运行的时间
+        trace_memory: 是否测量峰值内存
+
+    Returns:
+        {items, items_per_sec, seconds_per_call[, peak_memory_mb]}
+    """
+    best = float('inf')
+    for _ in range(max(1, repeats)):
+        calls = 0
+        started = time.perf_counter()
+        while True:
+            func()
+            calls += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_seconds:
+                break
+        best = min(best, elapsed / calls)
+
+    result = {
+        'items': items,
+        'items_per_sec': round(items / best, 1),
+        'seconds_per_call': round(best, 6),
+    }
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result['peak_memory_mb'] = round(peak / 1024 / 1024, 3)
+    return result
+
+
+def run_benchmarks(sizes: Optional[List[int]] = None, pattern: Optional[str] = None,
+                   repeats: Optional[int] = None, min_seconds: Optional[float] = None,
+                   trace_memory: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    运行基准测试
+
+    Args:
+        sizes: 合成数据集规模，默认使用 BENCHMARK_CONFIG['dataset_sizes']
+        pattern: 只运行名称包含该字符串的基准
+        repeats: 重复测量次数，默认使用 BENCHMARK_CONFIG['repeats']
+        min_seconds: 每次测量至少运行的时间，默认使用 BENCHMARK_CONFIG['min_seconds']
+        trace_memory: 是否测量峰值内存
+
+    Returns:
+        {基准名称: 测量结果}
+    """
+    sizes = sizes or BENCHMARK_CONFIG['dataset_sizes']
+    repeats = repeats or BENCHMARK_CONFIG['repeats']
+    min_seconds = min_seconds if min_seconds is not None else BENCHMARK_CONFIG['min_seconds']
+
+    def selected(name: str) -> bool:
+        return not pattern or pattern in name
+
+    results = {}
+    for benchmarks in (parser_benchmarks(), dataset_benchmarks(sizes, selected)):
+        for name, items, func in benchmarks:
+            if not selected(name):
+                continue
+            results[name] = measure(func, items, repeats, min_seconds, trace_memory)
+            peak = results[name].get('peak_memory_mb')
+            print(f"  {name:<40} {results[name]['items_per_sec']:>14,.0f} 条/秒"
+                  + (f"  峰值内存 {peak:>9.2f}MB" if peak is not None else ""), flush=True)
+    return results
+
+
+def compare_results(baseline: Dict[str, Dict[str, Any]], results: Dict[str, Dict[str, Any]],
+                    max_regression: Optional[float] = None, memory_floor_mb: Optional[float] = None) -> List[str]:
+    """
+    与基线比较，找出退化的基准
+
+    Args:
+        baseline: 基线结果
+        results: 本次结果
+        max_regression: 允许的退化比例，默认使用 BENCHMARK_CONFIG['max_regression']
+        memory_floor_mb: 峰值内存增加不足该值时忽略，默认使用 BENCHMARK_CONFIG['memory_floor_mb']
+
+    Returns:
+        退化说明列表，基线中没有的基准不参与比较
+    """
+    max_regression = max_regression if max_regression is not None else BENCHMARK_CONFIG['max_regression']
+    memory_floor_mb = memory_floor_mb if memory_floor_mb is not None else BENCHMARK_CONFIG['memory_floor_mb']
+
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        speed, base_speed = result['items_per_sec'], base['items_per_sec']
+        if speed < base_speed * (1 - max_regression):
+            regressions.append(f"{name}: 吞吐量 {base_speed:,.0f} -> {speed:,.0f} 条/秒 "
+                               f"({(speed / base_speed - 1) * 100:+.1f}%)")
+        peak, base_peak = result.get('peak_memory_mb'), base.get('peak_memory_mb')
+        if peak is not None and base_peak is not None:
+            if peak > base_peak * (1 + max_regression) and peak - base_peak >= memory_floor_mb:
+                regressions.append(f"{name}: 峰值内存 {base_peak:.2f} -> {peak:.2f}MB "
+                                   f"({(peak / base_peak - 1) * 100:+.1f}%)")
+    return regressions
+
+
+def load_baseline(path: Path) -> Dict[str, Dict[str, Any]]:
+    """读取基线结果，文件不存在时返回空字典"""
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('results', {})
+
+
+def save_results(path: Path, results: Dict[str, Dict[str, Any]], merge: bool = False):
+    """
+    保存结果及运行环境
+
+    Args:
+        path: 文件路径
+        results: 测量结果
+        merge: 是否合并进已有文件（只运行部分基准时保留其他基准的基线）
+    """
+    merged = dict(load_baseline(path)) if merge else {}
+    merged.update(results)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'machine': platform.machine(),
+                'processor': platform.processor(),
+            },
+            'results': merged,
+        }, f, ensure_ascii=False, indent=2)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    命令行入口
+
+    Returns:
+        退出状态：0 正常，1 有退化，2 要求检查但没有基线
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="解析、清洗和验证的离线基准测试")
+    parser.add_argument('--sizes', help='合成数据集规模，逗号分隔，如 1000,100000')
+    parser.add_argument('--filter', help='只运行名称包含该字符串的基准')
+    parser.add_argument('--repeats', type=int, help='重复测量次数，取最快一次')
+    parser.add_argument('--no-memory', action='store_true', help='不测量峰值内存（tracemalloc 会使运行变慢数倍）')
+    parser.add_argument('--baseline', type=Path, default=BENCHMARK_CONFIG['baseline_file'], help='基线文件路径')
+    parser.add_argument('--save-baseline', action='store_true', help='把本次结果保存为基线')
+    parser.add_argument('--check', action='store_true', help='与基线比较，有退化时以非零状态退出')
+    parser.add_argument('--output', type=Path, help='把本次结果另存为JSON文件')
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',')] if args.sizes else None
+    baseline = load_baseline(args.baseline)
+    if args.check and not baseline:
+        print(f"❌ 基线文件不存在或为空: {args.baseline}，请先运行 --save-baseline")
+        return 2
+
+    print(f"开始基准测试: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    results = run_benchmarks(sizes, args.filter, args.repeats, trace_memory=not args.no_memory)
+
+    if args.output:
+        save_results(args.output, results)
+    if args.save_baseline:
+        save_results(args.baseline, results, merge=True)
+        print(f"✅ 基线已保存到: {args.baseline}")
+        return 0
+    if not baseline:
+        return 0
+
+    regressions = compare_results(baseline, results)
+    compared = len([name for name in results if name in baseline])
+    if regressions:
+        print(f"❌ {len(regressions)} 项相对基线退化超过 {BENCHMARK_CONFIG['max_regression']:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1 if args.check else 0
+    print(f"✅ 与基线比较的 {compared} 项均未退化")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
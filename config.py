@@ -23,19 +23,27 @@ PLATFORMS = {
         'name': '小红书',
         'color': '#FF2442',  # 小红书品牌色
         'base_url': 'https://www.xiaohongshu.com',
-        'search_path': '/search_result'
+        'search_path': '/search_result',
+        'max_concurrency': 2,
+        'rate_limit': {'requests_per_second': 0.5, 'burst': 2, 'jitter': 1.0},
+        'cache_ttl': 3600           # 笔记流更新较快，缓存1小时
     },
     'douyin': {
         'name': '抖音',
         'color': '#000000',  # 抖音黑色
         'base_url': 'https://www.douyin.com',
-        'search_path': '/search'
+        'search_path': '/search',
+        'max_concurrency': 2,
+        'rate_limit': {'requests_per_second': 0.5, 'burst': 2, 'jitter': 1.0}
     },
     'taobao': {
         'name': '淘宝',
         'color': '#FF4400',  # 淘宝橙色
         'base_url': 'https://s.taobao.com',
-        'search_path': '/search'
+        'search_path': '/search',
+        'max_concurrency': 3,
+        'rate_limit': {'requests_per_second': 1.0, 'burst': 3, 'jitter': 0.5},
+        'cache_ttl': 6 * 3600       # 商品搜索结果变化较慢，缓存6小时
     }
 }
 
@@ -80,9 +88,28 @@ SENTIMENT_CONFIG = {
 
 # ========== 爬虫配置 ==========
 CRAWLER_CONFIG = {
-    'delay_range': (0.5, 3.0),  # 请求延时范围(秒)
-    'max_retries': 3,           # 最大重试次数
-    'timeout': 10,              # 请求超时时间(秒)
+    # 默认限速（令牌桶），平台可在 PLATFORMS[...]['rate_limit'] 中覆盖
+    # requests_per_second: 平均每秒请求数, burst: 允许的突发请求数, jitter: 随机抖动上限(秒)
+    'default_rate_limit': {'requests_per_second': 0.5, 'burst': 1, 'jitter': 1.0},
+    'max_retries': 3,           # 最大尝试次数
+    'retry': {
+        'retry_statuses': [429, 500, 502, 503, 504],  # 可重试状态码，其余4xx立即失败
+        'backoff_base': 1.0,    # 指数退避基数(秒)，实际等待在 [0, base*2^n] 内随机
+        'backoff_max': 30.0,    # 单次退避上限(秒)
+        'max_retry_after': 120, # 可接受的 Retry-After 上限(秒)，超过则暂停该主机
+    },
+    'circuit_breaker': {
+        'failure_threshold': 5, # 同一主机连续失败次数达到该值后熔断
+        'recovery_timeout': 60, # 熔断冷却时间(秒)，之后放行一个试探请求
+    },
+    'connect_timeout': 5,       # 建立连接超时(秒)
+    'read_timeout': 15,         # 读取响应超时(秒)
+    'deadlines': {              # 时间预算(秒)，None表示不限制；下级预算不会超过上级剩余时间
+        'request': 60,          # 单个请求（含所有重试）
+        'keyword': 600,         # 单个关键词的全部页面
+        'platform': 3 * 3600,   # 单个平台的全部关键词
+    },
+    'max_concurrency_per_host': 2,  # 异步爬取时单主机最大并发请求数
     'user_agents': [
         'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
         'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Edge/120.0.0.0 Safari/537.36',
@@ -90,6 +117,131 @@ CRAWLER_CONFIG = {
     ]
 }
 
+# ========== 响应缓存配置 ==========
+CACHE_CONFIG = {
+    'enabled': False,           # 开发调试时开启，避免重复请求相同页面
+    'path': PROJECT_ROOT / '.cache' / 'http_cache.sqlite3',
+    'max_size_mb': 512,         # 响应体总大小上限，超出后按最久未访问淘汰
+    'default_ttl': 3600,        # 默认有效期(秒)，平台可用 PLATFORMS[...]['cache_ttl'] 覆盖
+}
+
+# ========== 录制回放配置 ==========
+CASSETTE_CONFIG = {
+    'mode': None,               # None 正常请求；'record' 录制请求和响应；'replay' 只从回放库返回响应，不访问网络
+    'dir': RAW_DATA_DIR / 'cassettes',
+    'name': 'default',          # 回放库名称，对应 dir 下的 <name>.sqlite3
+    'latency': 'recorded',      # 回放时模拟的响应延迟：'recorded' 按录制时的耗时，数字为固定秒数，0 不等待
+    'latency_scale': 1.0,       # 按录制耗时模拟时的倍率
+    'replay_throttle': False,   # 回放时是否仍按平台限速等待
+}
+
+# ========== 爬取日志配置 ==========
+JOURNAL_CONFIG = {
+    'enabled': True,            # 逐页记录爬取结果，支持中断后恢复
+    'dir': RAW_DATA_DIR / 'journal',
+    'fsync': True,              # 每页写入后强制落盘
+}
+
+# ========== 响应归档配置 ==========
+ARCHIVE_CONFIG = {
+    'enabled': False,           # 开启后每个抓取到的搜索页原始响应都写入归档，可用当前解析器重新解析
+    'dir': RAW_DATA_DIR / 'archive',
+    'codec': 'zstd',            # zstd 需要安装 zstandard，未安装时使用 zlib
+    'level': 3,                 # 压缩级别
+    'segment_max_mb': 1024,     # 单个归档文件上限，超出后写入新文件
+}
+
+# ========== 去重配置 ==========
+DEDUP_CONFIG = {
+    'enabled': True,            # 按商品/笔记ID、规范化URL或内容哈希去掉跨关键词的重复数据
+    'persist': False,           # 保存去重索引，跨次爬取去重（之后的爬取只保留新出现的数据）
+    'dir': RAW_DATA_DIR / 'dedup',
+}
+
+# ========== 已采集库配置 ==========
+SEEN_STORE_CONFIG = {
+    'enabled': False,           # 增量爬取：跳过以往爬取中已采集的商品/笔记
+    'dir': RAW_DATA_DIR / 'seen',
+    'capacity': 5_000_000,      # 每个平台预计ID数，决定文件大小
+    'false_positive_rate': 0.001,  # 达到容量时误判为已采集的比例
+}
+
+# ========== 增量爬取配置 ==========
+INCREMENTAL_CONFIG = {
+    'enabled': False,           # 按上次的水位提前停止翻页，也可用 crawler_manager.py --incremental 开启
+    'dir': RAW_DATA_DIR / 'watermarks',
+    'stale_ratio': 0.8,         # 一页中已见过的条目达到该比例即停止该关键词的翻页
+    'max_ids': 1000,            # 每个关键词保存的最近条目ID数
+}
+
+# ========== 性能指标配置 ==========
+METRICS_CONFIG = {
+    'enabled': True,            # 生成爬取报告时导出性能指标（含验证阶段）
+    'dir': RAW_DATA_DIR / 'metrics',
+    'prometheus_file': 'crawler_metrics.prom',  # 固定文件名，便于 node_exporter 文本采集器读取
+}
+
+# ========== 性能剖析配置 ==========
+PROFILE_CONFIG = {
+    'dir': RAW_DATA_DIR / 'profiles',   # 每次剖析写入以时间戳命名的子目录
+    'top_n': 20,                # 报告中列出的热点函数和分配位置数
+    'snapshot_samples': 3,      # 每个阶段做 tracemalloc 快照对比的次数
+    'traceback_limit': 1,       # 分配位置记录的调用栈深度
+}
+
+# ========== 基准测试配置 ==========
+BENCHMARK_CONFIG = {
+    'fixtures_dir': PROJECT_ROOT / 'benchmarks' / 'fixtures',
+    'baseline_file': PROJECT_ROOT / 'benchmarks' / 'baseline.json',   # 基线与机器相关，在同一台机器上保存和比较
+    'dataset_sizes': [1_000, 100_000, 1_000_000],
+    'repeats': 3,               # 每项重复测量次数，取最快一次
+    'min_seconds': 0.2,         # 每次测量至少运行的时间，单次很快的操作循环执行
+    'max_regression': 0.25,     # 吞吐量下降或峰值内存增加超过该比例视为退化
+    'memory_floor_mb': 1.0,     # 峰值内存增加不足该值时不视为退化
+}
+
+# ========== 数据输出流配置 ==========
+# 输出流本身只缓冲一个批次，写文件的内存占用固定；CrawlerManager 仍返回完整的平台数据列表
+# 并在其上清洗、验证和保存，全平台爬取的峰值内存随爬取规模增长
+SINK_CONFIG = {
+    'enabled': True,            # 爬取过程中逐页写出原始数据
+    'format': 'jsonl',          # 流式输出格式: jsonl / csv
+    'batch_size': 200,          # 缓冲条数达到该值时写入
+    'flush_interval': 5.0,      # 距上次写入超过该秒数时写入
+}
+
+# ========== 列式存储配置 ==========
+STORAGE_CONFIG = {
+    'format': 'csv',            # 保存格式: csv / parquet（按平台和爬取日期分区，需要 pyarrow）
+    'compression': 'zstd',      # Parquet压缩算法
+    'batch_size': 10000,        # 每个记录批次的条数
+    'raw_dataset_dir': RAW_DATA_DIR / 'dataset',
+    'cleaned_dataset_dir': CLEANED_DATA_DIR / 'dataset',
+}
+
+# ========== 任务调度配置 ==========
+SCHEDULER_CONFIG = {
+    'max_workers': 6,           # 全局工作线程数，各平台并发上限见 PLATFORMS[...]['max_concurrency']
+}
+
+# ========== 解析进程池配置 ==========
+PARSE_POOL_CONFIG = {
+    'enabled': True,            # 爬虫管理器运行时是否在独立进程中解析页面
+    'max_workers': None,        # 工作进程数，None为CPU核数
+    'start_method': 'spawn',    # 进程启动方式，抓取线程运行中fork不安全
+}
+
+# ========== HTML解析配置 ==========
+PARSER_CONFIG = {
+    'backend': 'auto',          # selectolax / lxml / bs4，auto 按此顺序选择第一个已安装的后端；
+                                # 平台可用 PLATFORMS[...]['parser_backend'] 覆盖
+}
+
+# ========== 文本规范化配置 ==========
+TEXT_CONFIG = {
+    'fold_width': True,         # 清理文本时把全角字母和数字转为半角（ＡＩ音箱 -> AI音箱）
+}
+
 # ========== 数据字段配置 ==========
 DATA_SCHEMA = {
     'required_fields': ['platform', 'title', 'content'],
@@ -4,17 +4,42 @@
 
 import time
 import random
+import asyncio
 import logging
+import threading
 import requests
+from collections import deque
+from concurrent.futures import Future
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
+from urllib.parse import urlparse
 import sys
 import os
 
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import CRAWLER_CONFIG, PLATFORMS, DATA_SCHEMA
+from config import CRAWLER_CONFIG, PLATFORMS, DATA_SCHEMA, SEARCH_KEYWORDS, STORAGE_CONFIG, DEDUP_CONFIG, SEEN_STORE_CONFIG, CASSETTE_CONFIG
+from crawler.http_utils import build_response
+from crawler.rate_limiter import get_rate_limiter
+from crawler.response_cache import get_response_cache
+from crawler.record_sink import CsvSink
+from crawler.retry_policy import RetryPolicy, get_circuit_breaker
+from crawler.deadline import Deadline
+from crawler.html_parser import get_parser_backend
+from crawler.crawl_record import CrawlRecord, RecordBuilder
+from crawler.product_classifier import get_product_classifier
+from crawler.text_normalizer import get_text_normalizer
+from crawler.dedup_index import DedupIndex, normalize_url, content_hash
+from crawler.seen_store import get_seen_store
+from crawler.metrics import get_metrics, PARSE_BUCKETS
+from crawler.profiler import NullProfiler
+
+class PageData(list):
+    """一页解析出的数据列表，另记录解析前因已采集而跳过的条目数和解析耗时（可随结果从工作进程传回）"""
+    skipped = 0
+    parse_seconds = None
+
 
 class BaseCrawler(ABC):
     """
@@ -31,7 +56,32 @@ class BaseCrawler(ABC):
         self.platform_name = platform_name
         self.platform_config = PLATFORMS.get(platform_name, {})
         self.crawler_config = CRAWLER_CONFIG
+        self.rate_limiter = get_rate_limiter(platform_name)
+        self.retry_policy = RetryPolicy.from_config()
+        self.response_cache = get_response_cache()
+        self.cache_ttl = self.platform_config.get('cache_ttl')
+        self.html_parser = get_parser_backend(self.platform_config.get('parser_backend'))
+        self.journal = None
+        self.sink = None
+        self.parse_pool = None
+        self.archive = None
+        self.save_debug_pages = True
+        # 为False时不按已采集库跳过条目、不按水位停止翻页（重新解析归档时使用）
+        self.incremental = True
+        self.watermarks = None
+        self.dedup_index = DedupIndex() if DEDUP_CONFIG['enabled'] else None
+        self.seen_store = get_seen_store(platform_name) if SEEN_STORE_CONFIG['enabled'] else None
+        self.record_builder = RecordBuilder(self.platform_config.get('name', platform_name))
+        self.product_classifier = get_product_classifier()
+        self.text_normalizer = get_text_normalizer()
         self.session = requests.Session()
+        self.async_session = None
+        self.transport = None
+        self._host_semaphores = {}
+        self.timeout_stats = {}
+        self.metrics = get_metrics()
+        self.profiler = NullProfiler()
+        self._stats_lock = threading.Lock()
         self.setup_session()
         self.setup_logging()
         
@@ -46,9 +96,6 @@ class BaseCrawler(ABC):
             'Connection': 'keep-alive',
         })
         
-        # 设置超时
-        self.session.timeout = self.crawler_config['timeout']
-        
     def setup_logging(self):
         """设置日志"""
         self.logger = logging.getLogger(f"{self.platform_name}_crawler")
@@ -62,46 +109,421 @@ class BaseCrawler(ABC):
             handler.setFormatter(formatter)
             self.logger.addHandler(handler)
     
-    def random_delay(self):
-        """随机延时，避免请求过于频繁"""
-        delay = random.uniform(*self.crawler_config['delay_range'])
-        time.sleep(delay)
+    def use_transport(self, transport):
+        """
+        挂载录制/回放传输层，传入None时恢复直接访问网络
+        
+        Args:
+            transport: CassetteTransport对象或None
+        """
+        self.transport = transport
+        if transport is not None:
+            transport.mount(self.session)
+        else:
+            self.session.mount('http://', requests.adapters.HTTPAdapter())
+            self.session.mount('https://', requests.adapters.HTTPAdapter())
+    
+    def _skip_throttle(self) -> bool:
+        """回放时不访问网络，默认不做限速等待"""
+        return (self.transport is not None and self.transport.replaying
+                and not CASSETTE_CONFIG['replay_throttle'])
+    
+    def throttle(self):
+        """按平台限速器等待，避免请求过于频繁"""
+        if self._skip_throttle():
+            return
+        self._record_sleep(self.rate_limiter.acquire(), 'rate_limit')
+    
+    def _record_sleep(self, seconds: float, reason: str):
+        """记录等待时间，reason 为 rate_limit/retry/circuit"""
+        if seconds > 0:
+            self.metrics.inc('crawler_sleep_seconds_total', seconds, '等待时间（秒）',
+                             platform=self.platform_name, reason=reason)
+    
+    def _record_request(self, started: float, response: Optional[requests.Response]):
+        """记录一次HTTP请求的耗时、状态和下载字节数（不含限速等待）"""
+        self.metrics.observe('crawler_request_duration_seconds', time.perf_counter() - started,
+                             '请求耗时（秒）', platform=self.platform_name)
+        status = response.status_code if response is not None else 'error'
+        self.metrics.inc('crawler_requests_total', 1, '请求次数', platform=self.platform_name, status=status)
+        if response is not None:
+            self.metrics.inc('crawler_response_bytes_total', len(response.content), '下载字节数',
+                             platform=self.platform_name)
+    
+    def _record_retry(self, wait_time: float):
+        """记录一次重试及其等待时间"""
+        self.metrics.inc('crawler_retries_total', 1, '重试次数', platform=self.platform_name)
+        self._record_sleep(wait_time, 'retry')
+        
+    def _cache_lookup(self, url: str, kwargs: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, Any]], Optional[requests.Response]]:
+        """
+        查询响应缓存；条目已过期时为本次请求附加条件请求头
+        
+        Args:
+            url: 请求URL
+            kwargs: 请求参数，可能被补充条件请求头
+            
+        Returns:
+            (缓存键, 缓存条目, 可直接使用的缓存响应)
+        """
+        if not self.response_cache:
+            return None, None, None
+        
+        cache_key = self.response_cache.make_key(url, kwargs.get('params'))
+        cache_entry = self.response_cache.lookup(cache_key)
+        
+        if cache_entry and self.response_cache.is_fresh(cache_entry, self.cache_ttl):
+            self.response_cache.record_hit()
+            self.logger.info(f"缓存命中: {url}")
+            return cache_key, cache_entry, self.response_cache.to_response(cache_entry)
+        
+        self.response_cache.record_miss()
+        if cache_entry:
+            headers = kwargs.get('headers', {})
+            headers.update(self.response_cache.conditional_headers(cache_entry))
+            kwargs['headers'] = headers
+        return cache_key, cache_entry, None
+    
+    def _cache_revalidated(self, cache_key: str, cache_entry: Dict[str, Any], url: str) -> requests.Response:
+        """服务端返回304时刷新缓存并返回缓存内容"""
+        self.response_cache.refresh(cache_key)
+        self.logger.info(f"缓存重新验证通过: {url}")
+        return self.response_cache.to_response(cache_entry)
+    
+    def _cache_store(self, cache_key: Optional[str], response: requests.Response):
+        """缓存成功响应"""
+        if self.response_cache and cache_key:
+            self.response_cache.store(cache_key, response)
+    
+    def _record_timeout(self, kind: str):
+        """记录一次超时，kind 如 连接超时/读取超时/关键词截止"""
+        with self._stats_lock:
+            self.timeout_stats[kind] = self.timeout_stats.get(kind, 0) + 1
+    
+    def _record_timeout_error(self, error: Exception):
+        """按异常类型记录连接超时或读取超时"""
+        if isinstance(error, requests.exceptions.ConnectTimeout) or (
+                isinstance(error, asyncio.TimeoutError) and 'Connect' in type(error).__name__):
+            self._record_timeout('连接超时')
+        elif isinstance(error, (requests.exceptions.Timeout, asyncio.TimeoutError)):
+            self._record_timeout('读取超时')
+    
+    def _deadline_exceeded(self, deadline: Deadline, what: str) -> bool:
+        """
+        检查截止时间，已到期时记录并输出日志
+        
+        Args:
+            deadline: 截止时间
+            what: 被放弃的操作描述
+            
+        Returns:
+            是否已到期
+        """
+        if not deadline.expired():
+            return False
+        name = deadline.expired_name() or deadline.name
+        self._record_timeout(f"{name}截止")
+        self.logger.warning(f"{name}时间预算已用完，放弃{what}")
+        return True
+    
+    def request_deadline(self, parent: Optional[Deadline] = None) -> Deadline:
+        """创建单个请求（含重试）的截止时间"""
+        return Deadline(self.crawler_config['deadlines']['request'], parent=parent, name='请求')
+    
+    def get_timeout(self, deadline: Deadline) -> Tuple[float, float]:
+        """
+        计算本次请求的 (连接超时, 读取超时)，不超过截止时间的剩余预算
         
-    def safe_request(self, url: str, **kwargs) -> Optional[requests.Response]:
+        Args:
+            deadline: 请求截止时间
+            
+        Returns:
+            (connect_timeout, read_timeout)
+        """
+        return (
+            deadline.cap(self.crawler_config['connect_timeout']),
+            deadline.cap(self.crawler_config['read_timeout'])
+        )
+    
+    def safe_request(self, url: str, deadline: Optional[Deadline] = None, **kwargs) -> Optional[requests.Response]:
         """
-        安全的HTTP请求，包含重试机制
+        安全的HTTP请求，包含重试机制、熔断保护和超时控制
         
         Args:
             url: 请求URL
+            deadline: 上级截止时间（关键词/平台），请求预算不会超过它
             **kwargs: requests参数
             
         Returns:
             Response对象或None
         """
-        for attempt in range(self.crawler_config['max_retries']):
+        cache_key, cache_entry, cached = self._cache_lookup(url, kwargs)
+        if cached is not None:
+            return cached
+        
+        breaker = get_circuit_breaker(urlparse(url).netloc)
+        max_retries = self.retry_policy.max_retries
+        deadline = self.request_deadline(deadline)
+        
+        for attempt in range(max_retries):
+            # 先检查截止时间，半开状态下不会占用试探名额后直接放弃
+            if self._deadline_exceeded(deadline, f"请求: {url}"):
+                return None
+            if not breaker.allow_request():
+                self.logger.warning(f"主机熔断中，跳过请求: {url}")
+                return None
+            
             try:
-                self.random_delay()
+                self.throttle()
+                if self._deadline_exceeded(deadline, f"请求: {url}"):
+                    breaker.release_trial()
+                    return None
                 
                 # 随机更换User-Agent
                 headers = kwargs.get('headers', {})
                 headers['User-Agent'] = random.choice(self.crawler_config['user_agents'])
                 kwargs['headers'] = headers
+                kwargs['timeout'] = self.get_timeout(deadline)
                 
-                response = self.session.get(url, **kwargs)
+                started = time.perf_counter()
+                response = None
+                try:
+                    response = self.session.get(url, **kwargs)
+                finally:
+                    self._record_request(started, response)
+            except Exception as e:
+                response = None
+                self.logger.error(f"请求异常 (尝试 {attempt + 1}/{max_retries}): {e}")
+                self._record_timeout_error(e)
+                breaker.record_failure()
+                if not self.retry_policy.is_retryable_exception(e):
+                    return None
+            except BaseException:
+                # 任务被取消或中断（如 CancelledError、KeyboardInterrupt），请求没有结果，归还试探名额
+                breaker.release_trial()
+                raise
+            
+            if response is not None:
+                done, result = self._handle_response(response, url, breaker, cache_key, cache_entry)
+                if done:
+                    return result
+            
+            if attempt < max_retries - 1:
+                wait_time = self._get_retry_wait(attempt, response, breaker, url)
+                if wait_time is None:
+                    break
+                if wait_time >= deadline.remaining():
+                    self._record_timeout(f"{deadline.binding_name()}截止")
+                    self.logger.warning(f"重试等待超出时间预算，放弃请求: {url}")
+                    break
+                self.logger.info(f"等待 {wait_time:.1f} 秒后重试...")
+                self._record_retry(wait_time)
+                time.sleep(wait_time)
                 
-                if response.status_code == 200:
-                    self.logger.info(f"成功请求: {url}")
-                    return response
-                else:
-                    self.logger.warning(f"请求失败 {response.status_code}: {url}")
+        self.logger.error(f"请求最终失败: {url}")
+        return None
+    
+    def _handle_response(self, response: requests.Response, url: str, breaker, cache_key: Optional[str],
+                         cache_entry: Optional[Dict[str, Any]]) -> Tuple[bool, Optional[requests.Response]]:
+        """
+        按状态码处理响应
+        
+        Args:
+            response: 响应对象
+            url: 请求URL
+            breaker: 主机熔断器
+            cache_key: 缓存键
+            cache_entry: 缓存条目
+            
+        Returns:
+            (是否结束重试, 返回给调用方的响应)
+        """
+        if response.status_code == 304 and cache_entry:
+            breaker.record_success()
+            return True, self._cache_revalidated(cache_key, cache_entry, url)
+        
+        if response.status_code == 200:
+            breaker.record_success()
+            self.logger.info(f"成功请求: {url}")
+            self._cache_store(cache_key, response)
+            return True, response
+        
+        if not self.retry_policy.is_retryable_status(response.status_code):
+            # 主机可以正常响应，只是该请求本身无效，不计入熔断
+            breaker.record_success()
+            self.logger.warning(f"请求失败 {response.status_code}，不可重试: {url}")
+            return True, None
+        
+        breaker.record_failure()
+        self.logger.warning(f"请求失败 {response.status_code}: {url}")
+        return False, None
+    
+    def _get_retry_wait(self, attempt: int, response: Optional[requests.Response], breaker, url: str) -> Optional[float]:
+        """
+        计算重试等待时间；服务端要求的等待超过上限时熔断该主机并放弃
+        
+        Returns:
+            等待秒数，放弃时返回None
+        """
+        wait_time = self.retry_policy.get_wait(attempt, response)
+        if wait_time is None:
+            retry_after = self.retry_policy.parse_retry_after(response)
+            self.logger.warning(f"服务端要求等待 {retry_after:.0f} 秒，暂停该主机: {url}")
+            breaker.trip(retry_after)
+        return wait_time
+    
+    def _search_host(self) -> str:
+        """搜索请求所在的主机"""
+        return urlparse(self.build_search_url('', 1)).netloc
+    
+    def is_circuit_open(self) -> bool:
+        """本平台搜索主机是否处于熔断暂停状态"""
+        return get_circuit_breaker(self._search_host()).is_paused()
+    
+    def wait_for_circuit(self, deadline: Optional[Deadline] = None):
+        """本平台搜索主机熔断时，暂停到冷却结束（不超过截止时间）"""
+        cooldown = get_circuit_breaker(self._search_host()).remaining_cooldown()
+        if deadline is not None:
+            cooldown = deadline.cap(cooldown)
+        if cooldown > 0:
+            self.logger.warning(f"主机熔断中，暂停 {cooldown:.0f} 秒")
+            self._record_sleep(cooldown, 'circuit')
+            time.sleep(cooldown)
+    
+    async def async_wait_for_circuit(self, deadline: Optional[Deadline] = None):
+        """本平台搜索主机熔断时，异步暂停到冷却结束（不超过截止时间）"""
+        cooldown = get_circuit_breaker(self._search_host()).remaining_cooldown()
+        if deadline is not None:
+            cooldown = deadline.cap(cooldown)
+        if cooldown > 0:
+            self.logger.warning(f"主机熔断中，暂停 {cooldown:.0f} 秒")
+            self._record_sleep(cooldown, 'circuit')
+            await asyncio.sleep(cooldown)
+    
+    def get_max_concurrency(self) -> int:
+        """获取本平台单主机的最大并发请求数"""
+        return self.platform_config.get('max_concurrency', self.crawler_config['max_concurrency_per_host'])
+    
+    def _get_host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """获取URL所属主机的并发信号量"""
+        host = urlparse(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.get_max_concurrency())
+        return self._host_semaphores[host]
+    
+    async def async_throttle(self):
+        """按平台限速器异步等待，不阻塞事件循环"""
+        if self._skip_throttle():
+            return
+        self._record_sleep(await self.rate_limiter.async_acquire(), 'rate_limit')
+    
+    async def _async_get(self, url: str, **kwargs) -> requests.Response:
+        """
+        异步GET请求；挂载了录制/回放传输层时由其录制或直接回放响应
+        
+        Args:
+            url: 请求URL
+            **kwargs: aiohttp请求参数
+            
+        Returns:
+            Response对象
+        """
+        if self.transport is not None and self.transport.replaying:
+            return await self.transport.async_replay('GET', url)
+        
+        started = time.perf_counter()
+        async with self.async_session.get(url, **kwargs) as resp:
+            content = await resp.read()
+            response = build_response(str(resp.url), resp.status, dict(resp.headers), content)
+        if self.transport is not None:
+            self.transport.record('GET', url, response, time.perf_counter() - started)
+        return response
+    
+    async def async_safe_request(self, url: str, deadline: Optional[Deadline] = None, **kwargs) -> Optional[requests.Response]:
+        """
+        异步HTTP请求，包含重试机制、熔断保护、超时控制和单主机并发限制
+        
+        需在 async_crawl_all_keywords 打开的会话中调用
+        
+        Args:
+            url: 请求URL
+            deadline: 上级截止时间（关键词/平台），请求预算不会超过它
+            **kwargs: aiohttp请求参数
+            
+        Returns:
+            Response对象或None
+        """
+        cache_key, cache_entry, cached = self._cache_lookup(url, kwargs)
+        if cached is not None:
+            return cached
+        
+        import aiohttp
+        
+        semaphore = self._get_host_semaphore(url)
+        breaker = get_circuit_breaker(urlparse(url).netloc)
+        max_retries = self.retry_policy.max_retries
+        deadline = self.request_deadline(deadline)
+        
+        for attempt in range(max_retries):
+            # 先检查截止时间，半开状态下不会占用试探名额后直接放弃
+            if self._deadline_exceeded(deadline, f"请求: {url}"):
+                return None
+            if not breaker.allow_request():
+                self.logger.warning(f"主机熔断中，跳过请求: {url}")
+                return None
+            
+            try:
+                async with semaphore:
+                    await self.async_throttle()
+                    if self._deadline_exceeded(deadline, f"请求: {url}"):
+                        breaker.release_trial()
+                        return None
                     
+                    # 随机更换User-Agent
+                    headers = kwargs.get('headers', {})
+                    headers['User-Agent'] = random.choice(self.crawler_config['user_agents'])
+                    kwargs['headers'] = headers
+                    connect_timeout, read_timeout = self.get_timeout(deadline)
+                    kwargs['timeout'] = aiohttp.ClientTimeout(
+                        total=deadline.cap(connect_timeout + read_timeout),
+                        sock_connect=connect_timeout,
+                        sock_read=read_timeout
+                    )
+                    
+                    started = time.perf_counter()
+                    response = None
+                    try:
+                        response = await self._async_get(url, **kwargs)
+                    finally:
+                        self._record_request(started, response)
             except Exception as e:
-                self.logger.error(f"请求异常 (尝试 {attempt + 1}/{self.crawler_config['max_retries']}): {e}")
-                
-            if attempt < self.crawler_config['max_retries'] - 1:
-                wait_time = (attempt + 1) * 2  # 递增等待时间
-                self.logger.info(f"等待 {wait_time} 秒后重试...")
-                time.sleep(wait_time)
+                response = None
+                self.logger.error(f"请求异常 (尝试 {attempt + 1}/{max_retries}): {e!r}")
+                self._record_timeout_error(e)
+                breaker.record_failure()
+                if not self.retry_policy.is_retryable_exception(e):
+                    return None
+            except BaseException:
+                # 任务被取消或中断（如 CancelledError、KeyboardInterrupt），请求没有结果，归还试探名额
+                breaker.release_trial()
+                raise
+            
+            if response is not None:
+                done, result = self._handle_response(response, url, breaker, cache_key, cache_entry)
+                if done:
+                    return result
+            
+            if attempt < max_retries - 1:
+                wait_time = self._get_retry_wait(attempt, response, breaker, url)
+                if wait_time is None:
+                    break
+                if wait_time >= deadline.remaining():
+                    self._record_timeout(f"{deadline.binding_name()}截止")
+                    self.logger.warning(f"重试等待超出时间预算，放弃请求: {url}")
+                    break
+                self.logger.info(f"等待 {wait_time:.1f} 秒后重试...")
+                self._record_retry(wait_time)
+                await asyncio.sleep(wait_time)
                 
         self.logger.error(f"请求最终失败: {url}")
         return None
@@ -124,7 +546,7 @@ class BaseCrawler(ABC):
                 
         return True
     
-    def standardize_data(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
+    def standardize_data(self, raw_data: Dict[str, Any]) -> CrawlRecord:
         """
         标准化数据格式
         
@@ -132,33 +554,116 @@ class BaseCrawler(ABC):
             raw_data: 原始数据
             
         Returns:
-            标准化后的数据
+            标准化后的记录，只包含 DATA_SCHEMA 字段，缺失字段为None
         """
-        standardized = {
-            'platform': self.platform_config.get('name', self.platform_name),
-            'crawl_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        }
+        return self.record_builder.build(raw_data)
+
+    def classify_product(self, title: str, content: str = "") -> str:
+        """
+        根据标题和内容对产品进行分类
+
+        Args:
+            title: 标题
+            content: 内容
+
+        Returns:
+            产品分类
+        """
+        return self.product_classifier.classify(title, content)
+
+    def get_item_key(self, record: Dict[str, Any]) -> str:
+        """
+        计算数据的去重键，子类可覆盖为平台商品/笔记ID
+
+        Args:
+            record: 解析出的数据
+
+        Returns:
+            规范化URL，没有URL时为内容哈希
+        """
+        url = normalize_url(record.get('source_url'))
+        if url:
+            return f"url:{url}"
+        return f"hash:{content_hash(record)}"
+
+    def get_raw_item_id(self, item: Any) -> Optional[str]:
+        """
+        从未解析的原始条目中取出去重键，子类可覆盖
+
+        返回值须与 get_item_key 对解析结果给出的键相同，用于在解析前查询已采集库。
+
+        Args:
+            item: extract_page_items 返回的原始条目
+
+        Returns:
+            去重键，无法直接取得时返回None（该条目不做解析前检查）
+        """
+        return None
+
+    def observe_page(self, keyword: str, page: int, page_data: List[Dict[str, Any]]):
+        """
+        增量模式下用水位判断该页是否基本都是旧内容，是则停止该关键词的翻页
+
+        在去重之前调用：与其他关键词重复的条目对本关键词来说仍是新结果。
+
+        Args:
+            keyword: 搜索关键词
+            page: 页码
+            page_data: 该页解析出的数据
+        """
+        if self.watermarks is None or not self.incremental:
+            return
+        keys = [self.get_item_key(record) for record in page_data]
+        if self.watermarks.observe(keyword, page, keys, getattr(page_data, 'skipped', 0)):
+            self.logger.info(f"关键词 '{keyword}' 第 {page} 页基本都是已采集内容，停止翻页")
+
+    def keyword_exhausted(self, keyword: str) -> bool:
+        """增量模式下关键词是否已遇到旧内容，不必再请求后面的页"""
+        return self.watermarks is not None and self.incremental and self.watermarks.is_stopped(keyword)
+
+    def drop_duplicates(self, keyword: str, page_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        去掉之前的关键词、页或爬取中已出现过的数据
+
+        Args:
+            keyword: 搜索关键词
+            page_data: 一页解析出的数据
+
+        Returns:
+            首次出现的数据
+        """
+        if self.dedup_index is None or not page_data:
+            return page_data
+        unique = self.dedup_index.filter(page_data, keyword, self.get_item_key)
+        if len(unique) < len(page_data):
+            self.logger.info(f"关键词 '{keyword}' 去掉 {len(page_data) - len(unique)} 条重复数据")
+        return unique
+
+    @abstractmethod
+    def build_search_url(self, keyword: str, page: int = 1) -> str:
+        """
+        构建搜索URL - 必须在子类中实现
         
-        # 映射和清理数据
-        for field in DATA_SCHEMA['required_fields'] + DATA_SCHEMA['optional_fields']:
-            if field in raw_data:
-                standardized[field] = raw_data[field]
-            elif field not in ['platform', 'crawl_time']:
-                standardized[field] = None
-                
-        return standardized
+        Args:
+            keyword: 搜索关键词
+            page: 页码
+            
+        Returns:
+            完整的搜索URL
+        """
+        pass
     
     @abstractmethod
-    def search(self, keyword: str, max_pages: int = 5) -> List[Dict[str, Any]]:
+    def extract_page_items(self, response: requests.Response, page: int = 1) -> List[Any]:
         """
-        搜索方法 - 必须在子类中实现
+        从搜索结果页中提取商品/笔记条目 - 必须在子类中实现
         
         Args:
-            keyword: 搜索关键词
-            max_pages: 最大页数
+            response: 搜索页响应
+            page: 页码
             
         Returns:
-            搜索结果列表
+            待parse_item解析的原始条目列表
         """
         pass
     
@@ -175,30 +680,454 @@ class BaseCrawler(ABC):
         """
         pass
     
-    def save_data(self, data_list: List[Dict[str, Any]], filename: str):
+    def get_search_keywords(self) -> List[str]:
+        """
+        获取本平台要爬取的关键词列表，子类可覆盖
+        
+        Returns:
+            关键词列表
+        """
+        return (
+            SEARCH_KEYWORDS['primary'] + 
+            SEARCH_KEYWORDS['secondary'] + 
+            SEARCH_KEYWORDS['brands']
+        )
+    
+    def parse_search_page(self, response: requests.Response, keyword: str, page: int) -> List[Dict[str, Any]]:
+        """
+        解析一页搜索结果
+        
+        Args:
+            response: 搜索页响应
+            keyword: 搜索关键词
+            page: 页码
+            
+        Returns:
+            该页通过校验的标准化数据列表
+        """
+        started = time.perf_counter()
+        page_data = PageData()
+        items = self.extract_page_items(response, page)
+        if not items:
+            page_data.parse_seconds = time.perf_counter() - started
+            return page_data
+        
+        self.logger.info(f"第 {page} 页找到 {len(items)} 个条目")
+        
+        skipped = 0
+        for item in items:
+            try:
+                if self.seen_store is not None and self.incremental:
+                    # 以往爬取已采集的条目不再解析、标准化和校验
+                    item_id = self.get_raw_item_id(item)
+                    if item_id and item_id in self.seen_store:
+                        skipped += 1
+                        continue
+                parsed = self.parse_item(item)
+                if parsed and self.validate_data(parsed):
+                    page_data.append(parsed)
+            except Exception as e:
+                self.logger.error(f"解析条目失败: {e}")
+                continue
+        
+        if skipped:
+            page_data.skipped = skipped
+            self.logger.info(f"第 {page} 页跳过 {skipped} 条已采集数据")
+        self.logger.info(f"第 {page} 页成功解析 {len(page_data)} 条数据")
+        page_data.parse_seconds = time.perf_counter() - started
+        return page_data
+    
+    def _restore_page(self, keyword: str, page: int) -> List[Dict[str, Any]]:
+        """从爬取日志恢复已完成页的数据"""
+        page_data = self.journal.get_page(self.platform_name, keyword, page)
+        self.logger.info(f"第 {page} 页已在日志中完成，恢复 {len(page_data)} 条数据")
+        if self.dedup_index is not None:
+            # 日志中的数据写入时已去重，这里只登记，后续页面遇到它们时按重复处理
+            self.dedup_index.mark(page_data, self.get_item_key)
+        if self.seen_store is not None:
+            self.seen_store.add(map(self.get_item_key, page_data))
+        self.observe_page(keyword, page, page_data)
+        if self.sink and page_data:
+            self.sink.write(page_data)
+        return page_data
+    
+    def _finish_page(self, keyword: str, page: int, page_data: List[Dict[str, Any]]):
+        """
+        单页解析完成后的统一处理
+        
+        Args:
+            keyword: 搜索关键词
+            page: 页码
+            page_data: 该页数据
+        """
+        if self.journal:
+            self.journal.record_page(self.platform_name, keyword, page, page_data)
+        if self.sink and page_data:
+            self.sink.write(page_data)
+    
+    def keyword_deadline(self, parent: Optional[Deadline] = None) -> Deadline:
+        """创建单个关键词的截止时间"""
+        return Deadline(self.crawler_config['deadlines']['keyword'], parent=parent, name='关键词')
+    
+    def platform_deadline(self) -> Deadline:
+        """创建整个平台爬取的截止时间"""
+        return Deadline(self.crawler_config['deadlines']['platform'], name='平台')
+    
+    def fetch_page(self, keyword: str, page: int, deadline: Optional[Deadline] = None) -> Optional[requests.Response]:
+        """
+        请求单个搜索页
+        
+        Args:
+            keyword: 搜索关键词
+            page: 页码
+            deadline: 所在关键词/平台的截止时间
+            
+        Returns:
+            响应对象，请求失败时返回None
+        """
+        with self.profiler.stage('fetch'):
+            response = self.safe_request(self.build_search_url(keyword, page), deadline=deadline)
+        if not response:
+            self.logger.warning(f"第 {page} 页请求失败，跳过")
+        return response
+    
+    def save_debug_page(self, response: requests.Response, page: int):
+        """
+        页面中没有找到条目时保存页面开头用于调试
+        
+        挂载了响应归档时完整页面已在归档中，不再另存调试文件；save_debug_pages 为False时（如解析进程池的工作进程）也不保存。
+        
+        Args:
+            response: 搜索页响应
+            page: 页码
+        """
+        if self.archive is not None:
+            self.logger.warning(f"第 {page} 页原始响应可在响应归档中查看")
+            return
+        if not self.save_debug_pages:
+            return
+        with open(f'debug_{self.platform_name}_page_{page}.html', 'w', encoding='utf-8') as f:
+            f.write(response.text[:5000])  # 保存前5000字符
+    
+    def submit_page(self, response: requests.Response, keyword: str, page: int) -> Future:
+        """
+        提交一页解析任务
+        
+        挂载了响应归档时先把原始响应写入归档。
+        挂载了解析进程池时交给工作进程解析，否则在当前线程直接解析并返回已完成的 Future。
+        
+        Args:
+            response: 搜索页响应
+            keyword: 搜索关键词
+            page: 页码
+            
+        Returns:
+            结果为该页数据列表的 Future
+        """
+        if self.archive is not None:
+            try:
+                self.archive.append(self.platform_name, keyword, page, response)
+            except Exception as e:
+                self.logger.warning(f"第 {page} 页写入响应归档失败: {e}")
+        
+        if self.parse_pool:
+            return self.parse_pool.submit(self, response, keyword, page)
+        
+        future = Future()
+        try:
+            with self.profiler.stage('parse'):
+                future.set_result(self.parse_search_page(response, keyword, page))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    
+    def collect_page(self, keyword: str, page: int, future: Future) -> List[Dict[str, Any]]:
+        """
+        等待一页解析完成并统一处理
+        
+        无论在当前线程还是工作进程中解析，结果都经过这里，去重在此处完成，
+        重复数据不再写入日志、输出流和后续的清洗与存储。
+        
+        Args:
+            keyword: 搜索关键词
+            page: 页码
+            future: submit_page 返回的 Future
+            
+        Returns:
+            该页数据列表，解析失败时返回空列表
+        """
+        try:
+            page_data = future.result()
+        except Exception as e:
+            self.logger.error(f"处理第 {page} 页数据失败: {e}")
+            return []
+        
+        parse_seconds = getattr(page_data, 'parse_seconds', None)
+        if parse_seconds is not None:
+            # 在工作进程中解析时耗时随结果传回，统一在这里记录
+            self.metrics.observe('crawler_parse_duration_seconds', parse_seconds, '单页解析耗时（秒）',
+                                 PARSE_BUCKETS, platform=self.platform_name)
+            self.metrics.inc('crawler_items_parsed_total', len(page_data), '解析出的条目数',
+                             platform=self.platform_name)
+        self.observe_page(keyword, page, page_data)
+        page_data = self.drop_duplicates(keyword, page_data)
+        if self.seen_store is not None:
+            self.seen_store.add(map(self.get_item_key, page_data))
+        self._finish_page(keyword, page, page_data)
+        return page_data
+    
+    def crawl_page(self, keyword: str, page: int, deadline: Optional[Deadline] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        爬取并解析单个搜索页
+        
+        Args:
+            keyword: 搜索关键词
+            page: 页码
+            deadline: 所在关键词/平台的截止时间
+            
+        Returns:
+            该页数据列表，请求失败时返回None
+        """
+        if self.journal and self.journal.is_done(self.platform_name, keyword, page):
+            return self._restore_page(keyword, page)
+        
+        response = self.fetch_page(keyword, page, deadline)
+        if not response:
+            return None
+        
+        return self.collect_page(keyword, page, self.submit_page(response, keyword, page))
+    
+    def search(self, keyword: str, max_pages: int = 3, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """
+        搜索关键词，逐页爬取
+        
+        挂载了解析进程池时，一页提交解析后立即请求下一页，解析完成的页按页码顺序收集。
+        
+        Args:
+            keyword: 搜索关键词
+            max_pages: 最大搜索页数
+            deadline: 平台截止时间
+            
+        Returns:
+            搜索结果列表
+        """
+        platform_label = self.platform_config.get('name', self.platform_name)
+        self.logger.info(f"开始搜索{platform_label}关键词: {keyword}")
+        deadline = self.keyword_deadline(deadline)
+        
+        # 增量模式下每页解析完再决定是否请求下一页
+        incremental = self.watermarks is not None and self.watermarks.has(keyword)
+        
+        results = {}
+        pending = deque()
+        for page in range(1, max_pages + 1):
+            if self.keyword_exhausted(keyword):
+                break
+            self.logger.info(f"正在爬取第 {page} 页...")
+            
+            self.wait_for_circuit(deadline)
+            if self._deadline_exceeded(deadline, f"关键词 '{keyword}' 的剩余页面"):
+                break
+            
+            if self.journal and self.journal.is_done(self.platform_name, keyword, page):
+                results[page] = self._restore_page(keyword, page)
+                continue
+            
+            response = self.fetch_page(keyword, page, deadline)
+            if response:
+                pending.append((page, self.submit_page(response, keyword, page)))
+            
+            # 收集已经解析完的页，未完成的留到后面，不阻塞下一页的请求
+            while pending and (incremental or pending[0][1].done()):
+                done_page, future = pending.popleft()
+                results[done_page] = self.collect_page(keyword, done_page, future)
+        
+        while pending:
+            done_page, future = pending.popleft()
+            results[done_page] = self.collect_page(keyword, done_page, future)
+        
+        all_data = []
+        for page in sorted(results):
+            all_data.extend(results[page])
+        
+        self.logger.info(f"搜索完成，总共获取 {len(all_data)} 条数据")
+        return all_data
+    
+    def crawl_all_keywords(self, max_pages_per_keyword: int = 2) -> List[Dict[str, Any]]:
+        """
+        爬取所有配置的关键词
+        
+        Args:
+            max_pages_per_keyword: 每个关键词的最大页数
+            
+        Returns:
+            所有数据列表
+        """
+        all_data = []
+        all_keywords = self.get_search_keywords()
+        deadline = self.platform_deadline()
+        
+        self.logger.info(f"开始爬取 {len(all_keywords)} 个关键词")
+        
+        for i, keyword in enumerate(all_keywords, 1):
+            if self._deadline_exceeded(deadline, f"剩余 {len(all_keywords) - i + 1} 个关键词"):
+                break
+            self.logger.info(f"[{i}/{len(all_keywords)}] 爬取关键词: {keyword}")
+            
+            try:
+                keyword_data = self.search(keyword, max_pages_per_keyword, deadline)
+                all_data.extend(keyword_data)
+                self.logger.info(f"关键词 '{keyword}' 获取 {len(keyword_data)} 条数据")
+                    
+            except Exception as e:
+                self.logger.error(f"爬取关键词 '{keyword}' 失败: {e}")
+                continue
+        
+        self.logger.info(f"所有关键词爬取完成，共获取 {len(all_data)} 条数据")
+        return all_data
+    
+    # ========== 异步爬取 ==========
+    
+    async def async_crawl_page(self, keyword: str, page: int, deadline: Optional[Deadline] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        异步爬取并解析单个搜索页
+        
+        Args:
+            keyword: 搜索关键词
+            page: 页码
+            deadline: 所在关键词/平台的截止时间
+            
+        Returns:
+            该页数据列表，请求失败时返回None
+        """
+        if self.journal and self.journal.is_done(self.platform_name, keyword, page):
+            return self._restore_page(keyword, page)
+        
+        await self.async_wait_for_circuit(deadline)
+        if deadline is not None and self._deadline_exceeded(deadline, f"第 {page} 页"):
+            return None
+        response = await self.async_safe_request(self.build_search_url(keyword, page), deadline=deadline)
+        if not response:
+            self.logger.warning(f"第 {page} 页请求失败，跳过")
+            return None
+        
+        future = self.submit_page(response, keyword, page)
+        if not future.done():
+            # 等待工作进程解析期间，事件循环继续处理其他页的请求
+            await asyncio.wait({asyncio.wrap_future(future)})
+        return self.collect_page(keyword, page, future)
+    
+    async def async_search(self, keyword: str, max_pages: int = 3, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """
+        异步搜索关键词，多页同时在途，结果按页码顺序合并
+        
+        Args:
+            keyword: 搜索关键词
+            max_pages: 最大搜索页数
+            deadline: 平台截止时间
+            
+        Returns:
+            搜索结果列表
+        """
+        platform_label = self.platform_config.get('name', self.platform_name)
+        self.logger.info(f"开始异步搜索{platform_label}关键词: {keyword}")
+        deadline = self.keyword_deadline(deadline)
+        
+        if self.watermarks is not None and self.watermarks.has(keyword):
+            # 增量模式逐页请求，遇到旧内容即停止；其他关键词的页面仍并发进行
+            results = []
+            for page in range(1, max_pages + 1):
+                if self.keyword_exhausted(keyword):
+                    break
+                results.append(await self.async_crawl_page(keyword, page, deadline))
+        else:
+            results = await asyncio.gather(
+                *(self.async_crawl_page(keyword, page, deadline) for page in range(1, max_pages + 1))
+            )
+        
+        all_data = []
+        for page_data in results:
+            if page_data:
+                all_data.extend(page_data)
+        
+        self.logger.info(f"搜索完成，总共获取 {len(all_data)} 条数据")
+        return all_data
+    
+    async def async_crawl_all_keywords(self, max_pages_per_keyword: int = 2) -> List[Dict[str, Any]]:
+        """
+        异步爬取所有配置的关键词
+        
+        所有关键词的页面共享同一个HTTP会话，实际并发度由每个主机的并发上限控制。
+        
+        Args:
+            max_pages_per_keyword: 每个关键词的最大页数
+            
+        Returns:
+            所有数据列表，按关键词顺序排列
+        """
+        import aiohttp
+        
+        all_keywords = self.get_search_keywords()
+        deadline = self.platform_deadline()
+        self.logger.info(f"开始异步爬取 {len(all_keywords)} 个关键词")
+        
+        connector = aiohttp.TCPConnector(limit_per_host=self.get_max_concurrency())
+        async with aiohttp.ClientSession(headers=dict(self.session.headers),
+                                         connector=connector) as session:
+            self.async_session = session
+            self._host_semaphores = {}
+            try:
+                results = await asyncio.gather(
+                    *(self.async_search(keyword, max_pages_per_keyword, deadline) for keyword in all_keywords),
+                    return_exceptions=True
+                )
+            finally:
+                self.async_session = None
+        
+        all_data = []
+        for keyword, keyword_data in zip(all_keywords, results):
+            if isinstance(keyword_data, Exception):
+                self.logger.error(f"爬取关键词 '{keyword}' 失败: {keyword_data}")
+                continue
+            all_data.extend(keyword_data)
+            self.logger.info(f"关键词 '{keyword}' 获取 {len(keyword_data)} 条数据")
+        
+        self.logger.info(f"所有关键词爬取完成，共获取 {len(all_data)} 条数据")
+        return all_data
+    
+    def save_data(self, data_list: List[Dict[str, Any]], filename: str, storage_format: Optional[str] = None):
         """
         保存数据到文件
         
+        CSV格式按批次流式写入 raw_data/filename；parquet格式写入按平台和爬取日期分区的原始数据集，
+        此时忽略 filename。
+        
         Args:
             data_list: 数据列表
             filename: 保存文件名
+            storage_format: csv 或 parquet，默认使用 STORAGE_CONFIG['format']
         """
-        import pandas as pd
         from pathlib import Path
         
         if not data_list:
             self.logger.warning("没有数据需要保存")
             return
-            
-        # 创建DataFrame
-        df = pd.DataFrame(data_list)
         
+        if (storage_format or STORAGE_CONFIG['format']) == 'parquet':
+            from crawler.columnar_store import get_dataset
+            
+            dataset = get_dataset('raw')
+            written = dataset.write(data_list)
+            self.logger.info(f"数据已写入分区数据集: {dataset.root}")
+            self.logger.info(f"共保存 {written} 条数据")
+            return
+            
         # 保存路径
         save_path = Path("raw_data") / filename
-        save_path.parent.mkdir(exist_ok=True)
         
         # 保存为CSV
-        df.to_csv(save_path, index=False, encoding='utf-8-sig')
+        with CsvSink(save_path, append=False) as sink:
+            sink.write(data_list)
         self.logger.info(f"数据已保存到: {save_path}")
         self.logger.info(f"共保存 {len(data_list)} 条数据")
         
@@ -0,0 +1,342 @@
+"""
+批量验证器 - 按列对整个数据集执行 DataValidator 的验证规则
+"""
+
+import re
+from operator import methodcaller
+from collections.abc import Mapping
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+# 错误类型，每个 (字段, 错误类型) 对应错误位图中的一位
+MISSING = 'missing'
+TOO_SHORT = 'too_short'
+TOO_LONG = 'too_long'
+PATTERN_MISMATCH = 'pattern_mismatch'
+BELOW_MIN = 'below_min'
+ABOVE_MAX = 'above_max'
+
+_RULE_CODES = (TOO_SHORT, TOO_LONG, PATTERN_MISMATCH, BELOW_MIN, ABOVE_MAX)
+_MAX_BITS = 64
+
+
+def error_message(code: str, field: str, rules: Dict[str, Any]) -> str:
+    """
+    错误信息，与 DataValidator.validate_item 返回的文字一致
+
+    Args:
+        code: 错误类型
+        field: 字段名
+        rules: 该字段的验证规则
+
+    Returns:
+        错误信息
+    """
+    if code == MISSING:
+        return f"缺失必需字段: {field}"
+    if code == TOO_SHORT:
+        return f"{field}长度不足{rules.get('min_length')}字符"
+    if code == TOO_LONG:
+        return f"{field}长度超过{rules.get('max_length')}字符"
+    if code == PATTERN_MISMATCH:
+        return f"{field}不符合格式要求"
+    if code == BELOW_MIN:
+        return f"{field}小于最小值{rules.get('min_value')}"
+    return f"{field}大于最大值{rules.get('max_value')}"
+
+
+_OTHER, _NONE, _STR, _NUM = range(4)
+
+
+class _TypeKinds(dict):
+    """类型到类别代码的缓存，与 isinstance 判断一致（含子类，bool 视为数值）"""
+
+    def __missing__(self, value_type: type) -> int:
+        if value_type is type(None):
+            kind = _NONE
+        elif issubclass(value_type, str):
+            kind = _STR
+        elif issubclass(value_type, (int, float)):
+            kind = _NUM
+        else:
+            kind = _OTHER
+        self[value_type] = kind
+        return kind
+
+
+_type_kinds = _TypeKinds()
+
+
+class _Column:
+    """一列数据及其类型掩码，同一字段在必需和可选检查中共用"""
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        size = len(values)
+        # 按类型查表得到类别，一列中通常只有两三种类型
+        kinds = np.fromiter(map(_type_kinds.__getitem__, map(type, values)), dtype=np.int8, count=size)
+        self.is_none = kinds == _NONE
+        self.is_str = kinds == _STR
+        self.is_num = kinds == _NUM
+
+        self.lengths = np.zeros(size, dtype=np.int64)
+        if self.is_str.any():
+            self.lengths[self.is_str] = np.fromiter(map(len, values[self.is_str]), dtype=np.int64)
+        self.is_empty = self.is_none | (self.is_str & (self.lengths == 0))
+
+    def numbers(self) -> np.ndarray:
+        numbers = np.zeros(len(self.values), dtype=np.float64)
+        if self.is_num.any():
+            numbers[self.is_num] = self.values[self.is_num].astype(np.float64)
+        return numbers
+
+
+class ValidationResult:
+    """
+    批量验证结果
+
+    每行一个 uint64 错误位图，位为0表示该行有效；
+    需要错误文字时再按位还原，不为每条数据构造错误列表。
+    """
+
+    def __init__(self, masks: np.ndarray, bits: List[Tuple[str, str]], fields: List[str],
+                 non_empty: Dict[str, int]):
+        """
+        Args:
+            masks: 每行的错误位图
+            bits: 每一位对应的 (错误信息, 错误统计类型)
+            fields: 参与完整性统计的字段
+            non_empty: 各字段非空行数
+        """
+        self.masks = masks
+        self.bits = bits
+        self.fields = fields
+        self.non_empty = non_empty
+
+    @property
+    def total(self) -> int:
+        return len(self.masks)
+
+    @property
+    def valid(self) -> np.ndarray:
+        """每行是否有效"""
+        return self.masks == 0
+
+    def errors(self, row: int) -> List[str]:
+        """
+        还原一行的错误信息，顺序与 DataValidator.validate_item 相同
+
+        Args:
+            row: 行号
+
+        Returns:
+            错误信息列表
+        """
+        mask = int(self.masks[row])
+        return [message for bit, (message, _) in enumerate(self.bits) if mask >> bit & 1]
+
+    def error_stats(self) -> Dict[str, int]:
+        """
+        按错误类型统计出现次数
+
+        Returns:
+            {错误类型: 次数}，类型顺序为首次出现的顺序
+        """
+        first_seen = {}
+        counts = {}
+        for bit, (_, error_type) in enumerate(self.bits):
+            rows = np.flatnonzero(self.masks >> np.uint64(bit) & np.uint64(1))
+            if not len(rows):
+                continue
+            counts[error_type] = counts.get(error_type, 0) + len(rows)
+            position = (int(rows[0]), bit)
+            if error_type not in first_seen or position < first_seen[error_type]:
+                first_seen[error_type] = position
+        return {error_type: counts[error_type] for error_type in sorted(counts, key=first_seen.get)}
+
+    def field_completeness(self) -> Dict[str, str]:
+        """各字段非空比例"""
+        if not self.total:
+            return {}
+        return {field: f"{self.non_empty[field] / self.total * 100:.1f}%" for field in self.fields}
+
+    def report(self) -> Dict[str, Any]:
+        """
+        验证报告，结构与 DataValidator.validate_dataset 相同
+
+        Returns:
+            验证报告
+        """
+        valid_count = int(self.valid.sum())
+        return {
+            "总数": self.total,
+            "有效数": valid_count,
+            "无效数": self.total - valid_count,
+            "有效率": f"{valid_count/self.total*100:.1f}%",
+            "错误统计": self.error_stats(),
+            "字段完整性": self.field_completeness()
+        }
+
+
+class BatchValidator:
+    """
+    批量验证器
+
+    把数据集按字段转成列，长度和数值范围用 NumPy 数组比较，
+    正则模式只编译一次并只作用于需要检查的行。
+    检查顺序与逐条验证相同：每个字段最多记录一个错误，长度不合格时不再检查模式。
+    """
+
+    def __init__(self, validation_rules: Dict[str, Dict[str, Any]], required_fields: Sequence[str],
+                 optional_fields: Sequence[str]):
+        """
+        初始化批量验证器
+
+        Args:
+            validation_rules: 字段验证规则，与 DataValidator.validation_rules 相同
+            required_fields: 必需字段
+            optional_fields: 可选字段
+        """
+        self.validation_rules = validation_rules
+        self.required_fields = list(required_fields)
+        self.optional_fields = list(optional_fields)
+        self.patterns = {
+            field: [re.compile(pattern) for pattern in rules.get('patterns', [])]
+            for field, rules in validation_rules.items()
+        }
+
+        # 按逐条验证的检查顺序分配错误位
+        self.bits: List[Tuple[str, str]] = []
+        self._slots: List[Tuple[str, bool, Dict[str, int]]] = []
+        for field in self.required_fields:
+            self._slots.append((field, True, self._allocate(field, required=True)))
+        for field in self.optional_fields:
+            self._slots.append((field, False, self._allocate(field, required=False)))
+        if len(self.bits) > _MAX_BITS:
+            raise ValueError(f"验证规则过多，错误位图最多支持{_MAX_BITS}位")
+
+    def _allocate(self, field: str, required: bool) -> Dict[str, int]:
+        codes = ((MISSING,) if required else ()) + (_RULE_CODES if field in self.validation_rules else ())
+        rules = self.validation_rules.get(field, {})
+        allocated = {}
+        for code in codes:
+            message = error_message(code, field, rules)
+            allocated[code] = len(self.bits)
+            self.bits.append((message, message.split(':')[0] if ':' in message else message))
+        return allocated
+
+    def validate_records(self, records: Sequence[Mapping]) -> ValidationResult:
+        """
+        验证记录列表
+
+        Args:
+            records: 字典或CrawlRecord列表
+
+        Returns:
+            ValidationResult对象
+        """
+        size = len(records)
+        columns = {}
+        for field in dict.fromkeys(self.required_fields + self.optional_fields):
+            columns[field] = np.fromiter(map(methodcaller('get', field), records), dtype=object, count=size)
+        return self.validate_columns(columns, size)
+
+    def validate_frame(self, frame: pd.DataFrame) -> ValidationResult:
+        """
+        验证 DataFrame，缺失值（NaN/None）视为字段不存在
+
+        Args:
+            frame: 数据表
+
+        Returns:
+            ValidationResult对象
+        """
+        columns = {}
+        for field in dict.fromkeys(self.required_fields + self.optional_fields):
+            if field in frame.columns:
+                column = frame[field]
+                columns[field] = column.astype(object).where(column.notna(), None).to_numpy(dtype=object)
+        return self.validate_columns(columns, len(frame))
+
+    def validate_columns(self, columns: Dict[str, Any], size: Optional[int] = None) -> ValidationResult:
+        """
+        验证按列组织的数据
+
+        Args:
+            columns: {字段: 值序列}，缺少的字段视为全部为空
+            size: 行数，默认取第一列的长度
+
+        Returns:
+            ValidationResult对象
+        """
+        if size is None:
+            size = len(next(iter(columns.values()))) if columns else 0
+
+        prepared: Dict[str, _Column] = {}
+
+        def column_for(field: str) -> _Column:
+            if field not in prepared:
+                values = columns.get(field)
+                if values is None:
+                    values = np.full(size, None, dtype=object)
+                elif not isinstance(values, np.ndarray) or values.dtype != object:
+                    values = np.fromiter(values, dtype=object, count=size)
+                prepared[field] = _Column(values)
+            return prepared[field]
+
+        masks = np.zeros(size, dtype=np.uint64)
+        for field, required, bits in self._slots:
+            column = column_for(field)
+            if required:
+                missing = column.is_empty
+                self._set_bit(masks, missing, bits[MISSING])
+                checked = ~missing
+            else:
+                checked = ~column.is_none
+            if field in self.validation_rules:
+                self._check_rules(masks, field, column, checked, bits)
+
+        fields = self.required_fields + self.optional_fields
+        non_empty = {field: int((~column_for(field).is_empty).sum()) for field in fields}
+        return ValidationResult(masks, self.bits, fields, non_empty)
+
+    def _check_rules(self, masks: np.ndarray, field: str, column: _Column, checked: np.ndarray,
+                     bits: Dict[str, int]):
+        """对一列应用字段规则，每行最多设置一个错误位"""
+        rules = self.validation_rules[field]
+
+        # 字符串：长度 -> 正则模式
+        strings = checked & column.is_str
+        if strings.any():
+            if 'min_length' in rules:
+                failed = strings & (column.lengths < rules['min_length'])
+                self._set_bit(masks, failed, bits[TOO_SHORT])
+                strings &= ~failed
+            if 'max_length' in rules:
+                failed = strings & (column.lengths > rules['max_length'])
+                self._set_bit(masks, failed, bits[TOO_LONG])
+                strings &= ~failed
+            for pattern in self.patterns[field]:
+                rows = np.flatnonzero(strings)
+                if not len(rows):
+                    break
+                matched = np.fromiter(map(bool, map(pattern.search, column.values[rows])), dtype=bool, count=len(rows))
+                failed_rows = rows[~matched]
+                self._set_bit(masks, failed_rows, bits[PATTERN_MISMATCH])
+                strings[failed_rows] = False
+
+        # 数值：最小值 -> 最大值
+        numbers_mask = checked & column.is_num
+        if numbers_mask.any():
+            numbers = column.numbers()
+            if 'min_value' in rules:
+                failed = numbers_mask & (numbers < rules['min_value'])
+                self._set_bit(masks, failed, bits[BELOW_MIN])
+                numbers_mask &= ~failed
+            if 'max_value' in rules:
+                self._set_bit(masks, numbers_mask & (numbers > rules['max_value']), bits[ABOVE_MAX])
+
+    @staticmethod
+    def _set_bit(masks: np.ndarray, rows: np.ndarray, bit: int):
+        masks[rows] |= np.uint64(1 << bit)
@@ -0,0 +1,313 @@
+"""
+录制回放 - 把HTTP请求和响应录制到本地回放库，之后不访问网络按原样回放，使整次爬取可重复运行和测量
+"""
+
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from datetime import timedelta
+from typing import Dict, Any, Optional, Union
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import CASSETTE_CONFIG
+from crawler.http_utils import build_response
+
+
+class CassetteMiss(requests.exceptions.RequestException, ValueError):
+    """回放库中没有该请求（继承 ValueError，重试策略不会重试）"""
+
+
+class CassetteStore:
+    """
+    回放库
+
+    SQLite文件，每行是一次请求及其响应。同一请求可以有多条记录（如先503后200的重试），
+    按录制顺序编号，回放时依次返回。
+    """
+
+    def __init__(self, path: Path):
+        """
+        打开回放库，不存在时创建
+
+        Args:
+            path: SQLite数据库文件路径
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS interactions (
+                key TEXT,
+                seq INTEGER,
+                method TEXT,
+                url TEXT,
+                status INTEGER,
+                headers TEXT,
+                content BLOB,
+                elapsed REAL,
+                recorded_at REAL,
+                PRIMARY KEY (key, seq)
+            )
+        ''')
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(method: str, url: str) -> str:
+        """
+        生成请求键，URL先按 requests 的规则规范化，同步和异步请求得到相同的键
+
+        Args:
+            method: 请求方法
+            url: 请求URL（含查询参数）
+
+        Returns:
+            请求键
+        """
+        url = requests.Request(method, url).prepare().url
+        return hashlib.sha1(f"{method.upper()} {url}".encode('utf-8')).hexdigest()
+
+    def append(self, key: str, method: str, response: requests.Response, elapsed: float):
+        """
+        追加一条录制记录
+
+        Args:
+            key: 请求键
+            method: 请求方法
+            response: 响应对象
+            elapsed: 请求耗时（秒）
+        """
+        with self._lock:
+            seq = self._conn.execute('SELECT COUNT(*) FROM interactions WHERE key = ?', (key,)).fetchone()[0]
+            self._conn.execute(
+                'INSERT INTO interactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, seq, method.upper(), response.url, response.status_code,
+                 json.dumps(dict(response.headers), ensure_ascii=False), response.content or b'',
+                 elapsed, time.time())
+            )
+            self._conn.commit()
+
+    def load(self, key: str, seq: int) -> Optional[Dict[str, Any]]:
+        """
+        读取一条记录，序号超出录制次数时返回最后一条
+
+        Args:
+            key: 请求键
+            seq: 第几次请求，从0开始
+
+        Returns:
+            记录字典，没有该请求时返回None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT url, status, headers, content, elapsed FROM interactions '
+                'WHERE key = ? AND seq <= ? ORDER BY seq DESC LIMIT 1',
+                (key, seq)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'url': row[0], 'status': row[1], 'headers': json.loads(row[2]), 'content': row[3], 'elapsed': row[4]}
+
+    def clear(self):
+        """清空回放库"""
+        with self._lock:
+            self._conn.execute('DELETE FROM interactions')
+            self._conn.commit()
+
+    def count(self) -> int:
+        """录制的记录数"""
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM interactions').fetchone()[0]
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+class CassetteTransport:
+    """
+    录制/回放传输层
+
+    通过 requests 的传输适配器挂载到 BaseCrawler.session，异步请求由 BaseCrawler 转交给本对象：
+    - record: 正常访问网络，把每次请求和响应（含非200响应）写入回放库
+    - replay: 只从回放库返回响应，按配置模拟延迟，不访问网络；没有录制的请求抛出 CassetteMiss
+    请求超时等异常没有响应，不会被录制。
+    """
+
+    MODES = ('record', 'replay')
+
+    def __init__(self, store: CassetteStore, mode: str, latency: Union[str, float, None] = None,
+                 latency_scale: Optional[float] = None):
+        """
+        初始化传输层
+
+        Args:
+            store: 回放库
+            mode: record/replay
+            latency: 回放延迟，'recorded' 按录制时的耗时，数字为固定秒数，默认使用 CASSETTE_CONFIG['latency']
+            latency_scale: 按录制耗时模拟时的倍率，默认使用 CASSETTE_CONFIG['latency_scale']
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"不支持的录制回放模式: {mode}，可选 {self.MODES}")
+        self.store = store
+        self.mode = mode
+        self.latency = latency if latency is not None else CASSETTE_CONFIG['latency']
+        self.latency_scale = latency_scale if latency_scale is not None else CASSETTE_CONFIG['latency_scale']
+        self.stats = {'recorded': 0, 'replayed': 0, 'misses': 0}
+        self._replay_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if mode == 'record':
+            # 每次录制都重新开始，回放库只反映最近一次爬取
+            store.clear()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+
+    def adapter(self) -> BaseAdapter:
+        """供 requests.Session.mount 使用的传输适配器"""
+        return ReplayAdapter(self) if self.replaying else RecordingAdapter(self)
+
+    def mount(self, session: requests.Session):
+        """挂载到会话的 http:// 和 https:// 前缀"""
+        adapter = self.adapter()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+    def record(self, method: str, url: str, response: requests.Response, elapsed: float):
+        """
+        录制一次请求
+
+        Args:
+            method: 请求方法
+            url: 请求URL
+            response: 响应对象
+            elapsed: 请求耗时（秒）
+        """
+        self.store.append(self.store.make_key(method, url), method, response, elapsed)
+        with self._lock:
+            self.stats['recorded'] += 1
+
+    def _next_entry(self, method: str, url: str) -> Dict[str, Any]:
+        """按请求次数取出下一条录制记录"""
+        key = self.store.make_key(method, url)
+        with self._lock:
+            seq = self._replay_counts.get(key, 0)
+            self._replay_counts[key] = seq + 1
+        entry = self.store.load(key, seq)
+        with self._lock:
+            self.stats['replayed' if entry else 'misses'] += 1
+        if entry is None:
+            raise CassetteMiss(f"回放库中没有该请求: {method.upper()} {url}")
+        return entry
+
+    def _delay(self, entry: Dict[str, Any]) -> float:
+        if self.latency == 'recorded':
+            return (entry['elapsed'] or 0) * self.latency_scale
+        return float(self.latency or 0)
+
+    @staticmethod
+    def _to_response(entry: Dict[str, Any], delay: float) -> requests.Response:
+        response = build_response(entry['url'], entry['status'], entry['headers'], entry['content'])
+        response.elapsed = timedelta(seconds=delay)
+        return response
+
+    def replay(self, method: str, url: str) -> requests.Response:
+        """
+        回放一次请求（同步，按模拟延迟阻塞）
+
+        Args:
+            method: 请求方法
+            url: 请求URL
+
+        Returns:
+            录制的响应
+        """
+        entry = self._next_entry(method, url)
+        delay = self._delay(entry)
+        if delay > 0:
+            time.sleep(delay)
+        return self._to_response(entry, delay)
+
+    async def async_replay(self, method: str, url: str) -> requests.Response:
+        """回放一次请求（异步，模拟延迟期间不阻塞事件循环）"""
+        entry = self._next_entry(method, url)
+        delay = self._delay(entry)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self._to_response(entry, delay)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            模式、回放库路径、录制/回放/未命中次数
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        return {'mode': self.mode, 'path': str(self.store.path), **stats}
+
+    def close(self):
+        """关闭回放库"""
+        self.store.close()
+
+
+class RecordingAdapter(HTTPAdapter):
+    """正常发送请求并录制响应的适配器"""
+
+    def __init__(self, transport: CassetteTransport):
+        super().__init__()
+        self.transport = transport
+
+    def send(self, request, **kwargs):
+        started = time.perf_counter()
+        response = super().send(request, **kwargs)
+        if not kwargs.get('stream'):
+            # 读取响应体后 requests 会缓存内容，调用方照常使用
+            response.content
+            self.transport.record(request.method, request.url, response, time.perf_counter() - started)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """只从回放库返回响应、不访问网络的适配器"""
+
+    def __init__(self, transport: CassetteTransport):
+        super().__init__()
+        self.transport = transport
+
+    def send(self, request, **kwargs):
+        response = self.transport.replay(request.method, request.url)
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def open_cassette(mode: str, name: Optional[str] = None) -> CassetteTransport:
+    """
+    按配置打开回放库并创建传输层
+
+    Args:
+        mode: record/replay
+        name: 回放库名称，默认使用 CASSETTE_CONFIG['name']
+
+    Returns:
+        CassetteTransport对象
+    """
+    path = Path(CASSETTE_CONFIG['dir']) / f"{name or CASSETTE_CONFIG['name']}.sqlite3"
+    if mode == 'replay' and not path.exists():
+        raise FileNotFoundError(f"回放库不存在: {path}，请先用录制模式爬取一次")
+    return CassetteTransport(CassetteStore(path), mode)
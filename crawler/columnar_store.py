@@ -0,0 +1,305 @@
+"""
+列式存储 - 按平台和爬取日期分区的Parquet数据集
+"""
+
+import uuid
+from collections.abc import Mapping
+from datetime import datetime, date
+from pathlib import Path
+from typing import List, Any, Optional, Iterable, Iterator, Sequence, Union
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import STORAGE_CONFIG
+
+# 字段类型，与 guidance/数据字段模板.md 一致；platform 和 crawl_date 为分区列
+FIELD_TYPES = {
+    'platform': 'string',
+    'crawl_time': 'timestamp',
+    'title': 'string',
+    'content': 'string',
+    'product_type': 'string',
+    'tags': 'list',
+    'likes': 'int',
+    'comments_count': 'int',
+    'shares': 'int',
+    'sales': 'int',
+    'price': 'float',
+    'publish_date': 'date',
+    'clean_text': 'string',
+    'sentiment': 'string',
+    'keywords': 'list',
+    'source_url': 'string',
+}
+
+PARTITION_FIELDS = ('platform', 'crawl_date')
+
+
+def _require_pyarrow():
+    """导入 pyarrow，未安装时给出明确提示"""
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("列式存储需要安装 pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def build_schema():
+    """
+    构建数据集的显式schema
+
+    Returns:
+        pyarrow.Schema，包含 DATA_SCHEMA 字段和 crawl_date 分区列
+    """
+    pa = _require_pyarrow()
+    arrow_types = {
+        'string': pa.string(),
+        'timestamp': pa.timestamp('s'),
+        'list': pa.list_(pa.string()),
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'date': pa.date32(),
+    }
+    fields = [pa.field(name, arrow_types[kind]) for name, kind in FIELD_TYPES.items()]
+    fields.append(pa.field('crawl_date', pa.string()))
+    return pa.schema(fields)
+
+
+def _to_int(value: Any) -> Optional[int]:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(float(str(value).replace(',', '')))
+    except ValueError:
+        return None
+
+
+def _to_float(value: Any) -> Optional[float]:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace(',', ''))
+    except ValueError:
+        return None
+
+
+def _to_timestamp(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    if not value:
+        return None
+    try:
+        return datetime.strptime(str(value)[:19], '%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        return None
+
+
+def _to_date(value: Any) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not value:
+        return None
+    try:
+        return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def _to_list(value: Any) -> Optional[List[str]]:
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value if v is not None]
+    return [str(value)]
+
+
+def _to_string(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+_CONVERTERS = {
+    'string': _to_string,
+    'timestamp': _to_timestamp,
+    'list': _to_list,
+    'int': _to_int,
+    'float': _to_float,
+    'date': _to_date,
+}
+
+
+class ColumnarStore:
+    """
+    Parquet分区数据集
+
+    目录结构为 {root}/platform=小红书/crawl_date=2024-12-10/part-*.parquet（分区值按URL编码），
+    每次写入生成新的文件，不修改已有文件。读取时分区条件只打开命中的目录，
+    其他条件下推到Parquet行组统计信息，只读取需要的列。
+    只保存 DATA_SCHEMA 字段，字段类型固定，不会因某一批数据为空而变化。
+    """
+
+    def __init__(self, root: Union[str, Path], compression: Optional[str] = None,
+                 batch_size: Optional[int] = None):
+        """
+        初始化数据集
+
+        Args:
+            root: 数据集根目录
+            compression: Parquet压缩算法，默认使用 STORAGE_CONFIG['compression']
+            batch_size: 每个记录批次的条数，默认使用 STORAGE_CONFIG['batch_size']
+        """
+        self.root = Path(root)
+        self.compression = compression or STORAGE_CONFIG['compression']
+        self.batch_size = batch_size or STORAGE_CONFIG['batch_size']
+        self.schema = build_schema()
+
+    def _partitioning(self):
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        return ds.partitioning(pa.schema([self.schema.field(name) for name in PARTITION_FIELDS]), flavor='hive')
+
+    def _to_batches(self, records: Iterable[Mapping]) -> Iterator[Any]:
+        """把记录按批次转换为 RecordBatch"""
+        import pyarrow as pa
+
+        names = list(FIELD_TYPES)
+        converters = [_CONVERTERS[FIELD_TYPES[name]] for name in names]
+        crawl_time_index = names.index('crawl_time')
+
+        columns = [[] for _ in names]
+        crawl_dates = []
+        for record in records:
+            for column, name, convert in zip(columns, names, converters):
+                column.append(convert(record.get(name)))
+            crawl_time = columns[crawl_time_index][-1]
+            crawl_dates.append(crawl_time.strftime('%Y-%m-%d') if crawl_time else 'unknown')
+
+            if len(crawl_dates) >= self.batch_size:
+                yield pa.RecordBatch.from_arrays(
+                    [pa.array(c, type=f.type) for c, f in zip(columns + [crawl_dates], self.schema)],
+                    schema=self.schema
+                )
+                columns = [[] for _ in names]
+                crawl_dates = []
+
+        if crawl_dates:
+            yield pa.RecordBatch.from_arrays(
+                [pa.array(c, type=f.type) for c, f in zip(columns + [crawl_dates], self.schema)],
+                schema=self.schema
+            )
+
+    def write(self, records: Iterable[Mapping]) -> int:
+        """
+        写入记录，按平台和爬取日期分区
+
+        Args:
+            records: 记录（字典或CrawlRecord）的列表或生成器
+
+        Returns:
+            写入条数
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        written = 0
+
+        def counted_batches():
+            nonlocal written
+            for batch in self._to_batches(records):
+                written += batch.num_rows
+                yield batch
+
+        token = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        file_format = ds.ParquetFileFormat()
+        ds.write_dataset(
+            pa.RecordBatchReader.from_batches(self.schema, counted_batches()),
+            self.root,
+            format=file_format,
+            partitioning=self._partitioning(),
+            basename_template=f"part-{token}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore',
+            file_options=file_format.make_write_options(compression=self.compression),
+        )
+        return written
+
+    def dataset(self):
+        """
+        打开数据集
+
+        Returns:
+            pyarrow.dataset.Dataset
+        """
+        import pyarrow.dataset as ds
+        return ds.dataset(self.root, schema=self.schema, format='parquet', partitioning=self._partitioning())
+
+    def scan(self, columns: Optional[Sequence[str]] = None, filters: Any = None):
+        """
+        读取为 Arrow 表
+
+        Args:
+            columns: 需要的列，None表示全部
+            filters: 过滤条件，可以是 pyarrow 表达式，或 pandas/pyarrow 风格的元组列表，
+                     如 [('platform', '==', '小红书'), ('crawl_date', '>=', '2024-12-01')]
+
+        Returns:
+            pyarrow.Table
+        """
+        import pyarrow.parquet as pq
+
+        if not self.root.exists():
+            return self.schema.empty_table().select(list(columns) if columns else self.schema.names)
+
+        if isinstance(filters, (list, tuple)):
+            filters = pq.filters_to_expression(filters) if filters else None
+        return self.dataset().to_table(columns=list(columns) if columns else None, filter=filters)
+
+    def read(self, columns: Optional[Sequence[str]] = None, filters: Any = None):
+        """
+        读取为 DataFrame，参数同 scan；整数列使用可空整数类型，缺失值不会把列变成浮点
+
+        Returns:
+            pandas.DataFrame
+        """
+        import pandas as pd
+        import pyarrow as pa
+
+        return self.scan(columns, filters).to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+
+
+def get_dataset(kind: str = 'raw') -> ColumnarStore:
+    """
+    获取项目数据集
+
+    Args:
+        kind: raw（原始数据）或 cleaned（清理后数据）
+
+    Returns:
+        ColumnarStore对象
+    """
+    return ColumnarStore(STORAGE_CONFIG[f'{kind}_dataset_dir'])
+
+
+def load_dataset(kind: str = 'raw', columns: Optional[Sequence[str]] = None, filters: Any = None):
+    """
+    读取项目数据集，供分析和可视化使用
+
+    Args:
+        kind: raw（原始数据）或 cleaned（清理后数据）
+        columns: 需要的列
+        filters: 过滤条件，见 ColumnarStore.scan
+
+    Returns:
+        pandas.DataFrame
+    """
+    return get_dataset(kind).read(columns, filters)
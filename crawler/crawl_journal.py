@@ -0,0 +1,166 @@
+"""
+爬取日志 - 逐页追加写入的预写日志，支持中断后恢复
+"""
+
+import os
+import json
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+
+class CrawlJournal:
+    """
+    爬取预写日志
+
+    每完成一个(平台, 关键词, 页码)就追加一行JSON并落盘，记录该页解析出的数据。
+    进程崩溃或被中断后，可以用同一个日志文件恢复：已完成的页直接从日志读取，不再请求。
+    内存中只保存每页在文件中的偏移量和条数，数据在恢复该页时才从文件读取，内存占用不随爬取规模增长。
+    """
+
+    def __init__(self, path: Path, fsync: bool = True):
+        """
+        打开日志文件，已有内容会被加载
+
+        Args:
+            path: 日志文件路径(JSONL)
+            fsync: 每次写入后是否强制落盘
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        self.completed = False
+
+        # (平台, 关键词, 页码) -> (该页日志行的偏移量, 数据条数)
+        self._pages: Dict[Tuple[str, str, int], Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._load()
+        self._file = open(self.path, 'ab')
+
+    def _load(self):
+        """加载已有日志；崩溃时写了一半的末尾行被截掉，之后追加的记录从新的一行开始"""
+        if not self.path.exists():
+            return
+
+        valid_end = 0
+        with open(self.path, 'rb') as f:
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break
+                offset = valid_end
+                valid_end += len(raw)
+                line = raw.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                if entry.get('type') == 'page':
+                    key = (entry['platform'], entry['keyword'], entry['page'])
+                    self._pages[key] = (offset, len(entry['items']))
+                elif entry.get('type') == 'complete':
+                    self.completed = True
+
+        if valid_end < self.path.stat().st_size:
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_end)
+
+    def _append(self, entry: Dict[str, Any]) -> int:
+        """追加一条日志并落盘，返回该行的偏移量"""
+        line = json.dumps(entry, ensure_ascii=False, default=str).encode('utf-8') + b'\n'
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+        return offset
+
+    def is_done(self, platform: str, keyword: str, page: int) -> bool:
+        """判断某页是否已经完成"""
+        return (platform, keyword, page) in self._pages
+
+    def get_page(self, platform: str, keyword: str, page: int) -> List[Dict[str, Any]]:
+        """获取已完成页的数据，从日志文件中读取"""
+        location = self._pages.get((platform, keyword, page))
+        if location is None:
+            return []
+        with open(self.path, 'rb') as f:
+            f.seek(location[0])
+            return json.loads(f.readline())['items']
+
+    def record_page(self, platform: str, keyword: str, page: int, items: List[Dict[str, Any]]):
+        """
+        记录一页已完成
+
+        Args:
+            platform: 平台名称
+            keyword: 搜索关键词
+            page: 页码
+            items: 该页解析出的数据
+        """
+        offset = self._append({
+            'type': 'page',
+            'platform': platform,
+            'keyword': keyword,
+            'page': page,
+            'items': [dict(item) for item in items],
+            'ts': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        })
+        self._pages[(platform, keyword, page)] = (offset, len(items))
+
+    def mark_complete(self):
+        """标记本次爬取已完整结束，之后不会再被恢复"""
+        self._append({'type': 'complete', 'ts': datetime.now().strftime('%Y-%m-%d %H:%M:%S')})
+        self.completed = True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取日志统计
+
+        Returns:
+            已完成页数和数据条数
+        """
+        return {
+            '已完成页数': len(self._pages),
+            '数据条数': sum(count for _, count in self._pages.values()),
+        }
+
+    def close(self):
+        """关闭日志文件"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    @staticmethod
+    def find_resumable(journal_dir: Path) -> Optional[Path]:
+        """
+        查找最近一个未完成的日志文件
+
+        Args:
+            journal_dir: 日志目录
+
+        Returns:
+            日志文件路径，没有可恢复的日志时返回None
+        """
+        journal_dir = Path(journal_dir)
+        if not journal_dir.exists():
+            return None
+
+        for path in sorted(journal_dir.glob('crawl_*.jsonl'), reverse=True):
+            last_line = ''
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        last_line = line
+            try:
+                if json.loads(last_line).get('type') == 'complete':
+                    continue
+            except json.JSONDecodeError:
+                pass
+            return path
+
+        return None
@@ -0,0 +1,183 @@
+"""
+爬取记录 - 按 DATA_SCHEMA 定长存储的紧凑记录类型
+"""
+
+import sys
+import time
+from collections.abc import MutableMapping
+from datetime import datetime
+from typing import Dict, Any, Iterator, Optional
+import os
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import DATA_SCHEMA
+
+# 记录字段顺序与原先标准化字典的键顺序一致
+SCHEMA_FIELDS = ('platform', 'crawl_time') + tuple(
+    field for field in DATA_SCHEMA['required_fields'] + DATA_SCHEMA['optional_fields']
+    if field not in ('platform', 'crawl_time')
+)
+
+_SLOT_FIELDS = frozenset(SCHEMA_FIELDS)
+
+# 取值集中、重复率高的字段，驻留后所有记录共享同一个字符串对象
+INTERNED_FIELDS = ('platform', 'product_type', 'publish_date')
+
+# 已删除字段的占位
+_DELETED = object()
+
+
+class CrawlRecord(MutableMapping):
+    """
+    爬取记录
+
+    DATA_SCHEMA 字段存放在 __slots__ 中，不再为每条数据创建一个包含全部字段的字典；
+    字段以外的键存放在按需创建的 extras 字典中。
+    对外提供与字典相同的映射接口，校验、清理和输出代码无需区分记录和字典。
+    """
+
+    __slots__ = SCHEMA_FIELDS + ('extras',)
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, **kwargs):
+        """
+        初始化记录，未提供的字段为None
+
+        Args:
+            data: 初始数据
+            **kwargs: 初始数据
+        """
+        for field in SCHEMA_FIELDS:
+            setattr(self, field, None)
+        self.extras = None
+        if data:
+            self.update(data)
+        if kwargs:
+            self.update(kwargs)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _SLOT_FIELDS:
+            value = getattr(self, key)
+            if value is not _DELETED:
+                return value
+        elif self.extras and key in self.extras:
+            return self.extras[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key in _SLOT_FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extras is None:
+                self.extras = {}
+            self.extras[key] = value
+
+    def __delitem__(self, key: str):
+        if key in _SLOT_FIELDS and getattr(self, key) is not _DELETED:
+            setattr(self, key, _DELETED)
+        elif self.extras and key in self.extras:
+            del self.extras[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        if key in _SLOT_FIELDS:
+            return getattr(self, key) is not _DELETED
+        return bool(self.extras) and key in self.extras
+
+    def __iter__(self) -> Iterator[str]:
+        for field in SCHEMA_FIELDS:
+            if getattr(self, field) is not _DELETED:
+                yield field
+        if self.extras:
+            yield from self.extras
+
+    def __len__(self) -> int:
+        count = sum(1 for field in SCHEMA_FIELDS if getattr(self, field) is not _DELETED)
+        return count + (len(self.extras) if self.extras else 0)
+
+    def __repr__(self) -> str:
+        return f"CrawlRecord({dict(self)!r})"
+
+    def copy(self) -> 'CrawlRecord':
+        """浅拷贝"""
+        record = CrawlRecord.__new__(CrawlRecord)
+        for field in SCHEMA_FIELDS:
+            setattr(record, field, getattr(self, field))
+        record.extras = dict(self.extras) if self.extras else None
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为普通字典"""
+        return dict(self)
+
+    def __getstate__(self):
+        return tuple(getattr(self, field) for field in SCHEMA_FIELDS), self.extras
+
+    def __setstate__(self, state):
+        values, extras = state
+        for field, value in zip(SCHEMA_FIELDS, values):
+            if field in INTERNED_FIELDS and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, field, value)
+        self.extras = extras
+
+
+class RecordBuilder:
+    """
+    记录构建器
+
+    同一秒内构建的记录共享一个 crawl_time 字符串（与逐条格式化的结果相同，
+    但每秒只格式化一次），平台名、产品分类等重复值驻留为同一个对象。
+    """
+
+    def __init__(self, platform: str):
+        """
+        初始化构建器
+
+        Args:
+            platform: 平台显示名称
+        """
+        self.platform = sys.intern(platform)
+        self.crawl_time = None
+        self._crawl_second = None
+
+    def current_crawl_time(self) -> str:
+        """
+        当前爬取时间字符串，同一秒内返回同一个对象
+
+        Returns:
+            格式为 %Y-%m-%d %H:%M:%S 的时间
+        """
+        now = int(time.time())
+        if now != self._crawl_second:
+            self._crawl_second = now
+            self.crawl_time = datetime.fromtimestamp(now).strftime('%Y-%m-%d %H:%M:%S')
+        return self.crawl_time
+
+    def build(self, raw_data: Dict[str, Any]) -> CrawlRecord:
+        """
+        由原始数据构建记录，只保留 DATA_SCHEMA 字段
+
+        Args:
+            raw_data: 原始数据
+
+        Returns:
+            CrawlRecord对象
+        """
+        crawl_time = self.current_crawl_time()
+        record = CrawlRecord.__new__(CrawlRecord)
+        record.extras = None
+        for field in SCHEMA_FIELDS:
+            value = raw_data.get(field)
+            if field in INTERNED_FIELDS and isinstance(value, str):
+                value = sys.intern(value)
+            elif field == 'tags' and isinstance(value, list):
+                value = [sys.intern(tag) if isinstance(tag, str) else tag for tag in value]
+            setattr(record, field, value)
+
+        # 原始数据未提供平台时使用构建器的平台名
+        if record.platform is None:
+            record.platform = self.platform
+        record.crawl_time = crawl_time
+        return record
@@ -3,10 +3,14 @@
 """
 
 import time
+import asyncio
 import logging
+import threading
+from collections import deque
+from contextlib import ExitStack
 from typing import Dict, List, Any, Optional
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 import sys
 import os
 
@@ -15,7 +19,19 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from crawler.taobao_crawler import TaobaoCrawler
 from crawler.xiaohongshu_crawler import XiaoHongShuCrawler
 from crawler.data_validator import DataValidator
-from config import PLATFORMS
+from crawler.task_scheduler import CrawlTask, TaskScheduler
+from crawler.response_cache import get_response_cache
+from crawler.crawl_journal import CrawlJournal
+from crawler.record_sink import CsvSink, open_sink
+from crawler.parse_pool import ParsePool
+from crawler.columnar_store import get_dataset
+from crawler.dedup_index import DedupIndex
+from crawler.watermark import WatermarkStore
+from crawler.metrics import get_metrics
+from crawler.profiler import NullProfiler, StageProfiler
+from crawler.cassette import CassetteTransport, open_cassette
+from crawler.response_archive import ResponseArchive
+from config import PLATFORMS, SCHEDULER_CONFIG, CASSETTE_CONFIG, ARCHIVE_CONFIG, JOURNAL_CONFIG, SINK_CONFIG, DEDUP_CONFIG, INCREMENTAL_CONFIG, METRICS_CONFIG, PROFILE_CONFIG, PARSE_POOL_CONFIG, STORAGE_CONFIG, RAW_DATA_DIR
 
 class CrawlerManager:
     """
@@ -25,7 +41,13 @@ class CrawlerManager:
     
     def __init__(self):
         self.validator = DataValidator()
+        self.metrics = get_metrics()
         self.crawlers = {}
+        self.journal = None
+        self.parse_pool = None
+        self.transport = None
+        self.archive = None
+        self.profiler = NullProfiler()
         self.setup_logging()
         self.initialize_crawlers()
         
@@ -63,13 +85,303 @@ class CrawlerManager:
         # except Exception as e:
         #     self.logger.error(f"❌ 抖音爬虫初始化失败: {e}")
     
-    def crawl_platform(self, platform: str, max_pages_per_keyword: int = 2) -> List[Dict[str, Any]]:
+    def open_journal(self, resume: bool = False) -> CrawlJournal:
+        """
+        打开爬取日志并挂载到所有爬虫
+        
+        Args:
+            resume: 是否恢复最近一次未完成的爬取
+            
+        Returns:
+            爬取日志对象
+        """
+        path = CrawlJournal.find_resumable(JOURNAL_CONFIG['dir']) if resume else None
+        if path:
+            self.logger.info(f"从日志恢复爬取: {path}")
+        else:
+            if resume:
+                self.logger.info("没有可恢复的爬取日志，开始新的爬取")
+            path = Path(JOURNAL_CONFIG['dir']) / f"crawl_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        
+        self.journal = CrawlJournal(path, fsync=JOURNAL_CONFIG['fsync'])
+        for crawler in self.crawlers.values():
+            crawler.journal = self.journal
+        
+        stats = self.journal.get_stats()
+        if stats['已完成页数']:
+            self.logger.info(f"日志中已完成 {stats['已完成页数']} 页, {stats['数据条数']} 条数据")
+        return self.journal
+    
+    def close_journal(self, completed: bool = True):
+        """
+        关闭爬取日志
+        
+        Args:
+            completed: 本次爬取是否完整结束，完整结束的日志不会再被恢复
+        """
+        if not self.journal:
+            return
+        if completed:
+            self.journal.mark_complete()
+        self.journal.close()
+        for crawler in self.crawlers.values():
+            crawler.journal = None
+        self.journal = None
+    
+    def open_cassette(self, mode: str, name: Optional[str] = None) -> CassetteTransport:
+        """
+        打开回放库，以录制或回放模式挂载到所有爬虫的会话
+        
+        Args:
+            mode: record 录制本次爬取的请求和响应；replay 只从回放库返回响应，不访问网络
+            name: 回放库名称，默认使用 CASSETTE_CONFIG['name']
+            
+        Returns:
+            CassetteTransport对象
+        """
+        self.transport = open_cassette(mode, name)
+        for crawler in self.crawlers.values():
+            crawler.use_transport(self.transport)
+        action = '录制到' if mode == 'record' else '从回放库回放'
+        self.logger.info(f"请求{action}: {self.transport.store.path}")
+        return self.transport
+    
+    def close_cassette(self):
+        """关闭回放库，恢复直接访问网络"""
+        if not self.transport:
+            return
+        stats = self.transport.get_stats()
+        self.transport.close()
+        for crawler in self.crawlers.values():
+            crawler.use_transport(None)
+        self.transport = None
+        self.logger.info(f"回放库已关闭: 录制 {stats['recorded']} 次, 回放 {stats['replayed']} 次, "
+                         f"未命中 {stats['misses']} 次")
+    
+    def open_archive(self, directory: Optional[Path] = None) -> ResponseArchive:
+        """
+        打开响应归档并挂载到所有爬虫，之后抓取到的每个搜索页都写入归档
+        
+        Args:
+            directory: 归档目录，默认使用 ARCHIVE_CONFIG['dir']
+            
+        Returns:
+            响应归档对象
+        """
+        self.archive = ResponseArchive(directory)
+        for crawler in self.crawlers.values():
+            crawler.archive = self.archive
+        self.logger.info(f"原始响应写入归档: {self.archive.directory} (压缩算法 {self.archive.codec})")
+        return self.archive
+    
+    def close_archive(self):
+        """关闭响应归档"""
+        if not self.archive:
+            return
+        self.archive.close()
+        for crawler in self.crawlers.values():
+            crawler.archive = None
+        self.archive = None
+    
+    def reparse_archive(self, directory: Optional[Path] = None, platform: Optional[str] = None,
+                        keyword: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+                        latest: bool = False, max_workers: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        用当前解析器重新解析响应归档，不访问网络
+        
+        各页在解析进程池中并行解析，结果按抓取顺序去重后按平台清洗，
+        crawl_time 使用原始页面的抓取时间。以往爬取已采集的条目同样重新解析，不受已采集库和水位影响。
+        
+        Args:
+            directory: 归档目录，默认使用 ARCHIVE_CONFIG['dir']
+            platform: 只解析该平台
+            keyword: 只解析该关键词
+            since: 抓取时间下限（含）
+            until: 抓取时间上限（不含）
+            latest: 同一页只解析最近一次抓取
+            max_workers: 解析进程数，默认使用 PARSE_POOL_CONFIG['max_workers']（None为CPU核数）
+            
+        Returns:
+            平台数据字典
+        """
+        archive = ResponseArchive(directory)
+        entries = [entry for entry in archive.query(platform, keyword, since, until, latest)
+                   if entry['platform'] in self.crawlers]
+        # 按抓取顺序解析，去重时保留的记录与原始爬取一致
+        entries.sort(key=lambda entry: (entry['fetched_at'], entry['id']))
+        platforms = list(dict.fromkeys(entry['platform'] for entry in entries))
+        self.logger.info(f"重新解析归档: {len(entries)} 页, 平台 {platforms}")
+        
+        dedup_indexes = {name: DedupIndex() for name in platforms} if DEDUP_CONFIG['enabled'] else {}
+        raw_data = {name: [] for name in platforms}
+        
+        def collect(entry: Dict[str, Any], future):
+            try:
+                page_data = future.result()
+            except Exception as e:
+                self.logger.error(f"重新解析 {entry['platform']} '{entry['keyword']}' 第 {entry['page']} 页失败: {e}")
+                return
+            crawler = self.crawlers[entry['platform']]
+            if entry['platform'] in dedup_indexes:
+                page_data = dedup_indexes[entry['platform']].filter(page_data, entry['keyword'], crawler.get_item_key)
+            crawl_time = entry['fetched_at'][:19].replace('T', ' ')
+            for record in page_data:
+                record['crawl_time'] = crawl_time
+            raw_data[entry['platform']].extend(page_data)
+        
+        with ParsePool(max_workers) as pool:
+            # 在途页数有上限，不把整个归档的响应体同时放进内存
+            pending = deque()
+            for entry in entries:
+                response = archive.read_response(entry)
+                crawler = self.crawlers[entry['platform']]
+                # 回填需要重新解析以往已采集的条目，不按已采集库和水位跳过
+                pending.append((entry, pool.submit(crawler, response, entry['keyword'], entry['page'],
+                                                   save_debug_pages=False, incremental=False)))
+                if len(pending) >= pool.max_workers * 4:
+                    collect(*pending.popleft())
+            while pending:
+                collect(*pending.popleft())
+        archive.close()
+        
+        platform_data = {}
+        for name, data in raw_data.items():
+            platform_data[name] = self.validator.clean_dataset(data, name) if data else []
+            self.logger.info(f"{name} 平台: 重新解析 {len(data)} 条, 有效数据 {len(platform_data[name])} 条")
+        return platform_data
+    
+    def load_dedup_indexes(self):
+        """为每个平台加载持久化的去重索引，以往爬取过的数据不再重复采集"""
+        for platform, crawler in self.crawlers.items():
+            path = DEDUP_CONFIG['dir'] / f"{platform}.idx"
+            crawler.dedup_index = DedupIndex(path)
+            self.logger.info(f"{platform} 去重索引已加载 {len(crawler.dedup_index)} 个键: {path}")
+    
+    def save_dedup_indexes(self):
+        """
+        保存去重索引
+        
+        应在数据保存之后调用：中途失败时不保存，下次爬取会重新采集这些数据而不是丢失。
+        """
+        for crawler in self.crawlers.values():
+            if crawler.dedup_index is not None:
+                crawler.dedup_index.save()
+    
+    def save_seen_stores(self):
+        """
+        把本次采集的ID写入各平台的已采集库，之后的爬取会跳过这些数据
+        
+        与去重索引一样应在数据保存之后调用。
+        """
+        for platform, crawler in self.crawlers.items():
+            if crawler.seen_store is not None:
+                crawler.seen_store.save()
+                self.logger.info(f"{platform} 已采集库: {crawler.seen_store.get_stats()}")
+    
+    def open_watermarks(self):
+        """为每个平台加载增量水位，开启增量爬取（每次爬取重新加载，停止状态不沿用）"""
+        for platform, crawler in self.crawlers.items():
+            crawler.watermarks = WatermarkStore(INCREMENTAL_CONFIG['dir'] / f"{platform}.json")
+            self.logger.info(f"{platform} 增量模式: {crawler.watermarks.get_stats()['水位关键词数']} 个关键词有水位")
+    
+    def save_watermarks(self):
+        """保存本次采集后的增量水位，与去重索引一样应在数据保存之后调用"""
+        for crawler in self.crawlers.values():
+            if crawler.watermarks is not None:
+                crawler.watermarks.save()
+    
+    def open_sinks(self, timestamp: Optional[str] = None):
+        """
+        为每个平台打开原始数据输出流，爬取过程中逐页写出
+        
+        Args:
+            timestamp: 文件名中的时间戳，不提供则自动生成
+        """
+        timestamp = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
+        for platform, crawler in self.crawlers.items():
+            path = RAW_DATA_DIR / f"{platform}_{timestamp}_stream.{SINK_CONFIG['format']}"
+            crawler.sink = open_sink(path)
+            self.logger.info(f"{platform} 原始数据流式输出到: {path}")
+    
+    def close_sinks(self):
+        """关闭所有输出流，写入剩余数据"""
+        for crawler in self.crawlers.values():
+            if crawler.sink:
+                crawler.sink.close()
+                crawler.sink = None
+    
+    def open_parse_pool(self) -> ParsePool:
+        """
+        启动解析进程池并挂载到所有爬虫
+        
+        Returns:
+            解析进程池对象
+        """
+        self.parse_pool = ParsePool()
+        for crawler in self.crawlers.values():
+            crawler.parse_pool = self.parse_pool
+        self.logger.info(f"页面解析交给进程池，工作进程数: {self.parse_pool.max_workers}")
+        return self.parse_pool
+    
+    def close_parse_pool(self, cancel: bool = False):
+        """
+        关闭解析进程池，等待工作进程退出
+        
+        Args:
+            cancel: 是否取消排队中尚未开始的解析任务（爬取出错或被中断时）
+        """
+        if not self.parse_pool:
+            return
+        self.parse_pool.close(cancel=cancel)
+        for crawler in self.crawlers.values():
+            crawler.parse_pool = None
+        self.parse_pool = None
+    
+    def enable_profiling(self, output_dir: Optional[Path] = None) -> StageProfiler:
+        """
+        开启分阶段性能剖析（请求、解析、验证、清洗、保存），并挂载到所有爬虫
+        
+        Args:
+            output_dir: 剖析结果目录，不提供则在 PROFILE_CONFIG['dir'] 下按时间戳创建
+            
+        Returns:
+            剖析器对象
+        """
+        output_dir = output_dir or PROFILE_CONFIG['dir'] / datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.profiler = StageProfiler(output_dir)
+        for crawler in self.crawlers.values():
+            crawler.profiler = self.profiler
+        self.logger.info(f"已开启性能剖析，结果目录: {output_dir}")
+        return self.profiler
+    
+    def finish_profiling(self, report: Optional[Dict[str, Any]] = None) -> Dict[str, Path]:
+        """
+        写出剖析结果并关闭剖析
+        
+        Args:
+            report: 爬取报告，与剖析结果保存在同一目录
+            
+        Returns:
+            {文件类型或阶段名: 路径}，未开启剖析时为空
+        """
+        if not self.profiler.enabled:
+            return {}
+        paths = self.profiler.write(report)
+        self.profiler.close()
+        self.profiler = NullProfiler()
+        for crawler in self.crawlers.values():
+            crawler.profiler = self.profiler
+        self.logger.info(f"性能剖析结果已保存到: {paths['report'].parent}")
+        return paths
+    
+    def crawl_platform(self, platform: str, max_pages_per_keyword: int = 2, use_async: bool = False) -> List[Dict[str, Any]]:
         """
         爬取单个平台数据
         
         Args:
             platform: 平台名称 (taobao/xiaohongshu/douyin)
             max_pages_per_keyword: 每个关键词的最大页数
+            use_async: 是否使用异步引擎（多页同时在途）
             
         Returns:
             平台数据列表
@@ -83,12 +395,18 @@ class CrawlerManager:
         
         try:
             crawler = self.crawlers[platform]
-            data = crawler.crawl_all_keywords(max_pages_per_keyword)
+            if use_async:
+                data = asyncio.run(crawler.async_crawl_all_keywords(max_pages_per_keyword))
+            else:
+                data = crawler.crawl_all_keywords(max_pages_per_keyword)
             
             # 数据验证和清理
             if data:
-                validated_data = self.validator.clean_dataset(data)
+                with self.profiler.stage('clean'):
+                    validated_data = self.validator.clean_dataset(data, platform)
                 end_time = time.time()
+                self.metrics.set('crawl_platform_duration_seconds', end_time - start_time, '平台爬取耗时（秒）',
+                                 platform=platform)
                 
                 self.logger.info(f"{platform} 平台爬取完成:")
                 self.logger.info(f"  原始数据: {len(data)} 条")
@@ -104,47 +422,78 @@ class CrawlerManager:
             self.logger.error(f"爬取 {platform} 平台失败: {e}")
             return []
     
-    def crawl_all_platforms(self, max_pages_per_keyword: int = 2, use_parallel: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+    def crawl_all_platforms(self, max_pages_per_keyword: int = 2, use_parallel: bool = False,
+                            use_async: bool = False, resume: bool = False,
+                            incremental: Optional[bool] = None) -> Dict[str, List[Dict[str, Any]]]:
         """
         爬取所有平台数据
         
+        开启 SINK_CONFIG 时原始数据逐页写入 raw_data/{platform}_{timestamp}_stream.*，
+        但返回值仍是完整的各平台数据列表，清洗在每个平台爬取结束后对整个列表进行，
+        峰值内存随爬取规模增长；数据量很大时应直接分批读取流式输出文件做后续处理。
+        
         Args:
             max_pages_per_keyword: 每个关键词的最大页数
-            use_parallel: 是否使用并行爬取
+            use_parallel: 是否使用任务队列并行爬取
+            use_async: 串行模式下平台内部是否使用异步引擎
+            resume: 是否从最近一次未完成的爬取日志恢复
+            incremental: 是否按增量水位提前停止翻页，默认使用 INCREMENTAL_CONFIG['enabled']
             
         Returns:
             平台数据字典
         """
         self.logger.info("开始全平台数据采集...")
         start_time = time.time()
+        self.metrics.reset()
         
-        platform_data = {}
-        
-        if use_parallel:
-            # 并行爬取（注意：可能增加被反爬的风险）
-            with ThreadPoolExecutor(max_workers=2) as executor:
-                futures = {
-                    executor.submit(self.crawl_platform, platform, max_pages_per_keyword): platform
-                    for platform in self.crawlers.keys()
-                }
+        # 回放库、响应归档和爬取日志在爬取成功后保持打开，供保存数据和生成报告使用；
+        # 爬取中途出错或被中断时全部关闭，日志不标记完成以便恢复
+        with ExitStack() as on_error:
+            if CASSETTE_CONFIG['mode'] and not self.transport:
+                self.open_cassette(CASSETTE_CONFIG['mode'])
+                on_error.callback(self.close_cassette)
+            
+            if ARCHIVE_CONFIG['enabled'] and not self.archive:
+                self.open_archive()
+                on_error.callback(self.close_archive)
+            
+            if JOURNAL_CONFIG['enabled'] and not self.journal:
+                self.open_journal(resume)
+                on_error.callback(self.close_journal, completed=False)
+            
+            if INCREMENTAL_CONFIG['enabled'] if incremental is None else incremental:
+                self.open_watermarks()
+            
+            if DEDUP_CONFIG['enabled'] and DEDUP_CONFIG['persist'] and not any(
+                    c.dedup_index is not None and c.dedup_index.path for c in self.crawlers.values()):
+                self.load_dedup_indexes()
+            
+            # 输出流和解析进程池只在本次爬取期间使用，任何情况下都在爬取结束时关闭
+            with ExitStack() as on_exit:
+                if SINK_CONFIG['enabled'] and not any(c.sink for c in self.crawlers.values()):
+                    self.open_sinks()
+                    on_exit.callback(self.close_sinks)
                 
-                for future in as_completed(futures):
-                    platform = futures[future]
-                    try:
-                        data = future.result()
-                        platform_data[platform] = data
-                    except Exception as e:
-                        self.logger.error(f"并行爬取 {platform} 失败: {e}")
-                        platform_data[platform] = []
-        else:
-            # 串行爬取（推荐，更安全）
-            for platform in self.crawlers.keys():
-                platform_data[platform] = self.crawl_platform(platform, max_pages_per_keyword)
+                # 剖析时在主进程内解析，解析阶段才能被记录
+                if PARSE_POOL_CONFIG['enabled'] and self.profiler.enabled:
+                    self.logger.info("性能剖析期间不使用解析进程池")
+                elif PARSE_POOL_CONFIG['enabled'] and not self.parse_pool:
+                    self.open_parse_pool()
+                    # 出错时取消排队中的解析任务
+                    on_exit.push(lambda exc_type, exc, tb: self.close_parse_pool(cancel=exc_type is not None))
+                
+                platform_data = {}
                 
-                # 平台间休息，避免过于频繁的请求
-                if len(self.crawlers) > 1:
-                    self.logger.info("平台间休息 30 秒...")
-                    time.sleep(30)
+                if use_parallel:
+                    # 任务队列并行爬取（注意：可能增加被反爬的风险）
+                    platform_data = self.crawl_with_scheduler(max_pages_per_keyword)
+                else:
+                    # 串行爬取（推荐，更安全）
+                    for platform in self.crawlers.keys():
+                        # 各平台请求速率由平台限速器控制，平台间无需额外休息
+                        platform_data[platform] = self.crawl_platform(platform, max_pages_per_keyword, use_async)
+            
+            on_error.pop_all()
         
         end_time = time.time()
         total_data = sum(len(data) for data in platform_data.values())
@@ -157,61 +506,231 @@ class CrawlerManager:
         self.logger.info(f"总耗时: {end_time - start_time:.2f} 秒")
         self.logger.info("="*50)
         
+        self.metrics.set('crawl_duration_seconds', end_time - start_time, '全平台爬取耗时（秒）')
+        
         return platform_data
     
-    def merge_platform_data(self, platform_data: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    def export_metrics(self, timestamp: Optional[str] = None) -> Dict[str, Path]:
         """
-        合并多平台数据
+        导出本次爬取的性能指标：JSON文件按时间戳保存，Prometheus文本文件使用固定文件名覆盖
         
         Args:
-            platform_data: 平台数据字典
+            timestamp: 文件名中的时间戳，不提供则自动生成
             
         Returns:
-            合并后的数据列表
+            {'json': 路径, 'prometheus': 路径}
+        """
+        timestamp = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
+        paths = {
+            'json': METRICS_CONFIG['dir'] / f"metrics_{timestamp}.json",
+            'prometheus': METRICS_CONFIG['dir'] / METRICS_CONFIG['prometheus_file'],
+        }
+        self.metrics.export(paths['json'], paths['prometheus'])
+        self.logger.info(f"性能指标已导出到: {paths['json']}, {paths['prometheus']}")
+        return paths
+    
+    def summarize_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        按平台汇总性能指标，区分网络、等待、解析和清洗验证的耗时
+        
+        Returns:
+            {平台: 指标摘要}
+        """
+        metrics = self.metrics
+        latency = metrics.histogram('crawler_request_duration_seconds')
+        parse = metrics.histogram('crawler_parse_duration_seconds')
+        summary = {}
+        for platform in metrics.label_values('platform'):
+            key = (('platform', platform),)
+            platform_summary = {
+                '请求数': metrics.total('crawler_requests_total', platform=platform),
+                '请求异常': metrics.total('crawler_requests_total', platform=platform, status='error'),
+                '下载量': f"{metrics.total('crawler_response_bytes_total', platform=platform) / 1024 / 1024:.2f}MB",
+                '重试次数': metrics.total('crawler_retries_total', platform=platform),
+                '限速等待': f"{metrics.total('crawler_sleep_seconds_total', platform=platform, reason='rate_limit'):.1f}秒",
+                '重试等待': f"{metrics.total('crawler_sleep_seconds_total', platform=platform, reason='retry'):.1f}秒",
+                '熔断等待': f"{metrics.total('crawler_sleep_seconds_total', platform=platform, reason='circuit'):.1f}秒",
+            }
+            if latency and key in latency.values:
+                state = latency.values[key]
+                platform_summary['平均请求耗时'] = f"{state['sum'] / state['count']:.3f}秒"
+                platform_summary['P95请求耗时'] = f"{latency.quantile(key, 0.95):.3f}秒"
+            if parse and key in parse.values:
+                state = parse.values[key]
+                platform_summary['解析页数'] = state['count']
+                platform_summary['平均解析耗时'] = f"{state['sum'] / state['count'] * 1000:.1f}毫秒"
+            for stage, label in (('clean', '清洗吞吐量'), ('validate', '验证吞吐量')):
+                records = metrics.total('validator_records_total', platform=platform, stage=stage)
+                seconds = metrics.total('validator_duration_seconds_total', platform=platform, stage=stage)
+                if records and seconds:
+                    platform_summary[label] = f"{records / seconds:.0f}条/秒"
+            duration = metrics.total('crawl_platform_duration_seconds', platform=platform)
+            if duration:
+                platform_summary['平台耗时'] = f"{duration:.2f}秒"
+            summary[platform] = platform_summary
+        return summary
+    
+    def build_crawl_tasks(self, max_pages_per_keyword: int = 2, page_major: bool = False) -> List[CrawlTask]:
+        """
+        将一次全平台爬取拆分为(平台, 关键词, 页码)任务
+        
+        Args:
+            max_pages_per_keyword: 每个关键词的最大页数
+            page_major: 是否按页码优先排列（先排所有关键词的第1页，再排第2页……）
+            
+        Returns:
+            任务列表
+        """
+        tasks = []
+        for platform, crawler in self.crawlers.items():
+            for keyword in crawler.get_search_keywords():
+                for page in range(1, max_pages_per_keyword + 1):
+                    tasks.append(CrawlTask(platform, keyword, page))
+        if page_major:
+            tasks.sort(key=lambda task: task.page)
+        return tasks
+    
+    def crawl_with_scheduler(self, max_pages_per_keyword: int = 2, max_workers: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        通过全局任务队列爬取所有平台
+        
+        Args:
+            max_pages_per_keyword: 每个关键词的最大页数
+            max_workers: 工作线程数，默认使用 SCHEDULER_CONFIG['max_workers']
+            
+        Returns:
+            平台数据字典（已清理）
+        """
+        # 增量模式下先请求各关键词的第1页，后面的页开始前多半已能判断是否需要继续翻页
+        incremental = any(crawler.watermarks is not None for crawler in self.crawlers.values())
+        tasks = self.build_crawl_tasks(max_pages_per_keyword, page_major=incremental)
+        scheduler = TaskScheduler(
+            max_workers=max_workers or SCHEDULER_CONFIG['max_workers'],
+            platform_limits={platform: crawler.get_max_concurrency() for platform, crawler in self.crawlers.items()},
+            logger=self.logger,
+            pause_check=lambda platform: self.crawlers[platform].is_circuit_open()
+        )
+        
+        # 平台截止时间在调度开始时计时，关键词截止时间在该关键词第一页开始时计时
+        start_time = time.time()
+        platform_finished = {}
+        platform_deadlines = {platform: crawler.platform_deadline() for platform, crawler in self.crawlers.items()}
+        keyword_deadlines = {}
+        deadlines_lock = threading.Lock()
+        
+        def handle(task: CrawlTask):
+            crawler = self.crawlers[task.platform]
+            with deadlines_lock:
+                key = (task.platform, task.keyword)
+                if key not in keyword_deadlines:
+                    keyword_deadlines[key] = crawler.keyword_deadline(platform_deadlines[task.platform])
+                deadline = keyword_deadlines[key]
+            
+            if crawler._deadline_exceeded(deadline, f"关键词 '{task.keyword}' 第 {task.page} 页"):
+                return None
+            if crawler.keyword_exhausted(task.keyword):
+                # 增量模式下该关键词前面的页已是旧内容，尚未开始的页不再请求
+                return None
+            try:
+                return crawler.crawl_page(task.keyword, task.page, deadline)
+            finally:
+                with deadlines_lock:
+                    platform_finished[task.platform] = time.time()
+        
+        results = scheduler.run(tasks, handle)
+        
+        # 按关键词、页码顺序组装各平台结果，保证输出顺序与串行模式一致
+        raw_data = {platform: [] for platform in self.crawlers}
+        for task in self.build_crawl_tasks(max_pages_per_keyword):
+            page_data = results.get(task)
+            if page_data:
+                raw_data[task.platform].extend(page_data)
+        
+        platform_data = {}
+        for platform, data in raw_data.items():
+            clean_started = time.time()
+            with self.profiler.stage('clean'):
+                platform_data[platform] = self.validator.clean_dataset(data, platform) if data else []
+            if data:
+                # 各平台共用调度器，平台耗时取调度开始到该平台最后一页完成，再加上清洗耗时
+                duration = platform_finished.get(platform, start_time) - start_time + time.time() - clean_started
+                self.metrics.set('crawl_platform_duration_seconds', duration, '平台爬取耗时（秒）', platform=platform)
+            self.logger.info(f"{platform} 平台: 原始数据 {len(data)} 条, 有效数据 {len(platform_data[platform])} 条")
+        
+        return platform_data
+    
+    def iter_merged_records(self, platform_data: Dict[str, List[Dict[str, Any]]]):
         """
-        merged_data = []
+        逐条产出合并后的多平台数据
         
+        Args:
+            platform_data: 平台数据字典
+            
+        Yields:
+            带平台标识的数据项
+        """
         for platform, data in platform_data.items():
+            platform_name = PLATFORMS.get(platform, {}).get('name', platform)
             for item in data:
                 # 确保每条数据都有平台标识
-                item['platform'] = PLATFORMS.get(platform, {}).get('name', platform)
-                merged_data.append(item)
+                item['platform'] = platform_name
+                yield item
+    
+    def merge_platform_data(self, platform_data: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        合并多平台数据
+        
+        Args:
+            platform_data: 平台数据字典
+            
+        Returns:
+            合并后的数据列表
+        """
+        merged_data = list(self.iter_merged_records(platform_data))
         
         self.logger.info(f"数据合并完成，总计 {len(merged_data)} 条")
         return merged_data
     
-    def save_platform_data(self, platform_data: Dict[str, List[Dict[str, Any]]], timestamp: str = None):
+    def save_platform_data(self, platform_data: Dict[str, List[Dict[str, Any]]], timestamp: str = None,
+                           storage_format: Optional[str] = None):
         """
         保存平台数据到文件
         
         Args:
             platform_data: 平台数据字典
             timestamp: 时间戳字符串，如不提供则自动生成
+            storage_format: csv 或 parquet，默认使用 STORAGE_CONFIG['format']；
+                            parquet 格式下所有平台的清洗后数据写入同一个分区数据集（cleaned），不再单独保存合并文件
         """
         if not timestamp:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
+        if (storage_format or STORAGE_CONFIG['format']) == 'parquet':
+            if any(platform_data.values()):
+                # 平台数据已经过验证和清洗，原始数据集只保存爬虫直接输出的数据
+                dataset = get_dataset('cleaned')
+                written = dataset.write(self.iter_merged_records(platform_data))
+                self.logger.info(f"数据已写入分区数据集: {dataset.root}")
+                self.logger.info(f"共保存 {written} 条数据")
+            return
+        
         # 保存单个平台数据
         for platform, data in platform_data.items():
             if data:
                 filename = f"{platform}_{timestamp}_raw.csv"
                 crawler = self.crawlers.get(platform)
                 if crawler:
-                    crawler.save_data(data, filename)
+                    crawler.save_data(data, filename, storage_format='csv')
         
-        # 保存合并数据
-        merged_data = self.merge_platform_data(platform_data)
-        if merged_data:
-            import pandas as pd
-            from pathlib import Path
-            
+        # 保存合并数据，逐批写出，不构建合并后的完整列表
+        if any(platform_data.values()):
             merged_filename = f"all_platforms_{timestamp}_merged.csv"
             save_path = Path("raw_data") / merged_filename
-            save_path.parent.mkdir(exist_ok=True)
             
-            df = pd.DataFrame(merged_data)
-            df.to_csv(save_path, index=False, encoding='utf-8-sig')
+            with CsvSink(save_path, append=False) as sink:
+                sink.write(self.iter_merged_records(platform_data))
             self.logger.info(f"合并数据已保存到: {save_path}")
+            self.logger.info(f"合并数据共 {sink.written} 条")
     
     def generate_crawl_report(self, platform_data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
         """
@@ -231,8 +750,17 @@ class CrawlerManager:
         
         total_count = 0
         for platform, data in platform_data.items():
-            platform_report = self.validator.validate_dataset(data)
+            with self.profiler.stage('validate'):
+                platform_report = self.validator.validate_dataset(data, platform)
             platform_report['platform_name'] = PLATFORMS.get(platform, {}).get('name', platform)
+            if platform in self.crawlers:
+                platform_report['超时统计'] = dict(self.crawlers[platform].timeout_stats)
+                if self.crawlers[platform].dedup_index is not None:
+                    platform_report['去重统计'] = self.crawlers[platform].dedup_index.get_stats()
+                if self.crawlers[platform].watermarks is not None:
+                    platform_report['增量水位'] = self.crawlers[platform].watermarks.get_stats()
+                if self.crawlers[platform].seen_store is not None:
+                    platform_report['已采集库'] = self.crawlers[platform].seen_store.get_stats()
             report['platforms'][platform] = platform_report
             total_count += len(data)
         
@@ -244,6 +772,30 @@ class CrawlerManager:
             'avg_data_per_platform': total_count / len(platform_data) if platform_data else 0
         }
         
+        # 性能指标摘要
+        report['metrics'] = self.summarize_metrics()
+        
+        # 分阶段剖析摘要
+        if self.profiler.enabled:
+            report['profile'] = self.profiler.summary()
+        
+        # 响应归档统计
+        if self.archive:
+            report['archive'] = self.archive.get_stats()
+        
+        # 录制回放统计
+        if self.transport:
+            report['cassette'] = self.transport.get_stats()
+        
+        # 响应缓存统计
+        response_cache = get_response_cache()
+        if response_cache:
+            report['cache'] = response_cache.get_stats()
+        
+        # 验证阶段在报告中完成，指标在此之后导出才包含验证耗时和吞吐量
+        if METRICS_CONFIG['enabled']:
+            self.export_metrics()
+        
         return report
     
     def print_crawl_report(self, report: Dict[str, Any]):
@@ -266,26 +818,117 @@ class CrawlerManager:
             print(f"  有效率: {platform_report['有效率']}")
             if platform_report['错误统计']:
                 print(f"  主要错误: {list(platform_report['错误统计'].keys())[:3]}")
+            if platform_report.get('超时统计'):
+                print(f"  超时统计: {platform_report['超时统计']}")
+            dedup_stats = platform_report.get('去重统计')
+            if dedup_stats and dedup_stats['解析数']:
+                print(f"  去重: 解析 {dedup_stats['解析数']} 条, 重复 {dedup_stats['重复数']} 条, "
+                      f"重复率 {dedup_stats['重复率']}")
+                ranked = sorted(dedup_stats['关键词'].items(), key=lambda item: -item[1]['重复数'])
+                for keyword, keyword_stats in ranked[:5]:
+                    print(f"    {keyword}: 重复率 {keyword_stats['重复率']} "
+                          f"({keyword_stats['重复数']}/{keyword_stats['解析数']})")
+            if platform_report.get('增量水位'):
+                stopped = platform_report['增量水位']['提前停止']
+                print(f"  增量模式: {len(stopped)} 个关键词提前停止翻页")
+            if platform_report.get('已采集库'):
+                seen_stats = platform_report['已采集库']
+                print(f"  已采集库: {seen_stats['ID数']} 个ID (待保存 {seen_stats['待保存']}), "
+                      f"{seen_stats['大小']}, 估算误判率 {seen_stats['误判率']}")
+        
+        if report.get('metrics'):
+            print("-" * 60)
+            print("性能指标:")
+            for platform, platform_metrics in report['metrics'].items():
+                name = PLATFORMS.get(platform, {}).get('name', platform)
+                print(f"  {name}: " + ", ".join(f"{key} {value}" for key, value in platform_metrics.items()))
+        
+        if 'cache' in report:
+            cache_stats = report['cache']
+            print("-" * 60)
+            print(f"响应缓存: 命中 {cache_stats['hits']} 次, 未命中 {cache_stats['misses']} 次, "
+                  f"命中率 {cache_stats['hit_rate']}, 304重新验证 {cache_stats['revalidated']} 次")
+        
+        if 'archive' in report:
+            archive_stats = report['archive']
+            print("-" * 60)
+            print(f"响应归档: {archive_stats['记录数']} 页, 原始 {archive_stats['原始大小']}, "
+                  f"归档 {archive_stats['归档大小']} ({archive_stats['压缩率']}, {archive_stats['压缩算法']})")
+        
+        if 'cassette' in report:
+            cassette_stats = report['cassette']
+            print("-" * 60)
+            print(f"录制回放({cassette_stats['mode']}): 录制 {cassette_stats['recorded']} 次, "
+                  f"回放 {cassette_stats['replayed']} 次, 未命中 {cassette_stats['misses']} 次")
+        
+        if report.get('profile'):
+            print("-" * 60)
+            print("性能剖析:")
+            for stage, stage_stats in report['profile'].items():
+                print(f"  {stage}: " + ", ".join(f"{key} {value}" for key, value in stage_stats.items()))
         
         print("="*60)
 
-def main():
-    """主函数 - 运行爬虫管理器"""
+def main(resume: bool = False, storage_format: Optional[str] = None, incremental: Optional[bool] = None,
+         profile: bool = False, record: Optional[str] = None, replay: Optional[str] = None):
+    """
+    主函数 - 运行爬虫管理器
+    
+    Args:
+        resume: 是否从最近一次未完成的爬取日志恢复
+        storage_format: 保存格式 csv/parquet，默认使用 STORAGE_CONFIG['format']
+        incremental: 是否增量爬取，默认使用 INCREMENTAL_CONFIG['enabled']
+        profile: 是否按阶段剖析CPU耗时和内存分配，结果写入 PROFILE_CONFIG['dir']
+        record: 把本次爬取的请求和响应录制到该名称的回放库
+        replay: 从该名称的回放库回放，不访问网络
+    """
     manager = CrawlerManager()
+    if profile:
+        manager.enable_profiling()
+    if record or replay:
+        manager.open_cassette('record' if record else 'replay', record or replay)
     
     # 爬取所有平台数据
     platform_data = manager.crawl_all_platforms(
         max_pages_per_keyword=2,
-        use_parallel=False  # 推荐使用串行模式，更安全
+        use_parallel=False,  # 推荐使用串行模式，更安全
+        resume=resume,
+        incremental=incremental
     )
     
     # 保存数据
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    manager.save_platform_data(platform_data, timestamp)
+    with manager.profiler.stage('save'):
+        manager.save_platform_data(platform_data, timestamp, storage_format)
+    manager.close_journal(completed=True)
+    manager.save_dedup_indexes()
+    manager.save_seen_stores()
+    manager.save_watermarks()
     
     # 生成和打印报告
     report = manager.generate_crawl_report(platform_data)
     manager.print_crawl_report(report)
+    
+    profile_paths = manager.finish_profiling(report)
+    if profile_paths:
+        print(f"性能剖析报告: {profile_paths['report']}")
+    manager.close_cassette()
+    manager.close_archive()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="AI硬件分析项目 - 全平台数据采集")
+    parser.add_argument('--resume', action='store_true', help='从最近一次未完成的爬取日志恢复')
+    parser.add_argument('--storage-format', choices=['csv', 'parquet'], help='数据保存格式，默认使用配置文件设置')
+    parser.add_argument('--incremental', action='store_true', default=None,
+                        help='增量爬取：遇到上次已采集的内容即停止翻页')
+    parser.add_argument('--profile', action='store_true',
+                        help='按阶段（请求、解析、验证、清洗、保存）剖析CPU耗时和内存分配')
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument('--record', metavar='NAME', help='把请求和响应录制到指定名称的回放库')
+    cassette_group.add_argument('--replay', metavar='NAME', help='从指定名称的回放库回放，不访问网络')
+    args = parser.parse_args()
+    
+    main(resume=args.resume, storage_format=args.storage_format, incremental=args.incremental,
+         profile=args.profile, record=args.record, replay=args.replay) 
\ No newline at end of file
@@ -3,8 +3,10 @@
 """
 
 import re
+import time
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import sys
 import os
@@ -12,6 +14,11 @@ import os
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import DATA_SCHEMA, PRODUCT_CATEGORIES
+from crawler.product_classifier import get_product_classifier
+from crawler.batch_validator import BatchValidator, ValidationResult
+from crawler.text_normalizer import get_text_normalizer
+from crawler.numeric_parser import parse_count, parse_price, parse_counts, parse_prices
+from crawler.metrics import get_metrics
 
 class DataValidator:
     """
@@ -23,6 +30,12 @@ class DataValidator:
         self.required_fields = DATA_SCHEMA['required_fields']
         self.optional_fields = DATA_SCHEMA['optional_fields']
         self.validation_rules = self._setup_validation_rules()
+        self.batch_validator = BatchValidator(self.validation_rules, self.required_fields, self.optional_fields)
+        self.classifier = get_product_classifier()
+        self.normalizer = get_text_normalizer()
+        self.text_fields = ['title', 'content', 'shop_name', 'location']
+        self.count_fields = ['sales', 'likes', 'comments_count', 'shares']
+        self.metrics = get_metrics()
         
     def _setup_validation_rules(self) -> Dict[str, Any]:
         """设置验证规则"""
@@ -97,7 +110,7 @@ class DataValidator:
         验证单条数据
         
         Args:
-            item: 数据项
+            item: 数据项（字典或CrawlRecord）
             
         Returns:
             (是否有效, 错误信息列表)
@@ -134,84 +147,44 @@ class DataValidator:
         Returns:
             清理后的文本
         """
-        if not isinstance(text, str):
-            return str(text) if text is not None else ""
-        
-        # 去除多余空格和换行
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        # 去除特殊字符但保留中文、英文、数字和基本标点
-        text = re.sub(r'[^\u4e00-\u9fff\u0030-\u0039\u0041-\u005a\u0061-\u007a\uff01-\uff5e\u3000-\u303f\s]', '', text)
-        
-        return text
+        # 合并空白，去除特殊字符但保留中文、英文、数字和基本标点
+        return self.normalizer.clean(text)
     
     def clean_price(self, price: Any) -> float:
         """
         清理价格数据
         
         Args:
-            price: 原始价格
+            price: 原始价格，如 299.9、'¥1,299.00'、'¥199-299'（区间取下限）
             
         Returns:
-            清理后的价格
+            清理后的价格，无法解析时为0.0
         """
-        if price is None:
-            return 0.0
-            
-        if isinstance(price, (int, float)):
-            return float(price)
-        
-        if isinstance(price, str):
-            # 提取数字
-            price_match = re.search(r'[\d,]+\.?\d*', price.replace(',', ''))
-            if price_match:
-                try:
-                    return float(price_match.group())
-                except ValueError:
-                    return 0.0
-        
-        return 0.0
+        price = parse_price(price)
+        return price if price is not None else 0.0
     
     def clean_count(self, count: Any) -> int:
         """
         清理计数类数据（销量、点赞数等）
         
         Args:
-            count: 原始计数
+            count: 原始计数，如 1000、'1.2万'、'10万+人付款'、'3.5k'
             
         Returns:
-            清理后的计数
+            清理后的计数，无法解析时为0
         """
-        if count is None:
-            return 0
-            
         if isinstance(count, int):
             return count
         
-        if isinstance(count, float):
-            return int(count)
-        
-        if isinstance(count, str):
-            # 处理中文数字单位
-            count = count.replace('万', '0000').replace('千', '000').replace('k', '000').replace('K', '000')
-            count = count.replace('+', '').replace('人付款', '').replace('人', '')
-            
-            # 提取数字
-            count_match = re.search(r'\d+', count)
-            if count_match:
-                try:
-                    return int(count_match.group())
-                except ValueError:
-                    return 0
-        
-        return 0
+        count = parse_count(count)
+        return count if count is not None else 0
     
     def clean_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
         """
         清理单条数据
         
         Args:
-            item: 原始数据项
+            item: 原始数据项（字典或CrawlRecord，返回同类型的副本）
             
         Returns:
             清理后的数据项
@@ -219,8 +192,7 @@ class DataValidator:
         cleaned_item = item.copy()
         
         # 清理文本字段
-        text_fields = ['title', 'content', 'shop_name', 'location']
-        for field in text_fields:
+        for field in self.text_fields:
             if field in cleaned_item:
                 cleaned_item[field] = self.clean_text(cleaned_item[field])
         
@@ -229,28 +201,38 @@ class DataValidator:
             cleaned_item['price'] = self.clean_price(cleaned_item['price'])
         
         # 清理计数字段
-        count_fields = ['sales', 'likes', 'comments_count', 'shares']
-        for field in count_fields:
+        for field in self.count_fields:
             if field in cleaned_item:
                 cleaned_item[field] = self.clean_count(cleaned_item[field])
         
-        # 确保product_type有效
-        if 'product_type' in cleaned_item:
-            if cleaned_item['product_type'] not in PRODUCT_CATEGORIES:
-                cleaned_item['product_type'] = "其他AI产品"
+        self._clean_categories([cleaned_item])
+        return cleaned_item
+    
+    def _clean_categories(self, cleaned_items: List[Dict[str, Any]]):
+        """清理产品分类和标签（原地修改），文本字段需已清理"""
+        # 确保product_type有效，无效的按清理后的标题和内容整列批量重新分类
+        pending = [item for item in cleaned_items
+                   if 'product_type' in item and item['product_type'] not in PRODUCT_CATEGORIES]
+        if pending:
+            product_types = self.classifier.classify_batch(
+                [item.get('title') or "" for item in pending],
+                [item.get('content') or "" for item in pending]
+            )
+            for item, product_type in zip(pending, product_types):
+                item['product_type'] = product_type
         
         # 清理标签
-        if 'tags' in cleaned_item and isinstance(cleaned_item['tags'], list):
-            cleaned_item['tags'] = [self.clean_text(tag) for tag in cleaned_item['tags'] if tag]
-        
-        return cleaned_item
+        for item in cleaned_items:
+            if 'tags' in item and isinstance(item['tags'], list):
+                item['tags'] = [self.clean_text(tag) for tag in item['tags'] if tag]
     
-    def validate_dataset(self, data_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def validate_dataset(self, data_list: List[Dict[str, Any]], platform: Optional[str] = None) -> Dict[str, Any]:
         """
         验证整个数据集
         
         Args:
             data_list: 数据列表
+            platform: 平台名称，用作性能指标的标签
             
         Returns:
             验证报告
@@ -265,75 +247,78 @@ class DataValidator:
                 "清理前后对比": {}
             }
         
-        valid_count = 0
-        invalid_count = 0
-        error_stats = {}
+        started = time.perf_counter()
+        report = self.validate_batch(data_list).report()
+        self._record_throughput('validate', platform, len(data_list), started)
+        return report
+    
+    def _record_throughput(self, stage: str, platform: Optional[str], count: int, started: float):
+        """记录验证/清洗的条数和耗时，吞吐量 = 条数 / 耗时"""
+        labels = {'platform': platform or 'all', 'stage': stage}
+        self.metrics.inc('validator_records_total', count, '验证/清洗的条数', **labels)
+        self.metrics.inc('validator_duration_seconds_total', time.perf_counter() - started,
+                         '验证/清洗耗时（秒）', **labels)
+    
+    def validate_batch(self, data: Any) -> ValidationResult:
+        """
+        按列批量验证，规则和结果与逐条调用 validate_item 相同
         
-        for item in data_list:
-            is_valid, errors = self.validate_item(item)
+        Args:
+            data: 数据列表或 DataFrame
             
-            if is_valid:
-                valid_count += 1
-            else:
-                invalid_count += 1
-                
-                # 统计错误类型
-                for error in errors:
-                    error_type = error.split(':')[0] if ':' in error else error
-                    error_stats[error_type] = error_stats.get(error_type, 0) + 1
-        
-        report = {
-            "总数": len(data_list),
-            "有效数": valid_count,
-            "无效数": invalid_count,
-            "有效率": f"{valid_count/len(data_list)*100:.1f}%",
-            "错误统计": error_stats,
-            "字段完整性": self._analyze_field_completeness(data_list)
-        }
-        
-        return report
+        Returns:
+            ValidationResult对象，包含每行的错误位图
+        """
+        if isinstance(data, pd.DataFrame):
+            return self.batch_validator.validate_frame(data)
+        return self.batch_validator.validate_records(data)
     
     def _analyze_field_completeness(self, data_list: List[Dict[str, Any]]) -> Dict[str, str]:
         """分析字段完整性"""
         if not data_list:
             return {}
         
-        field_stats = {}
-        total_count = len(data_list)
-        
-        all_fields = self.required_fields + self.optional_fields
-        
-        for field in all_fields:
-            non_empty_count = sum(
-                1 for item in data_list 
-                if field in item and item[field] is not None and item[field] != ""
-            )
-            completion_rate = non_empty_count / total_count * 100
-            field_stats[field] = f"{completion_rate:.1f}%"
-        
-        return field_stats
+        return self.validate_batch(data_list).field_completeness()
     
-    def clean_dataset(self, data_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def clean_dataset(self, data_list: List[Dict[str, Any]], platform: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         清理整个数据集
         
         Args:
             data_list: 原始数据列表
+            platform: 平台名称，用作性能指标的标签
             
         Returns:
             清理后的数据列表
         """
-        cleaned_data = []
-        
-        for item in data_list:
-            cleaned_item = self.clean_item(item)
-            
-            # 再次验证清理后的数据
-            is_valid, _ = self.validate_item(cleaned_item)
-            if is_valid:
-                cleaned_data.append(cleaned_item)
-        
-        return cleaned_data
+        if not data_list:
+            return []
+        
+        started = time.perf_counter()
+        # 文本、价格、计数字段和产品分类按列批量清理
+        cleaned_data = [item.copy() for item in data_list]
+        for field in self.text_fields + ['price'] + self.count_fields:
+            rows = [item for item in cleaned_data if field in item]
+            if not rows:
+                continue
+            values = [item[field] for item in rows]
+            if field in self.text_fields:
+                cleaned = self.normalizer.clean_batch(values)
+            elif field == 'price':
+                prices, missing = parse_prices(values)
+                cleaned = np.where(missing, 0.0, prices).tolist()
+            else:
+                counts = parse_counts(values).values.tolist()
+                cleaned = [value if isinstance(value, int) else count for value, count in zip(values, counts)]
+            for item, value in zip(rows, cleaned):
+                item[field] = value
+        self._clean_categories(cleaned_data)
+        
+        # 再次验证清理后的数据
+        valid = self.validate_batch(cleaned_data).valid
+        result = [item for item, is_valid in zip(cleaned_data, valid) if is_valid]
+        self._record_throughput('clean', platform, len(data_list), started)
+        return result
 
 def main():
     """测试数据验证器"""
@@ -0,0 +1,97 @@
+"""
+截止时间 - 请求/关键词/平台三级时间预算
+"""
+
+import time
+from typing import Optional
+
+
+class Deadline:
+    """
+    截止时间
+
+    每个截止时间可以挂在上级截止时间下，剩余时间取自身和所有上级中最小的一个，
+    例如请求预算不会超过所在关键词和平台的剩余预算。
+    """
+
+    def __init__(self, budget: Optional[float] = None, parent: Optional['Deadline'] = None, name: str = ''):
+        """
+        初始化截止时间
+
+        Args:
+            budget: 时间预算(秒)，None表示不限制
+            parent: 上级截止时间
+            name: 名称，用于统计和日志（如 请求/关键词/平台）
+        """
+        self.budget = budget
+        self.parent = parent
+        self.name = name
+        self._expires_at = time.monotonic() + budget if budget is not None else None
+
+    def child(self, budget: Optional[float], name: str = '') -> 'Deadline':
+        """创建下级截止时间"""
+        return Deadline(budget, parent=self, name=name)
+
+    def _own_remaining(self) -> float:
+        """自身剩余时间"""
+        if self._expires_at is None:
+            return float('inf')
+        return max(0.0, self._expires_at - time.monotonic())
+
+    def remaining(self) -> float:
+        """
+        剩余时间(秒)
+
+        Returns:
+            自身和所有上级中最小的剩余时间，不限制时为 inf
+        """
+        remaining = self._own_remaining()
+        if self.parent is not None:
+            remaining = min(remaining, self.parent.remaining())
+        return remaining
+
+    def expired(self) -> bool:
+        """是否已到期"""
+        return self.remaining() <= 0
+
+    def expired_name(self) -> str:
+        """
+        已到期的截止时间名称
+
+        Returns:
+            最外层已到期的截止时间名称，未到期时返回空字符串
+        """
+        name = ''
+        deadline = self
+        while deadline is not None:
+            if deadline._own_remaining() <= 0:
+                name = deadline.name
+            deadline = deadline.parent
+        return name
+
+    def binding_name(self) -> str:
+        """
+        当前起约束作用的截止时间名称
+
+        Returns:
+            自身和所有上级中剩余时间最少的截止时间名称
+        """
+        binding = self
+        deadline = self.parent
+        while deadline is not None:
+            if deadline._own_remaining() < binding._own_remaining():
+                binding = deadline
+            deadline = deadline.parent
+        return binding.name
+
+    def cap(self, timeout: float) -> float:
+        """
+        用剩余时间限制单次操作的超时
+
+        Args:
+            timeout: 原超时时间(秒)
+
+        Returns:
+            不超过剩余时间的超时时间
+        """
+        return min(timeout, self.remaining())
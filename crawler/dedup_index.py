@@ -0,0 +1,198 @@
+"""
+去重索引 - 按平台商品ID、规范化URL或内容哈希识别重复数据，支持跨关键词、跨次爬取去重
+"""
+
+import hashlib
+import threading
+from array import array
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qsl, urlencode
+from typing import Dict, List, Any, Callable, Iterable, Optional
+
+# 不影响页面内容的跟踪参数，规范化URL时去除
+TRACKING_PARAMS = frozenset({
+    'spm', 'scm', 'pvid', 'abbucket', 'ns', 'ali_refid', 'ali_trackid', 'track_id', 'trackid',
+    'xsec_token', 'xsec_source', 'source', 'from', 'share_from_user_hidden', 'app_platform',
+})
+_TRACKING_PREFIXES = ('utm_',)
+
+
+def normalize_url(url: Optional[str]) -> str:
+    """
+    规范化URL：去掉协议、www前缀、锚点、跟踪参数和末尾斜杠，查询参数排序
+
+    Args:
+        url: 原始URL，可以是 // 开头的协议相对地址
+
+    Returns:
+        规范化后的URL，url为空时返回空字符串
+    """
+    if not url:
+        return ""
+    url = url.strip()
+    if url.startswith('//'):
+        url = 'https:' + url
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(_TRACKING_PREFIXES)
+    )
+    normalized = host + (parts.path.rstrip('/') or '/')
+    return normalized + '?' + urlencode(query) if query else normalized
+
+
+def content_hash(record: Dict[str, Any]) -> str:
+    """
+    内容哈希：没有商品ID和URL时，用平台、标题、内容和店铺名识别同一条数据
+
+    Args:
+        record: 数据记录
+
+    Returns:
+        十六进制哈希值
+    """
+    parts = [record.get('platform'), record.get('title'), record.get('content'), record.get('shop_name')]
+    text = '\x1f'.join(' '.join(str(part).split()) if part is not None else '' for part in parts)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class DedupIndex:
+    """
+    去重索引
+
+    只保存每个去重键的 64 位哈希（blake2b），百万条数据约占几十MB内存，
+    持久化文件为定长的 8 字节整数序列，每次爬取结束只追加新增部分。
+    同时按关键词统计解析条数和重复条数，用于评估关键词之间的重叠程度。
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        初始化去重索引
+
+        Args:
+            path: 持久化文件路径，提供时加载以往爬取的去重键，实现跨次爬取去重
+        """
+        self.path = Path(path) if path else None
+        self._seen = set()
+        self._unsaved = array('Q')
+        self._keyword_stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        if self.path:
+            self._load()
+
+    def _load(self):
+        """加载持久化的去重键，忽略崩溃时写了一半的末尾"""
+        if not self.path.exists():
+            return
+        data = self.path.read_bytes()
+        digests = array('Q')
+        digests.frombytes(data[:len(data) - len(data) % digests.itemsize])
+        self._seen.update(digests)
+
+    @staticmethod
+    def digest(key: str) -> int:
+        """去重键的 64 位哈希"""
+        return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+    def add(self, key: str) -> bool:
+        """
+        加入一个去重键
+
+        Args:
+            key: 去重键
+
+        Returns:
+            是否为新键（False 表示重复）
+        """
+        digest = self.digest(key)
+        with self._lock:
+            if digest in self._seen:
+                return False
+            self._seen.add(digest)
+            self._unsaved.append(digest)
+            return True
+
+    def __contains__(self, key: str) -> bool:
+        return self.digest(key) in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def filter(self, records: Iterable[Dict[str, Any]], keyword: str,
+               key_func: Callable[[Dict[str, Any]], str]) -> List[Dict[str, Any]]:
+        """
+        过滤掉已见过的数据，并计入关键词统计
+
+        Args:
+            records: 一页解析出的数据
+            keyword: 搜索关键词
+            key_func: 由数据计算去重键的函数
+
+        Returns:
+            首次出现的数据，保持原顺序
+        """
+        records = list(records)
+        digests = [self.digest(key_func(record)) for record in records]
+        unique = []
+        with self._lock:
+            for record, digest in zip(records, digests):
+                if digest in self._seen:
+                    continue
+                self._seen.add(digest)
+                self._unsaved.append(digest)
+                unique.append(record)
+
+            stats = self._keyword_stats.setdefault(keyword, {'parsed': 0, 'duplicates': 0})
+            stats['parsed'] += len(records)
+            stats['duplicates'] += len(records) - len(unique)
+        return unique
+
+    def mark(self, records: Iterable[Dict[str, Any]], key_func: Callable[[Dict[str, Any]], str]):
+        """
+        把数据记为已见过，不计入关键词统计（用于从爬取日志恢复的页）
+
+        Args:
+            records: 数据列表
+            key_func: 由数据计算去重键的函数
+        """
+        for record in records:
+            self.add(key_func(record))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取去重统计
+
+        Returns:
+            总解析数、重复数、重复率，以及每个关键词的统计
+        """
+        with self._lock:
+            keyword_stats = {keyword: dict(stats) for keyword, stats in self._keyword_stats.items()}
+
+        def summarize(parsed: int, duplicates: int) -> Dict[str, Any]:
+            rate = duplicates / parsed * 100 if parsed else 0.0
+            return {'解析数': parsed, '重复数': duplicates, '重复率': f"{rate:.1f}%"}
+
+        total_parsed = sum(stats['parsed'] for stats in keyword_stats.values())
+        total_duplicates = sum(stats['duplicates'] for stats in keyword_stats.values())
+        report = summarize(total_parsed, total_duplicates)
+        report['索引键数'] = len(self._seen)
+        report['关键词'] = {
+            keyword: summarize(stats['parsed'], stats['duplicates'])
+            for keyword, stats in keyword_stats.items()
+        }
+        return report
+
+    def save(self):
+        """把本次新增的去重键追加到持久化文件"""
+        if not self.path:
+            return
+        with self._lock:
+            unsaved, self._unsaved = self._unsaved, array('Q')
+        if not unsaved:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'ab') as f:
+            unsaved.tofile(f)
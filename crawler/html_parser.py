@@ -0,0 +1,261 @@
+"""
+HTML解析后端 - 统一 selectolax / lxml / BeautifulSoup 的选择器接口
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Any, Optional, Sequence, Tuple, Union
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import PARSER_CONFIG
+
+
+class HtmlParserBackend(ABC):
+    """
+    HTML解析后端基类
+
+    解析代码只通过 parse / select / select_one / text / attr 访问文档，
+    不依赖具体的解析库；选择器在各后端内编译一次后缓存复用。
+    """
+
+    name = ''
+
+    def __init__(self):
+        self._compiled: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def compile(self, selector: str) -> Any:
+        """
+        获取编译后的选择器
+
+        Args:
+            selector: CSS选择器
+
+        Returns:
+            后端相关的已编译选择器
+        """
+        compiled = self._compiled.get(selector)
+        if compiled is None:
+            with self._lock:
+                compiled = self._compiled.get(selector)
+                if compiled is None:
+                    compiled = self._compile(selector)
+                    self._compiled[selector] = compiled
+        return compiled
+
+    def _compile(self, selector: str) -> Any:
+        """编译选择器 - 子类可覆盖"""
+        return selector
+
+    @abstractmethod
+    def parse(self, html: Union[str, bytes]) -> Any:
+        """解析HTML文档 - 必须在子类中实现"""
+        pass
+
+    @abstractmethod
+    def select(self, node: Any, selector: str) -> List[Any]:
+        """选择所有匹配的后代节点 - 必须在子类中实现"""
+        pass
+
+    @abstractmethod
+    def select_one(self, node: Any, selector: str) -> Optional[Any]:
+        """选择第一个匹配的后代节点，没有时返回None - 必须在子类中实现"""
+        pass
+
+    @abstractmethod
+    def text(self, node: Any) -> str:
+        """节点文本，各文本片段去除首尾空白后拼接 - 必须在子类中实现"""
+        pass
+
+    @abstractmethod
+    def attr(self, node: Any, name: str) -> Optional[str]:
+        """节点属性值 - 必须在子类中实现"""
+        pass
+
+
+class SelectolaxBackend(HtmlParserBackend):
+    """selectolax(lexbor)后端，解析和选择速度最快"""
+
+    name = 'selectolax'
+
+    def __init__(self):
+        super().__init__()
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser_class = LexborHTMLParser
+
+    def parse(self, html: Union[str, bytes]) -> Any:
+        return self._parser_class(html)
+
+    def select(self, node: Any, selector: str) -> List[Any]:
+        return node.css(selector)
+
+    def select_one(self, node: Any, selector: str) -> Optional[Any]:
+        return node.css_first(selector)
+
+    def text(self, node: Any) -> str:
+        return node.text(deep=True, separator='', strip=True)
+
+    def attr(self, node: Any, name: str) -> Optional[str]:
+        return node.attributes.get(name)
+
+
+class LxmlBackend(HtmlParserBackend):
+    """lxml后端，CSS选择器预先翻译并编译为XPath"""
+
+    name = 'lxml'
+
+    def __init__(self):
+        super().__init__()
+        import lxml.html
+        from lxml import etree
+        from cssselect import GenericTranslator
+        self._html = lxml.html
+        self._etree = etree
+        self._translator = GenericTranslator()
+        self._parser = lxml.html.HTMLParser(encoding='utf-8')
+
+    def _compile(self, selector: str) -> Any:
+        if selector.startswith('xpath:'):
+            return self._etree.XPath(selector[len('xpath:'):])
+        # 只匹配后代节点，与 BeautifulSoup 的 select 语义一致
+        return self._etree.XPath(self._translator.css_to_xpath(selector, prefix='descendant::'))
+
+    def compile_xpath(self, expression: str) -> Any:
+        """获取编译后的XPath表达式"""
+        return self.compile('xpath:' + expression)
+
+    def parse(self, html: Union[str, bytes]) -> Any:
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        return self._html.document_fromstring(html, parser=self._parser)
+
+    def select(self, node: Any, selector: str) -> List[Any]:
+        return self.compile(selector)(node)
+
+    def select_one(self, node: Any, selector: str) -> Optional[Any]:
+        matches = self.select(node, selector)
+        return matches[0] if matches else None
+
+    def text(self, node: Any) -> str:
+        return ''.join(part.strip() for part in self.compile_xpath('.//text()')(node))
+
+    def attr(self, node: Any, name: str) -> Optional[str]:
+        return node.get(name)
+
+
+class BeautifulSoupBackend(HtmlParserBackend):
+    """BeautifulSoup后端，兼容性最好，作为兜底"""
+
+    name = 'bs4'
+
+    def __init__(self):
+        super().__init__()
+        import soupsieve
+        from bs4 import BeautifulSoup
+        self._soupsieve = soupsieve
+        self._soup_class = BeautifulSoup
+
+    def _compile(self, selector: str) -> Any:
+        return self._soupsieve.compile(selector)
+
+    def parse(self, html: Union[str, bytes]) -> Any:
+        return self._soup_class(html, 'html.parser')
+
+    def select(self, node: Any, selector: str) -> List[Any]:
+        return self.compile(selector).select(node)
+
+    def select_one(self, node: Any, selector: str) -> Optional[Any]:
+        return self.compile(selector).select_one(node)
+
+    def text(self, node: Any) -> str:
+        return node.get_text(strip=True)
+
+    def attr(self, node: Any, name: str) -> Optional[str]:
+        return node.get(name)
+
+
+BACKENDS = {
+    'selectolax': SelectolaxBackend,
+    'lxml': LxmlBackend,
+    'bs4': BeautifulSoupBackend,
+}
+
+_backends: Dict[str, HtmlParserBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_parser_backend(name: Optional[str] = None) -> HtmlParserBackend:
+    """
+    获取解析后端实例（同名后端全局共享，已编译的选择器随之复用）
+
+    Args:
+        name: 后端名称 selectolax/lxml/bs4/auto，默认使用 PARSER_CONFIG['backend']；
+              auto 按 selectolax → lxml → bs4 的顺序选择第一个可用的后端
+
+    Returns:
+        HtmlParserBackend对象
+    """
+    name = name or PARSER_CONFIG['backend']
+    candidates = list(BACKENDS) if name == 'auto' else [name]
+
+    with _backends_lock:
+        for candidate in candidates:
+            if candidate in _backends:
+                return _backends[candidate]
+            try:
+                backend = BACKENDS[candidate]()
+            except ImportError:
+                continue
+            _backends[candidate] = backend
+            return backend
+
+    raise ImportError(f"HTML解析后端不可用: {name}")
+
+
+class SelectorChain:
+    """
+    候选选择器链
+
+    页面结构可能有多个版本，按顺序尝试候选选择器直到有匹配；
+    每个平台记住上次命中的选择器，下次优先尝试，正常情况下只需执行一次选择。
+    """
+
+    _last_hit: Dict[Tuple[str, str], int] = {}
+
+    def __init__(self, platform: str, selectors: Sequence[str], name: str = 'items'):
+        """
+        初始化选择器链
+
+        Args:
+            platform: 平台名称
+            selectors: 候选选择器，按优先级排列
+            name: 选择器链名称，同一平台可有多条链
+        """
+        self.platform = platform
+        self.selectors = list(selectors)
+        self.key = (platform, name)
+
+    def select(self, backend: HtmlParserBackend, root: Any) -> Tuple[List[Any], Optional[str]]:
+        """
+        执行选择
+
+        Args:
+            backend: 解析后端
+            root: 文档或节点
+
+        Returns:
+            (匹配节点列表, 命中的选择器)，均未命中时返回 ([], None)
+        """
+        first = self._last_hit.get(self.key, 0)
+        order = [first] + [i for i in range(len(self.selectors)) if i != first]
+
+        for index in order:
+            nodes = backend.select(root, self.selectors[index])
+            if nodes:
+                self._last_hit[self.key] = index
+                return nodes, self.selectors[index]
+
+        return [], None
@@ -0,0 +1,35 @@
+"""
+HTTP工具函数 - 在不同HTTP客户端之间统一响应对象
+"""
+
+from typing import Dict, Optional, Any
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+def build_response(url: str, status_code: int, headers: Dict[str, Any],
+                   content: bytes, encoding: Optional[str] = None) -> requests.Response:
+    """
+    构建 requests.Response 对象
+
+    异步客户端、缓存等非 requests 来源的响应统一转换为 requests.Response，
+    使解析代码只需要面对一种响应类型。
+
+    Args:
+        url: 请求URL
+        status_code: HTTP状态码
+        headers: 响应头
+        content: 响应体字节
+        encoding: 文本编码，不提供时按响应头推断
+
+    Returns:
+        requests.Response对象
+    """
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers or {})
+    response._content = content
+    response.encoding = encoding or get_encoding_from_headers(response.headers)
+    return response
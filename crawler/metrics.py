@@ -0,0 +1,285 @@
+"""
+性能指标 - 计数器、直方图和仪表的注册表，导出为JSON和Prometheus文本格式
+"""
+
+import os
+import json
+import time
+import bisect
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+# 请求耗时和解析耗时的直方图分桶（秒）
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PARSE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in key)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + '}'
+
+
+class Metric:
+    """一个指标，按标签组合分别记录"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, help_text: str = ''):
+        self.name = name
+        self.help = help_text
+        self.values: Dict[LabelKey, Any] = {}
+
+    def samples(self) -> List[Tuple[str, LabelKey, Any]]:
+        """Prometheus 样本行：(指标名, 标签, 值)"""
+        return [(self.name, key, value) for key, value in self.values.items()]
+
+    def to_dict(self) -> List[Dict[str, Any]]:
+        return [{'labels': dict(key), 'value': value} for key, value in self.values.items()]
+
+
+class Counter(Metric):
+    """只增不减的计数"""
+
+    kind = 'counter'
+
+    def inc(self, key: LabelKey, amount: float):
+        self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """可设置的当前值"""
+
+    kind = 'gauge'
+
+    def set(self, key: LabelKey, value: float):
+        self.values[key] = value
+
+
+class Histogram(Metric):
+    """分桶计数的分布，另记录总和与次数"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str = '', buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, key: LabelKey, value: float):
+        state = self.values.get(key)
+        if state is None:
+            state = self.values[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+        state['counts'][bisect.bisect_left(self.buckets, value)] += 1
+        state['sum'] += value
+        state['count'] += 1
+
+    def quantile(self, key: LabelKey, q: float) -> Optional[float]:
+        """
+        按分桶线性插值估算分位数（与 Prometheus histogram_quantile 相同的做法）
+
+        Args:
+            key: 标签
+            q: 分位数，0~1
+
+        Returns:
+            估算值，没有样本时返回None
+        """
+        state = self.values.get(key)
+        if not state or not state['count']:
+            return None
+        rank = q * state['count']
+        cumulative = 0
+        lower = 0.0
+        for upper, count in zip(self.buckets + (float('inf'),), state['counts']):
+            if count and cumulative + count >= rank:
+                # 落在最后一个无上限的桶时只能给出最大的有限边界
+                if upper == float('inf'):
+                    return lower
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+            lower = upper
+        return lower
+
+    def samples(self) -> List[Tuple[str, LabelKey, Any]]:
+        samples = []
+        for key, state in self.values.items():
+            cumulative = 0
+            for upper, count in zip(self.buckets + (float('inf'),), state['counts']):
+                cumulative += count
+                bound = '+Inf' if upper == float('inf') else repr(upper)
+                samples.append((f'{self.name}_bucket', key + (('le', bound),), cumulative))
+            samples.append((f'{self.name}_sum', key, state['sum']))
+            samples.append((f'{self.name}_count', key, state['count']))
+        return samples
+
+    def to_dict(self) -> List[Dict[str, Any]]:
+        return [
+            {'labels': dict(key), 'buckets': dict(zip(map(repr, self.buckets + (float('inf'),)), state['counts'])),
+             'sum': state['sum'], 'count': state['count']}
+            for key, state in self.values.items()
+        ]
+
+
+class MetricsRegistry:
+    """
+    指标注册表
+
+    指标在首次使用时按名称创建，同名指标的类型必须一致。
+    所有更新在一把锁内完成，抓取线程、调度线程和事件循环可以同时记录。
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def _get(self, metric_class: type, name: str, help_text: str, **kwargs) -> Metric:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = metric_class(name, help_text, **kwargs)
+        elif not isinstance(metric, metric_class):
+            raise TypeError(f"指标 {name} 已注册为 {metric.kind}")
+        return metric
+
+    def inc(self, name: str, amount: float = 1, help_text: str = '', **labels):
+        """计数器增加 amount"""
+        with self._lock:
+            self._get(Counter, name, help_text).inc(_label_key(labels), amount)
+
+    def set(self, name: str, value: float, help_text: str = '', **labels):
+        """设置仪表值"""
+        with self._lock:
+            self._get(Gauge, name, help_text).set(_label_key(labels), value)
+
+    def observe(self, name: str, value: float, help_text: str = '',
+                buckets: Sequence[float] = LATENCY_BUCKETS, **labels):
+        """直方图记录一个样本"""
+        with self._lock:
+            self._get(Histogram, name, help_text, buckets=buckets).observe(_label_key(labels), value)
+
+    @contextmanager
+    def timer(self, name: str, help_text: str = '', buckets: Sequence[float] = LATENCY_BUCKETS, **labels):
+        """把代码块的耗时记入直方图"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, help_text, buckets, **labels)
+
+    def total(self, name: str, **labels) -> float:
+        """
+        计数器或仪表在匹配标签上的合计
+
+        Args:
+            name: 指标名
+            **labels: 需要匹配的标签，未指定的标签不限
+
+        Returns:
+            合计值，指标不存在时为0
+        """
+        metric = self._metrics.get(name)
+        if metric is None or metric.kind == 'histogram':
+            return 0
+        wanted = set(_label_key(labels))
+        with self._lock:
+            return sum(value for key, value in metric.values.items() if wanted.issubset(key))
+
+    def histogram(self, name: str) -> Optional[Histogram]:
+        metric = self._metrics.get(name)
+        return metric if isinstance(metric, Histogram) else None
+
+    def label_values(self, label: str) -> List[str]:
+        """所有指标中某个标签出现过的取值，按首次出现顺序"""
+        values = {}
+        with self._lock:
+            for metric in self._metrics.values():
+                for key in metric.values:
+                    for name, value in key:
+                        if name == label:
+                            values.setdefault(value, None)
+        return list(values)
+
+    def reset(self):
+        """清空所有指标，开始新一次爬取的统计"""
+        with self._lock:
+            self._metrics.clear()
+            self.started = time.time()
+
+    # ---------- 导出 ----------
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        导出为可JSON序列化的字典
+
+        Returns:
+            {指标名: {type, help, samples}}
+        """
+        with self._lock:
+            return {
+                name: {'type': metric.kind, 'help': metric.help, 'samples': metric.to_dict()}
+                for name, metric in self._metrics.items()
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        导出为 Prometheus 文本格式
+
+        Returns:
+            文本内容
+        """
+        lines = []
+        with self._lock:
+            for name, metric in self._metrics.items():
+                if metric.help:
+                    lines.append(f'# HELP {name} {metric.help}')
+                lines.append(f'# TYPE {name} {metric.kind}')
+                for sample_name, key, value in metric.samples():
+                    lines.append(f'{sample_name}{_format_labels(key)} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, json_path: Path, prometheus_path: Path):
+        """
+        写出JSON文件和Prometheus文本文件（先写临时文件再替换，采集程序不会读到写了一半的文件）
+
+        Args:
+            json_path: JSON文件路径
+            prometheus_path: Prometheus文本文件路径
+        """
+        contents = {
+            Path(json_path): json.dumps({'started': self.started, 'exported': time.time(),
+                                         'metrics': self.to_dict()}, ensure_ascii=False, indent=2),
+            Path(prometheus_path): self.to_prometheus(),
+        }
+        for path, content in contents.items():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(path.name + '.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(temp_path, path)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """
+    获取全局共享的指标注册表
+
+    Returns:
+        MetricsRegistry对象
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+    return _registry
@@ -0,0 +1,199 @@
+"""
+数值解析 - 销量、点赞数、价格等文本数值的解析，支持按列批量处理
+"""
+
+import re
+import math
+from itertools import repeat
+from typing import Any, Iterable, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+
+# 数值单位
+UNITS = {
+    '万': 10_000, 'w': 10_000, 'W': 10_000,
+    '千': 1_000, 'k': 1_000, 'K': 1_000,
+    '亿': 100_000_000,
+}
+
+RANGE_MODES = ('low', 'high', 'mid')
+
+_NUMBER = r'([0-9][0-9,]*(?:\.[0-9]+)?|\.[0-9]+)'
+# 字母单位后面不能紧跟字母，避免把 3kg、5KB 中的 k 当成"千"
+_UNIT = r'(万|千|亿|[wWkK](?![A-Za-z]))?'
+# 数值，可带单位，可为区间：1.2万、10万+、¥199-299、1-2万、3k~5k
+_VALUE_RE = re.compile(rf'{_NUMBER}\s*{_UNIT}(?:\s*[-~～至到]\s*{_NUMBER}\s*{_UNIT})?')
+
+
+class ParsedColumn(NamedTuple):
+    """按列解析的结果"""
+    values: np.ndarray      # 解析出的数值，缺失处为 NaN（计数列为0）
+    missing: np.ndarray     # 无法解析或为空的位置
+
+
+def _to_float(number: Optional[str]) -> float:
+    return float(number.replace(',', '')) if number else math.nan
+
+
+def _combine(low: float, low_unit: float, high: float, high_unit: float, range_mode: str) -> float:
+    """按区间取值方式合并上下限；下限没有单位时沿用上限的单位（1-2万）"""
+    if math.isnan(high):
+        return low * (low_unit if not math.isnan(low_unit) else 1)
+    if math.isnan(low_unit):
+        low_unit = 1 if math.isnan(high_unit) else high_unit
+    low = low * low_unit
+    high = high * (1 if math.isnan(high_unit) else high_unit)
+    if range_mode == 'high':
+        return high
+    if range_mode == 'mid':
+        return (low + high) / 2
+    return low
+
+
+def _parse_text(text: str, range_mode: str) -> float:
+    """解析文本数值，无法解析时返回 NaN"""
+    match = _VALUE_RE.search(text)
+    if not match:
+        return math.nan
+    low, low_unit, high, high_unit = match.groups()
+    return _combine(
+        _to_float(low), UNITS.get(low_unit, math.nan),
+        _to_float(high), UNITS.get(high_unit, math.nan),
+        range_mode
+    )
+
+
+def parse_number(value: Any, range_mode: str = 'low') -> Optional[float]:
+    """
+    解析单个数值
+
+    Args:
+        value: 数值或文本，如 '1.2万'、'10万+人付款'、'¥199-299'、'3.5k'
+        range_mode: 区间取值方式，low（下限）/ high（上限）/ mid（中点）
+
+    Returns:
+        解析出的数值，无法解析时返回None
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return None if isinstance(value, float) and math.isnan(value) else float(value)
+    number = _parse_text(value if isinstance(value, str) else str(value), range_mode)
+    return None if math.isnan(number) else number
+
+
+def parse_count(value: Any) -> Optional[int]:
+    """
+    解析计数（销量、点赞数、评论数等），区间取下限，小数按单位换算后四舍五入
+
+    Args:
+        value: 数值或文本，如 '1.2万'、'1000+人付款'
+
+    Returns:
+        计数，无法解析或不是有限数值（如 inf）时返回None
+    """
+    number = parse_number(value)
+    return None if number is None or not math.isfinite(number) else int(round(number))
+
+
+def parse_price(value: Any, range_mode: str = 'low') -> Optional[float]:
+    """
+    解析价格，区间默认取下限（起售价）
+
+    Args:
+        value: 数值或文本，如 '¥1,299.00'、'￥199-299'
+        range_mode: 区间取值方式
+
+    Returns:
+        价格，无法解析时返回None
+    """
+    return parse_number(value, range_mode)
+
+
+def parse_numbers(values: Iterable[Any], range_mode: str = 'low') -> ParsedColumn:
+    """
+    按列解析数值，结果与逐个调用 parse_number 相同
+
+    Args:
+        values: 数值或文本的列表、数组或 pandas.Series
+        range_mode: 区间取值方式
+
+    Returns:
+        ParsedColumn(float64数组, 缺失掩码)
+    """
+    if range_mode not in RANGE_MODES:
+        raise ValueError(f"未知的区间取值方式: {range_mode}")
+
+    array = _to_object_array(values)
+    size = len(array)
+    result = np.full(size, np.nan)
+
+    is_str = np.fromiter(map(isinstance, array, repeat(str)), dtype=bool, count=size)
+    is_num = ~is_str & np.fromiter(map(isinstance, array, repeat((int, float))), dtype=bool, count=size)
+    if is_num.any():
+        result[is_num] = array[is_num].astype(np.float64)
+
+    is_none = np.fromiter(map(isinstance, array, repeat(type(None))), dtype=bool, count=size)
+    other = ~is_str & ~is_num & ~is_none
+    if other.any():
+        # 其他类型按字符串解析，与 parse_number 一致
+        array = array.copy()
+        array[other] = [str(value) for value in array[other]]
+        is_str |= other
+
+    if is_str.any():
+        result[is_str] = _parse_strings(array[is_str], range_mode)
+
+    return ParsedColumn(result, np.isnan(result))
+
+
+def _parse_strings(strings: np.ndarray, range_mode: str) -> np.ndarray:
+    """
+    解析一列文本
+
+    销量、点赞数这类列的取值高度重复（'1000+人付款'、'1.2万'），
+    先用哈希表去重，每个不同的文本只解析一次，再按编码展开回整列。
+    """
+    codes, uniques = pd.factorize(strings)
+    parsed = np.fromiter(map(_parse_text, uniques, repeat(range_mode)), dtype=np.float64, count=len(uniques))
+    return parsed[codes]
+
+
+def parse_counts(values: Iterable[Any]) -> ParsedColumn:
+    """
+    按列解析计数，结果与逐个调用 parse_count 相同
+
+    Args:
+        values: 数值或文本的列表、数组或 pandas.Series
+
+    Returns:
+        ParsedColumn(int64数组，缺失处为0, 缺失掩码)；inf 等非有限数值按缺失处理
+    """
+    numbers, missing = parse_numbers(values)
+    missing = missing | ~np.isfinite(numbers)
+    counts = np.zeros(len(numbers), dtype=np.int64)
+    counts[~missing] = np.round(numbers[~missing])
+    return ParsedColumn(counts, missing)
+
+
+def parse_prices(values: Iterable[Any], range_mode: str = 'low') -> ParsedColumn:
+    """
+    按列解析价格
+
+    Args:
+        values: 数值或文本的列表、数组或 pandas.Series
+        range_mode: 区间取值方式
+
+    Returns:
+        ParsedColumn(float64数组，缺失处为NaN, 缺失掩码)
+    """
+    return parse_numbers(values, range_mode)
+
+
+def _to_object_array(values: Iterable[Any]) -> np.ndarray:
+    if isinstance(values, pd.Series):
+        return values.to_numpy(dtype=object, na_value=None)
+    if isinstance(values, np.ndarray):
+        return values.astype(object)
+    values = list(values)
+    return np.fromiter(values, dtype=object, count=len(values))
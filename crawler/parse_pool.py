@@ -0,0 +1,123 @@
+"""
+解析进程池 - 在独立进程中解析搜索页，使请求和解析互相重叠并利用多核
+"""
+
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Type
+import requests
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import PARSE_POOL_CONFIG
+from crawler.http_utils import build_response
+
+# 工作进程内按爬虫类缓存的实例，每个进程只初始化一次
+_worker_crawlers: Dict[type, Any] = {}
+
+
+def _get_worker_crawler(crawler_class: Type) -> Any:
+    """获取工作进程内的爬虫实例"""
+    crawler = _worker_crawlers.get(crawler_class)
+    if crawler is None:
+        crawler = crawler_class()
+        _worker_crawlers[crawler_class] = crawler
+    return crawler
+
+
+def parse_page_worker(crawler_class: Type, url: str, status_code: int, headers: Dict[str, str],
+                      content: bytes, encoding: Optional[str], keyword: str, page: int,
+                      save_debug_pages: bool = True, incremental: bool = True) -> List[Dict[str, Any]]:
+    """
+    工作进程入口：重建响应并解析一页搜索结果
+
+    Args:
+        crawler_class: 爬虫类
+        url: 请求URL
+        status_code: HTTP状态码
+        headers: 响应头
+        content: 响应体字节
+        encoding: 文本编码
+        keyword: 搜索关键词
+        page: 页码
+        save_debug_pages: 没有找到条目时是否保存调试文件（原始页面已归档时不需要）
+        incremental: 是否跳过以往爬取已采集的条目（重新解析归档时为False）
+
+    Returns:
+        该页通过校验的标准化数据列表
+    """
+    crawler = _get_worker_crawler(crawler_class)
+    crawler.save_debug_pages = save_debug_pages
+    crawler.incremental = incremental
+    response = build_response(url, status_code, headers, content, encoding)
+    return crawler.parse_search_page(response, keyword, page)
+
+
+class ParsePool:
+    """
+    解析进程池
+
+    抓取线程只负责请求，把原始页面字节交给进程池解析后立即去请求下一页；
+    解析结果以 Future 返回，由调用方按页码顺序收集。
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, start_method: Optional[str] = None):
+        """
+        初始化进程池
+
+        Args:
+            max_workers: 工作进程数，默认使用 PARSE_POOL_CONFIG['max_workers']（None为CPU核数）
+            start_method: 进程启动方式，默认使用 PARSE_POOL_CONFIG['start_method']
+        """
+        self.max_workers = max_workers or PARSE_POOL_CONFIG['max_workers'] or os.cpu_count() or 1
+        start_method = start_method or PARSE_POOL_CONFIG['start_method']
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context(start_method)
+        )
+        self.submitted = 0
+
+    def submit(self, crawler, response: requests.Response, keyword: str, page: int,
+               save_debug_pages: Optional[bool] = None, incremental: Optional[bool] = None) -> Future:
+        """
+        提交一页解析任务
+
+        Args:
+            crawler: 发起请求的爬虫（工作进程中会创建同类实例）
+            response: 搜索页响应
+            keyword: 搜索关键词
+            page: 页码
+            save_debug_pages: 没有找到条目时是否保存调试文件，默认在爬虫未挂载响应归档时保存
+            incremental: 是否跳过以往爬取已采集的条目，默认与爬虫的 incremental 一致
+
+        Returns:
+            结果为数据列表的 Future
+        """
+        if save_debug_pages is None:
+            save_debug_pages = crawler.archive is None and crawler.save_debug_pages
+        if incremental is None:
+            incremental = crawler.incremental
+        self.submitted += 1
+        return self.executor.submit(
+            parse_page_worker, type(crawler), response.url, response.status_code,
+            dict(response.headers), response.content, response.encoding, keyword, page, save_debug_pages,
+            incremental
+        )
+
+    def close(self, wait: bool = True, cancel: bool = False):
+        """
+        关闭进程池
+
+        Args:
+            wait: 是否等待工作进程退出
+            cancel: 是否取消排队中尚未开始的解析任务（wait为False时总是取消）
+        """
+        self.executor.shutdown(wait=wait, cancel_futures=cancel or not wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close(cancel=exc_type is not None)
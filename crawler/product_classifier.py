@@ -0,0 +1,221 @@
+"""
+产品分类器 - 基于 Aho-Corasick 自动机的多关键词产品分类
+"""
+
+import threading
+from collections import deque
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import PRODUCT_CATEGORIES
+from crawler.text_normalizer import TextNormalizer
+
+DEFAULT_CATEGORY = "其他AI产品"
+
+
+class ProductClassifier:
+    """
+    产品分类器
+
+    由 PRODUCT_CATEGORIES 的全部关键词构建一个 Aho-Corasick 自动机，
+    每段文本只扫描一遍即可得到所有关键词的命中，不再逐个关键词做子串查找。
+    匹配不区分大小写，重叠的关键词（如"智能音箱"和"音箱"）分别计数。
+    分类结果取命中次数最多的类别，次数相同时按配置中的类别顺序。
+    """
+
+    def __init__(self, categories: Optional[Dict[str, List[str]]] = None):
+        """
+        初始化分类器
+
+        Args:
+            categories: 类别到关键词列表的映射，默认使用 PRODUCT_CATEGORIES
+        """
+        self.categories = list((categories if categories is not None else PRODUCT_CATEGORIES).items())
+        self.category_names = [name for name, _ in self.categories]
+        # 状态转移表、失败指针和每个状态输出的类别下标
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[Tuple[int, ...]] = [()]
+        self._build()
+
+    def _build(self):
+        """构建字典树和失败指针"""
+        outputs = [[]]
+        for index, (_, keywords) in enumerate(self.categories):
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if not keyword:
+                    continue
+                state = 0
+                for char in keyword:
+                    next_state = self._goto[state].get(char)
+                    if next_state is None:
+                        next_state = len(self._goto)
+                        self._goto[state][char] = next_state
+                        self._goto.append({})
+                        self._fail.append(0)
+                        outputs.append([])
+                    state = next_state
+                outputs[state].append(index)
+
+        # 按层次遍历设置失败指针，并把失败链上的输出合并到当前状态
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                outputs[next_state].extend(outputs[self._fail[next_state]])
+
+        self._outputs = [tuple(output) for output in outputs]
+
+    def count_hits(self, text: str) -> List[int]:
+        """
+        扫描文本，统计每个类别的关键词命中次数（全角字母数字按半角匹配）
+
+        Args:
+            text: 待分类文本
+
+        Returns:
+            与 category_names 顺序一致的命中次数列表
+        """
+        counts = [0] * len(self.categories)
+        if not text:
+            return counts
+
+        goto = self._goto
+        root = goto[0]
+        fail = self._fail
+        outputs = self._outputs
+        state = 0
+        for char in TextNormalizer.fold(text).lower():
+            if state:
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+            else:
+                # 根状态下只需一次字典查找，大部分字符在这里跳过
+                state = root.get(char, 0)
+                if not state:
+                    continue
+            for index in outputs[state]:
+                counts[index] += 1
+        return counts
+
+    def score(self, title: str, content: str = "") -> Dict[str, int]:
+        """
+        多标签评分
+
+        Args:
+            title: 标题
+            content: 内容
+
+        Returns:
+            有命中的类别及其命中次数，按次数从高到低排列
+        """
+        counts = self.count_hits(self._join(title, content))
+        ranked = sorted(
+            (index for index, count in enumerate(counts) if count),
+            key=lambda index: -counts[index]
+        )
+        return {self.category_names[index]: counts[index] for index in ranked}
+
+    def labels(self, title: str, content: str = "") -> List[str]:
+        """
+        返回所有命中的类别
+
+        Returns:
+            按命中次数排列的类别列表，无命中时为 [DEFAULT_CATEGORY]
+        """
+        return list(self.score(title, content)) or [DEFAULT_CATEGORY]
+
+    def classify(self, title: str, content: str = "") -> str:
+        """
+        根据标题和内容对产品进行分类
+
+        Args:
+            title: 标题
+            content: 内容
+
+        Returns:
+            命中次数最多的类别，无命中时为 DEFAULT_CATEGORY
+        """
+        return self._best(self.count_hits(self._join(title, content)))
+
+    def classify_batch(self, titles: Iterable[Any], contents: Optional[Iterable[Any]] = None) -> Any:
+        """
+        批量分类一整列文本
+
+        Args:
+            titles: 标题列表或 pandas.Series
+            contents: 与 titles 等长的内容列表，可选
+
+        Returns:
+            分类列表；titles 为 pandas.Series 时返回同索引的 Series
+        """
+        texts = [str(title) if title is not None else "" for title in titles]
+        if contents is not None:
+            texts = [self._join(text, content) for text, content in zip(texts, contents)]
+        # 同一商品常在多个关键词和页面下重复出现，相同文本只扫描一次
+        classified: Dict[str, str] = {}
+        results = []
+        for text in texts:
+            category = classified.get(text)
+            if category is None:
+                category = classified[text] = self._best(self.count_hits(text))
+            results.append(category)
+
+        if hasattr(titles, 'index') and hasattr(titles, 'to_numpy'):
+            import pandas as pd
+            return pd.Series(results, index=titles.index, name='product_type')
+        return results
+
+    def score_batch(self, texts: Iterable[Any]) -> List[Dict[str, int]]:
+        """
+        批量多标签评分
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            每段文本的 {类别: 命中次数}
+        """
+        return [self.score(text) for text in texts]
+
+    def _best(self, counts: List[int]) -> str:
+        best_index = -1
+        best_count = 0
+        for index, count in enumerate(counts):
+            if count > best_count:
+                best_index, best_count = index, count
+        return self.category_names[best_index] if best_index >= 0 else DEFAULT_CATEGORY
+
+    @staticmethod
+    def _join(title: Any, content: Any) -> str:
+        title = str(title) if title is not None else ""
+        content = str(content) if content is not None else ""
+        return title + " " + content if content else title
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_product_classifier() -> ProductClassifier:
+    """
+    获取全局共享的产品分类器，自动机只构建一次
+
+    Returns:
+        ProductClassifier对象
+    """
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = ProductClassifier()
+    return _classifier
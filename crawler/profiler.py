@@ -0,0 +1,232 @@
+"""
+性能剖析 - 按阶段（请求、解析、验证、清洗、保存）记录CPU剖析和内存分配
+"""
+
+import io
+import json
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from pathlib import Path
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Any, Optional
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import PROFILE_CONFIG
+
+STAGES = ('fetch', 'parse', 'validate', 'clean', 'save')
+
+
+class NullProfiler:
+    """不做剖析的占位实现，未开启剖析时各阶段没有额外开销"""
+
+    enabled = False
+
+    def stage(self, name: str):
+        return nullcontext()
+
+    def summary(self) -> Dict[str, Any]:
+        return {}
+
+
+class StageProfiler:
+    """
+    阶段剖析器
+
+    每个阶段一个 cProfile（按线程分别记录，写出时合并），多次进入同一阶段的结果累计；
+    内存方面记录每次进入阶段前后 tracemalloc 的当前内存差和阶段内峰值。
+    tracemalloc 快照开销随存活对象数增长，只对每个阶段的前 snapshot_samples 次做快照对比，
+    汇总出分配最多的代码行。
+    同一线程内阶段嵌套时，内层计入外层阶段。
+    tracemalloc 统计的是整个进程的内存，多线程并发时各阶段的内存数字会相互包含，只能作为参考。
+    """
+
+    enabled = True
+
+    def __init__(self, output_dir: Path, top_n: Optional[int] = None, snapshot_samples: Optional[int] = None,
+                 traceback_limit: Optional[int] = None):
+        """
+        初始化剖析器并开始跟踪内存分配
+
+        Args:
+            output_dir: 输出目录
+            top_n: 报告中列出的函数和分配位置数，默认使用 PROFILE_CONFIG['top_n']
+            snapshot_samples: 每个阶段做快照对比的次数，默认使用 PROFILE_CONFIG['snapshot_samples']
+            traceback_limit: tracemalloc 记录的调用栈深度，默认使用 PROFILE_CONFIG['traceback_limit']
+        """
+        self.output_dir = Path(output_dir)
+        self.top_n = top_n or PROFILE_CONFIG['top_n']
+        self.snapshot_samples = snapshot_samples if snapshot_samples is not None else PROFILE_CONFIG['snapshot_samples']
+
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._profiles: Dict[tuple, cProfile.Profile] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        self._owns_tracemalloc = not tracemalloc.is_tracing()
+        if self._owns_tracemalloc:
+            tracemalloc.start(traceback_limit or PROFILE_CONFIG['traceback_limit'])
+
+    def _stage_stats(self, name: str) -> Dict[str, Any]:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = {
+                'calls': 0, 'seconds': 0.0, 'net_bytes': 0, 'peak_bytes': 0,
+                'snapshots': 0, 'allocations': {},
+            }
+        return stats
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        剖析一个阶段
+
+        Args:
+            name: 阶段名，如 fetch/parse/validate/clean/save
+        """
+        if getattr(self._local, 'stage', None):
+            yield
+            return
+
+        self._local.stage = name
+        with self._lock:
+            stats = self._stage_stats(name)
+            sample = stats['snapshots'] < self.snapshot_samples
+            if sample:
+                stats['snapshots'] += 1
+            profile = self._profiles.setdefault((name, threading.get_ident()), cProfile.Profile())
+
+        before = self._snapshot() if sample else None
+        memory_before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            profile.enable()
+        except ValueError:
+            # 已有其他剖析工具在运行时只记录耗时和内存
+            profile = None
+
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            elapsed = time.perf_counter() - started
+            memory_after, peak = tracemalloc.get_traced_memory()
+            diff = self._snapshot().compare_to(before, 'lineno') if sample else []
+            self._local.stage = None
+
+            with self._lock:
+                stats['calls'] += 1
+                stats['seconds'] += elapsed
+                stats['net_bytes'] += memory_after - memory_before
+                stats['peak_bytes'] = max(stats['peak_bytes'], peak - memory_before)
+                allocations = stats['allocations']
+                for stat in diff:
+                    if stat.size_diff <= 0:
+                        continue
+                    location = str(stat.traceback[0])
+                    size, count = allocations.get(location, (0, 0))
+                    allocations[location] = (size + stat.size_diff, count + stat.count_diff)
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        ))
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        各阶段摘要
+
+        Returns:
+            {阶段: {调用次数, 耗时, 净内存, 峰值内存}}
+        """
+        with self._lock:
+            return {
+                name: {
+                    '调用次数': stats['calls'],
+                    '耗时': f"{stats['seconds']:.2f}秒",
+                    '净内存': f"{stats['net_bytes'] / 1024 / 1024:+.2f}MB",
+                    '峰值内存': f"{stats['peak_bytes'] / 1024 / 1024:.2f}MB",
+                }
+                for name, stats in self._ordered_stats()
+            }
+
+    def _ordered_stats(self):
+        order = {name: index for index, name in enumerate(STAGES)}
+        return sorted(self._stats.items(), key=lambda item: order.get(item[0], len(order)))
+
+    def _merged_profile(self, name: str) -> Optional[pstats.Stats]:
+        merged = None
+        for (stage, _), profile in self._profiles.items():
+            if stage != name or not profile.getstats():
+                continue
+            if merged is None:
+                merged = pstats.Stats(profile)
+            else:
+                merged.add(profile)
+        return merged
+
+    def write(self, report: Optional[Dict[str, Any]] = None) -> Dict[str, Path]:
+        """
+        写出剖析结果：每个阶段一个 .prof 文件（可用 pstats/snakeviz 查看），
+        一份包含各阶段热点函数和分配最多代码行的文本报告，以及爬取报告本身
+
+        Args:
+            report: 爬取报告，提供时一并保存为 crawl_report.json
+
+        Returns:
+            {文件类型或阶段名: 路径}
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        paths = {}
+        lines = []
+        for name, stats in self._ordered_stats():
+            summary = self.summary()[name]
+            lines.append("=" * 80)
+            lines.append(f"阶段 {name}: " + ", ".join(f"{key} {value}" for key, value in summary.items()))
+            lines.append("=" * 80)
+
+            merged = self._merged_profile(name)
+            if merged is not None:
+                paths[name] = self.output_dir / f"{name}.prof"
+                merged.dump_stats(paths[name])
+                buffer = io.StringIO()
+                pstats.Stats(str(paths[name]), stream=buffer).sort_stats('cumulative').print_stats(self.top_n)
+                lines.append(f"累计耗时最多的 {self.top_n} 个函数:")
+                lines.extend(line for line in buffer.getvalue().splitlines() if line.strip())
+
+            allocations = sorted(stats['allocations'].items(), key=lambda item: -item[1][0])[:self.top_n]
+            if allocations:
+                lines.append(f"\n分配内存最多的 {len(allocations)} 个位置（前 {stats['snapshots']} 次进入该阶段的快照对比）:")
+                for location, (size, count) in allocations:
+                    lines.append(f"  {size / 1024:10.1f} KiB  {count:8d} 块  {location}")
+            lines.append("")
+
+        paths['report'] = self.output_dir / "profile_report.txt"
+        with open(paths['report'], 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines))
+
+        paths['summary'] = self.output_dir / "profile_summary.json"
+        with open(paths['summary'], 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+
+        if report is not None:
+            paths['crawl_report'] = self.output_dir / "crawl_report.json"
+            with open(paths['crawl_report'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+        return paths
+
+    def close(self):
+        """停止内存跟踪（仅当由本剖析器开启时）"""
+        if self._owns_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
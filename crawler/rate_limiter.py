@@ -0,0 +1,127 @@
+"""
+限速器 - 基于令牌桶的平台级请求速率控制
+"""
+
+import time
+import random
+import asyncio
+import threading
+from typing import Dict, Any
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import CRAWLER_CONFIG, PLATFORMS
+
+
+class TokenBucket:
+    """
+    令牌桶限速器
+
+    以 requests_per_second 的速率补充令牌，最多积攒 burst 个。
+    每次请求预约一个令牌并返回需要等待的时间，线程和协程均可安全使用。
+    """
+
+    def __init__(self, requests_per_second: float, burst: int = 1, jitter: float = 0.0):
+        """
+        初始化令牌桶
+
+        Args:
+            requests_per_second: 平均每秒允许的请求数
+            burst: 桶容量，即允许的瞬时突发请求数
+            jitter: 每次请求额外附加的随机等待上限(秒)
+        """
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second 必须大于0")
+
+        self.rate = float(requests_per_second)
+        self.burst = max(1, int(burst))
+        self.jitter = max(0.0, float(jitter))
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        预约一个令牌
+
+        Returns:
+            获得令牌前需要等待的秒数（含随机抖动）
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+
+            # 令牌可以透支，透支部分按补充速率折算为等待时间
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if self.jitter:
+            wait += random.uniform(0, self.jitter)
+        return wait
+
+    def acquire(self) -> float:
+        """
+        阻塞等待直到获得令牌
+
+        Returns:
+            实际等待的秒数
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def async_acquire(self) -> float:
+        """
+        异步等待直到获得令牌，不阻塞事件循环
+
+        Returns:
+            实际等待的秒数
+        """
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limit_config(platform_name: str) -> Dict[str, Any]:
+    """
+    获取平台限速配置，未配置的项使用 CRAWLER_CONFIG['default_rate_limit']
+
+    Args:
+        platform_name: 平台名称
+
+    Returns:
+        限速配置字典
+    """
+    rate_config = dict(CRAWLER_CONFIG['default_rate_limit'])
+    rate_config.update(PLATFORMS.get(platform_name, {}).get('rate_limit', {}))
+    return rate_config
+
+
+def get_rate_limiter(platform_name: str) -> TokenBucket:
+    """
+    获取平台共享的限速器，同一平台的所有爬虫实例、线程和协程共用一个令牌桶
+
+    Args:
+        platform_name: 平台名称
+
+    Returns:
+        TokenBucket对象
+    """
+    with _limiters_lock:
+        if platform_name not in _limiters:
+            rate_config = get_rate_limit_config(platform_name)
+            _limiters[platform_name] = TokenBucket(
+                rate_config['requests_per_second'],
+                rate_config['burst'],
+                rate_config['jitter']
+            )
+        return _limiters[platform_name]
@@ -0,0 +1,174 @@
+"""
+数据输出流 - 按批次追加写入JSONL/CSV，写出时只在内存中缓冲一个批次
+"""
+
+import csv
+import json
+import time
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Union
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import DATA_SCHEMA, SINK_CONFIG
+
+
+class RecordSink(ABC):
+    """
+    数据输出流基类
+
+    记录先进入内存缓冲区，缓冲条数达到 batch_size 或距上次写入超过 flush_interval 秒时
+    追加写入文件，下游可以在爬取过程中读取已落盘的部分数据。
+    """
+
+    def __init__(self, path: Union[str, Path], batch_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None, append: bool = True):
+        """
+        初始化输出流
+
+        Args:
+            path: 输出文件路径
+            batch_size: 缓冲条数阈值
+            flush_interval: 写入时间间隔阈值(秒)
+            append: 是否追加到已有文件，False时覆盖
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size or SINK_CONFIG['batch_size']
+        self.flush_interval = flush_interval if flush_interval is not None else SINK_CONFIG['flush_interval']
+        self.written = 0
+
+        if not append and self.path.exists():
+            self.path.unlink()
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def write(self, records: Union[Mapping, Iterable[Mapping]]):
+        """
+        写入一条或多条记录
+
+        Args:
+            records: 记录（字典或CrawlRecord）、记录列表或生成器
+        """
+        if isinstance(records, Mapping):
+            records = [records]
+
+        with self._lock:
+            for record in records:
+                self._buffer.append(record)
+                if len(self._buffer) >= self.batch_size:
+                    self._flush_locked()
+            if self._buffer and time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def flush(self):
+        """立即写入缓冲区中的记录"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        """写入缓冲区，调用方需持有锁"""
+        if self._buffer:
+            self._write_batch(self._buffer)
+            self.written += len(self._buffer)
+            self._buffer = []
+        self._last_flush = time.monotonic()
+
+    @abstractmethod
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        """写入一个批次 - 必须在子类中实现"""
+        pass
+
+    def close(self):
+        """写入剩余记录并关闭"""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class JsonlSink(RecordSink):
+    """JSONL输出流，每行一条记录"""
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for record in batch:
+                f.write(json.dumps(dict(record), ensure_ascii=False, default=str) + '\n')
+
+
+class CsvSink(RecordSink):
+    """
+    CSV输出流
+
+    列由文件已有表头或第一个批次决定，默认按 platform、crawl_time 和 DATA_SCHEMA 字段排列，
+    之后出现的新字段会被忽略。
+    """
+
+    def __init__(self, path: Union[str, Path], fieldnames: Optional[List[str]] = None, **kwargs):
+        """
+        初始化CSV输出流
+
+        Args:
+            path: 输出文件路径
+            fieldnames: 列名列表，不提供时自动确定
+            **kwargs: RecordSink参数
+        """
+        super().__init__(path, **kwargs)
+        self.fieldnames = fieldnames
+
+        if self.fieldnames is None and self.path.exists() and self.path.stat().st_size > 0:
+            with open(self.path, 'r', encoding='utf-8-sig', newline='') as f:
+                self.fieldnames = next(csv.reader(f), None)
+
+    def _resolve_fieldnames(self, batch: List[Dict[str, Any]]) -> List[str]:
+        """根据第一个批次确定列名"""
+        fieldnames = ['platform', 'crawl_time'] + [
+            field for field in DATA_SCHEMA['required_fields'] + DATA_SCHEMA['optional_fields']
+            if field != 'platform'
+        ]
+        for record in batch:
+            for key in record.keys():
+                if key not in fieldnames:
+                    fieldnames.append(key)
+        return fieldnames
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        new_file = not self.path.exists() or self.path.stat().st_size == 0
+        if self.fieldnames is None:
+            self.fieldnames = self._resolve_fieldnames(batch)
+
+        # 新文件带BOM，保证Excel正确识别中文
+        with open(self.path, 'a', encoding='utf-8-sig' if new_file else 'utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=self.fieldnames, extrasaction='ignore')
+            if new_file:
+                writer.writeheader()
+            writer.writerows(dict(record) for record in batch)
+
+
+def open_sink(path: Union[str, Path], **kwargs) -> RecordSink:
+    """
+    按文件扩展名创建输出流
+
+    Args:
+        path: 输出文件路径(.jsonl / .csv)
+        **kwargs: 输出流参数
+
+    Returns:
+        RecordSink对象
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix in ('.jsonl', '.json'):
+        return JsonlSink(path, **kwargs)
+    if suffix == '.csv':
+        return CsvSink(path, **kwargs)
+    raise ValueError(f"不支持的输出格式: {suffix}")
@@ -0,0 +1,343 @@
+"""
+响应归档 - 把抓取到的搜索页原始响应追加写入压缩归档，按平台、关键词、页码和时间建立索引，
+选择器失效后可以用当前解析器重新解析归档，补齐数据而不必重新爬取
+"""
+
+import json
+import zlib
+import sqlite3
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+import requests
+import sys
+import os
+
+try:
+    import zstandard
+except ImportError:  # zstandard 为可选依赖，未安装时使用标准库 zlib
+    zstandard = None
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import ARCHIVE_CONFIG
+from crawler.http_utils import build_response
+
+SEGMENT_SUFFIX = '.warcz'
+
+
+def _compress(data: bytes, codec: str, level: int) -> bytes:
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return zlib.compress(data, level)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ImportError("读取 zstd 压缩的归档记录需要安装 zstandard: pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class ResponseArchive:
+    """
+    响应归档
+
+    归档文件（段）只追加不修改，格式与 WARC 类似，每条记录为：
+    一行JSON头（平台、关键词、页码、URL、状态码、响应头、编码、抓取时间、压缩算法、压缩后长度），
+    紧接压缩后的响应体和一个换行。每条记录单独压缩，可按偏移量直接读取。
+    SQLite索引记录每条记录所在的段和偏移量；索引损坏或丢失时可以扫描段文件重建。
+    每次打开写入时创建新段，单段超过 segment_max_mb 时切换到下一段。
+    """
+
+    def __init__(self, directory: Optional[Path] = None, codec: Optional[str] = None, level: Optional[int] = None,
+                 segment_max_mb: Optional[float] = None):
+        """
+        打开归档目录
+
+        Args:
+            directory: 归档目录，默认使用 ARCHIVE_CONFIG['dir']
+            codec: 压缩算法 zstd/zlib，默认使用 ARCHIVE_CONFIG['codec']；未安装 zstandard 时使用 zlib
+            level: 压缩级别，默认使用 ARCHIVE_CONFIG['level']
+            segment_max_mb: 单个段文件的大小上限(MB)，默认使用 ARCHIVE_CONFIG['segment_max_mb']
+        """
+        self.directory = Path(directory or ARCHIVE_CONFIG['dir'])
+        self.directory.mkdir(parents=True, exist_ok=True)
+        codec = codec or ARCHIVE_CONFIG['codec']
+        self.codec = 'zlib' if codec == 'zstd' and zstandard is None else codec
+        if self.codec not in ('zstd', 'zlib'):
+            raise ValueError(f"不支持的压缩算法: {codec}")
+        self.level = level if level is not None else ARCHIVE_CONFIG['level']
+        if self.codec == 'zlib':
+            self.level = min(self.level, 9)
+        self.segment_max = int((segment_max_mb or ARCHIVE_CONFIG['segment_max_mb']) * 1024 * 1024)
+
+        self.stats = {'records': 0, 'raw_bytes': 0, 'stored_bytes': 0}
+        self._segment = None
+        self._segment_path = None
+        self._segment_count = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.directory / 'index.sqlite3'), check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS records (
+                id INTEGER PRIMARY KEY,
+                platform TEXT,
+                keyword TEXT,
+                page INTEGER,
+                fetched_at TEXT,
+                url TEXT,
+                status INTEGER,
+                segment TEXT,
+                offset INTEGER,
+                length INTEGER,
+                codec TEXT,
+                UNIQUE (segment, offset)
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_page ON records(platform, keyword, page)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_fetched_at ON records(fetched_at)')
+        self._conn.commit()
+
+    # ---------- 写入 ----------
+
+    def _open_segment(self):
+        """创建新的段文件，调用方需持有锁"""
+        if self._segment is not None:
+            self._segment.close()
+        self._segment_count += 1
+        name = f"responses_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{self._segment_count}{SEGMENT_SUFFIX}"
+        self._segment_path = self.directory / name
+        self._segment = open(self._segment_path, 'ab')
+
+    def append(self, platform: str, keyword: str, page: int, response: requests.Response) -> int:
+        """
+        追加一页原始响应
+
+        Args:
+            platform: 平台名称
+            keyword: 搜索关键词
+            page: 页码
+            response: 搜索页响应
+
+        Returns:
+            索引中的记录ID
+        """
+        content = response.content or b''
+        body = _compress(content, self.codec, self.level)
+        header = {
+            'platform': platform,
+            'keyword': keyword,
+            'page': page,
+            'url': response.url,
+            'status': response.status_code,
+            'headers': dict(response.headers),
+            'encoding': response.encoding,
+            'fetched_at': datetime.now().isoformat(timespec='milliseconds'),
+            'codec': self.codec,
+            'length': len(body),
+        }
+        header_line = json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n'
+
+        with self._lock:
+            if self._segment is None or self._segment.tell() >= self.segment_max:
+                self._open_segment()
+            offset = self._segment.tell()
+            self._segment.write(header_line + body + b'\n')
+            self._segment.flush()
+            cursor = self._conn.execute(
+                'INSERT INTO records (platform, keyword, page, fetched_at, url, status, segment, offset, length, codec) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (platform, keyword, page, header['fetched_at'], response.url, response.status_code,
+                 self._segment_path.name, offset, len(body), self.codec)
+            )
+            self._conn.commit()
+            self.stats['records'] += 1
+            self.stats['raw_bytes'] += len(content)
+            self.stats['stored_bytes'] += len(header_line) + len(body) + 1
+            return cursor.lastrowid
+
+    # ---------- 读取 ----------
+
+    def query(self, platform: Optional[str] = None, keyword: Optional[str] = None, since: Optional[str] = None,
+              until: Optional[str] = None, latest: bool = False) -> List[Dict[str, Any]]:
+        """
+        按条件查询归档记录
+
+        Args:
+            platform: 平台名称
+            keyword: 搜索关键词
+            since: 抓取时间下限（ISO格式，含），如 2024-05-01 或 2024-05-01T08:00
+            until: 抓取时间上限（ISO格式，不含）
+            latest: 同一(平台, 关键词, 页码)只保留最近一次抓取
+
+        Returns:
+            索引记录列表，按平台、关键词、页码、抓取时间排序
+        """
+        conditions, params = [], []
+        for column, operator, value in (('platform', '=', platform), ('keyword', '=', keyword),
+                                        ('fetched_at', '>=', since), ('fetched_at', '<', until)):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(value)
+        sql = 'SELECT id, platform, keyword, page, fetched_at, url, status, segment, offset, length, codec FROM records'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY platform, keyword, page, fetched_at, id'
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        columns = ('id', 'platform', 'keyword', 'page', 'fetched_at', 'url', 'status', 'segment', 'offset',
+                   'length', 'codec')
+        entries = [dict(zip(columns, row)) for row in rows]
+        if latest:
+            # 已按抓取时间升序排列，后出现的覆盖先出现的
+            entries = list({(e['platform'], e['keyword'], e['page']): e for e in entries}.values())
+        return entries
+
+    def _read_record(self, segment: Path, offset: int) -> Tuple[Dict[str, Any], bytes]:
+        """读取一条记录的JSON头和压缩后的响应体"""
+        with open(segment, 'rb') as f:
+            f.seek(offset)
+            header = json.loads(f.readline())
+            return header, f.read(header['length'])
+
+    def read_response(self, entry: Dict[str, Any]) -> requests.Response:
+        """
+        读取归档记录并还原为响应对象
+
+        Args:
+            entry: query() 返回的索引记录
+
+        Returns:
+            requests.Response对象
+        """
+        header, body = self._read_record(self.directory / entry['segment'], entry['offset'])
+        return build_response(header['url'], header['status'], header['headers'],
+                              _decompress(body, header['codec']), header.get('encoding'))
+
+    def iter_segment(self, segment: Path) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        顺序扫描段文件，不依赖索引
+
+        Args:
+            segment: 段文件路径
+
+        Yields:
+            (偏移量, JSON头)，写了一半的末尾记录被忽略
+        """
+        with open(segment, 'rb') as f:
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line.endswith(b'\n'):
+                    return
+                try:
+                    header = json.loads(line)
+                except ValueError:
+                    return
+                if len(f.read(header['length'] + 1)) < header['length'] + 1:
+                    return
+                yield offset, header
+
+    def rebuild_index(self) -> int:
+        """
+        扫描所有段文件，把索引中缺少的记录补入（如写入段后、写入索引前进程退出）
+
+        Returns:
+            补入的记录数
+        """
+        added = 0
+        for segment in sorted(self.directory.glob(f'*{SEGMENT_SUFFIX}')):
+            rows = [
+                (header['platform'], header['keyword'], header['page'], header['fetched_at'], header['url'],
+                 header['status'], segment.name, offset, header['length'], header['codec'])
+                for offset, header in self.iter_segment(segment)
+            ]
+            with self._lock:
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO records (platform, keyword, page, fetched_at, url, status, segment, offset, '
+                    'length, codec) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows
+                )
+                self._conn.commit()
+                added += self._conn.total_changes - before
+        return added
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取本次写入的统计
+
+        Returns:
+            记录数、原始大小、归档大小、压缩率和压缩算法
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        raw, stored = stats['raw_bytes'], stats['stored_bytes']
+        return {
+            '记录数': stats['records'],
+            '原始大小': f"{raw / 1024 / 1024:.2f}MB",
+            '归档大小': f"{stored / 1024 / 1024:.2f}MB",
+            '压缩率': f"{stored / raw * 100:.1f}%" if raw else "0%",
+            '压缩算法': self.codec,
+        }
+
+    def close(self):
+        """关闭当前段文件和索引"""
+        with self._lock:
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+            self._conn.close()
+
+
+def main():
+    """命令行入口：查看归档、重建索引，或用当前解析器重新解析归档"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="搜索页响应归档")
+    parser.add_argument('--dir', type=Path, help='归档目录，默认使用配置文件设置')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    for name, help_text in (('list', '按条件列出归档记录'), ('reparse', '用当前解析器并行重新解析归档并保存结果')):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument('--platform', help='平台名称，如 taobao')
+        sub.add_argument('--keyword', help='搜索关键词')
+        sub.add_argument('--since', help='抓取时间下限（含），如 2024-05-01')
+        sub.add_argument('--until', help='抓取时间上限（不含）')
+        sub.add_argument('--latest', action='store_true', help='同一页只取最近一次抓取')
+    reparse_parser = subparsers.choices['reparse']
+    reparse_parser.add_argument('--workers', type=int, help='解析进程数，默认为CPU核数')
+    reparse_parser.add_argument('--storage-format', choices=['csv', 'parquet'], help='保存格式，默认使用配置文件设置')
+    subparsers.add_parser('rebuild-index', help='扫描归档文件，补全索引')
+    args = parser.parse_args()
+
+    if args.command == 'rebuild-index':
+        archive = ResponseArchive(args.dir)
+        print(f"索引补入 {archive.rebuild_index()} 条记录")
+        archive.close()
+        return
+
+    filters = dict(platform=args.platform, keyword=args.keyword, since=args.since, until=args.until,
+                   latest=args.latest)
+    if args.command == 'list':
+        archive = ResponseArchive(args.dir)
+        entries = archive.query(**filters)
+        for entry in entries:
+            print(f"{entry['fetched_at']}  {entry['platform']:<12} 第{entry['page']:>3}页  {entry['keyword']}  "
+                  f"{entry['segment']}@{entry['offset']}")
+        print(f"共 {len(entries)} 条记录")
+        archive.close()
+        return
+
+    from crawler.crawler_manager import CrawlerManager
+
+    manager = CrawlerManager()
+    platform_data = manager.reparse_archive(args.dir, max_workers=args.workers, **filters)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    manager.save_platform_data(platform_data, f"reparsed_{timestamp}", args.storage_format)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+响应缓存 - 基于SQLite的持久化HTTP响应缓存
+支持按平台TTL过期、ETag/Last-Modified条件请求、容量上限LRU淘汰和命中统计
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+from urllib.parse import urlencode
+import requests
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import CACHE_CONFIG
+from crawler.http_utils import build_response
+
+
+class ResponseCache:
+    """
+    磁盘响应缓存
+
+    以 URL + 请求参数 为键保存成功响应。条目过期后不直接丢弃，
+    而是携带 ETag/Last-Modified 发起条件请求，服务端返回304时继续使用缓存内容。
+    """
+
+    def __init__(self, path: Path, max_size_mb: float = 512, default_ttl: float = 3600):
+        """
+        初始化缓存
+
+        Args:
+            path: SQLite数据库文件路径
+            max_size_mb: 缓存响应体总大小上限(MB)
+            default_ttl: 默认有效期(秒)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.default_ttl = default_ttl
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                status INTEGER,
+                headers TEXT,
+                content BLOB,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL,
+                last_access REAL,
+                size INTEGER
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)')
+        self._conn.commit()
+
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stores': 0, 'evictions': 0}
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict[str, Any]] = None, method: str = 'GET') -> str:
+        """
+        生成缓存键
+
+        Args:
+            url: 请求URL
+            params: 查询参数，按键排序后参与计算
+            method: 请求方法
+
+        Returns:
+            缓存键
+        """
+        raw = f"{method.upper()} {url}"
+        if params:
+            raw += '?' + urlencode(sorted(params.items()))
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        查询缓存条目
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存条目字典，不存在时返回None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT url, status, headers, content, etag, last_modified, stored_at FROM responses WHERE key = ?',
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._conn.execute('UPDATE responses SET last_access = ? WHERE key = ?', (time.time(), key))
+            self._conn.commit()
+
+        return {
+            'key': key,
+            'url': row[0],
+            'status': row[1],
+            'headers': json.loads(row[2]),
+            'content': row[3],
+            'etag': row[4],
+            'last_modified': row[5],
+            'stored_at': row[6],
+        }
+
+    def is_fresh(self, entry: Dict[str, Any], ttl: Optional[float] = None) -> bool:
+        """判断缓存条目是否仍在有效期内"""
+        ttl = self.default_ttl if ttl is None else ttl
+        return time.time() - entry['stored_at'] < ttl
+
+    def conditional_headers(self, entry: Dict[str, Any]) -> Dict[str, str]:
+        """
+        生成条件请求头
+
+        Args:
+            entry: 缓存条目
+
+        Returns:
+            If-None-Match / If-Modified-Since 请求头
+        """
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def to_response(self, entry: Dict[str, Any]) -> requests.Response:
+        """将缓存条目还原为响应对象"""
+        return build_response(entry['url'], entry['status'], entry['headers'], entry['content'])
+
+    def store(self, key: str, response: requests.Response):
+        """
+        写入成功响应并按容量上限淘汰最久未访问的条目
+
+        Args:
+            key: 缓存键
+            response: 响应对象
+        """
+        content = response.content or b''
+        headers = dict(response.headers)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, response.url, response.status_code, json.dumps(headers, ensure_ascii=False), content,
+                 headers.get('ETag') or headers.get('etag'),
+                 headers.get('Last-Modified') or headers.get('last-modified'),
+                 now, now, len(content))
+            )
+            self.stats['stores'] += 1
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, key: str):
+        """服务端确认内容未变化(304)后刷新条目的存储时间"""
+        with self._lock:
+            now = time.time()
+            self._conn.execute('UPDATE responses SET stored_at = ?, last_access = ? WHERE key = ?', (now, now, key))
+            self._conn.commit()
+            self.stats['revalidated'] += 1
+
+    def record_hit(self):
+        """记录一次命中"""
+        with self._lock:
+            self.stats['hits'] += 1
+
+    def record_miss(self):
+        """记录一次未命中"""
+        with self._lock:
+            self.stats['misses'] += 1
+
+    def _evict(self):
+        """LRU淘汰，调用方需持有锁"""
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_size:
+            return
+
+        rows = self._conn.execute('SELECT key, size FROM responses ORDER BY last_access ASC').fetchall()
+        for key, size in rows:
+            if total <= self.max_size:
+                break
+            self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            total -= size
+            self.stats['evictions'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+
+        Returns:
+            命中、未命中、重新验证、写入、淘汰次数，以及命中率和条目数
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'], stats['size_bytes'] = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses'
+            ).fetchone()
+
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = f"{stats['hits'] / lookups * 100:.1f}%" if lookups else "0%"
+        return stats
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    获取全局共享的响应缓存
+
+    Returns:
+        ResponseCache对象，CACHE_CONFIG['enabled'] 为False时返回None
+    """
+    global _cache
+    if not CACHE_CONFIG['enabled']:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(
+                CACHE_CONFIG['path'],
+                max_size_mb=CACHE_CONFIG['max_size_mb'],
+                default_ttl=CACHE_CONFIG['default_ttl']
+            )
+        return _cache
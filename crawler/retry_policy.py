@@ -0,0 +1,261 @@
+"""
+重试策略 - 按状态码区分的重试、指数退避和按主机熔断
+"""
+
+import time
+import random
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional
+import requests
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import CRAWLER_CONFIG
+
+
+class RetryPolicy:
+    """
+    重试策略
+
+    429和5xx等临时性错误按指数退避(全抖动)重试，其他4xx立即失败；
+    服务端给出 Retry-After 时按其要求等待，超过上限则放弃本次请求。
+    """
+
+    def __init__(self, max_retries: int = 3, retry_statuses=(429, 500, 502, 503, 504),
+                 backoff_base: float = 1.0, backoff_max: float = 30.0, max_retry_after: float = 120.0):
+        """
+        初始化重试策略
+
+        Args:
+            max_retries: 最大尝试次数
+            retry_statuses: 可重试的HTTP状态码
+            backoff_base: 退避基数(秒)
+            backoff_max: 单次退避上限(秒)
+            max_retry_after: 可接受的 Retry-After 上限(秒)
+        """
+        self.max_retries = max_retries
+        self.retry_statuses = set(retry_statuses)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+
+    @classmethod
+    def from_config(cls) -> 'RetryPolicy':
+        """根据 CRAWLER_CONFIG 创建重试策略"""
+        retry_config = CRAWLER_CONFIG['retry']
+        return cls(
+            max_retries=CRAWLER_CONFIG['max_retries'],
+            retry_statuses=retry_config['retry_statuses'],
+            backoff_base=retry_config['backoff_base'],
+            backoff_max=retry_config['backoff_max'],
+            max_retry_after=retry_config['max_retry_after']
+        )
+
+    def is_retryable_status(self, status_code: int) -> bool:
+        """判断状态码是否值得重试"""
+        return status_code in self.retry_statuses
+
+    def is_retryable_exception(self, error: Exception) -> bool:
+        """
+        判断异常是否值得重试
+
+        网络和超时错误可以重试；URL格式错误等参数问题（ValueError子类）重试也不会成功
+        """
+        return not isinstance(error, ValueError)
+
+    def backoff(self, attempt: int) -> float:
+        """
+        指数退避（全抖动）
+
+        Args:
+            attempt: 已失败的尝试序号，从0开始
+
+        Returns:
+            等待秒数，在 [0, min(backoff_max, backoff_base * 2^attempt)] 内均匀分布
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def parse_retry_after(response: Optional[requests.Response]) -> Optional[float]:
+        """
+        解析 Retry-After 响应头
+
+        Args:
+            response: 响应对象
+
+        Returns:
+            需要等待的秒数，没有或无法解析时返回None
+        """
+        if response is None:
+            return None
+
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def get_wait(self, attempt: int, response: Optional[requests.Response] = None) -> Optional[float]:
+        """
+        计算下次重试前的等待时间
+
+        Args:
+            attempt: 已失败的尝试序号，从0开始
+            response: 失败的响应（异常时为None）
+
+        Returns:
+            等待秒数；Retry-After 超过上限时返回None，表示放弃
+        """
+        retry_after = self.parse_retry_after(response)
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_retry_after else None
+        return self.backoff(attempt)
+
+
+class CircuitBreaker:
+    """
+    按主机的熔断器
+
+    连续失败达到阈值后进入熔断状态，冷却期内该主机的请求全部暂停；
+    冷却结束后只放行一个试探请求，成功则恢复，失败则重新熔断。
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 60.0):
+        """
+        初始化熔断器
+
+        Args:
+            failure_threshold: 触发熔断的连续失败次数
+            recovery_timeout: 熔断冷却时间(秒)
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self._open_until = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """
+        判断当前是否允许发出请求
+
+        Returns:
+            是否允许
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() < self._open_until:
+                    return False
+                self.state = self.HALF_OPEN
+            # 半开状态只放行一个试探请求
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def remaining_cooldown(self) -> float:
+        """熔断冷却剩余秒数，未熔断时为0"""
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self._open_until - time.monotonic())
+
+    def is_paused(self) -> bool:
+        """是否应暂停向该主机派发新请求"""
+        with self._lock:
+            if self.state == self.OPEN:
+                return time.monotonic() < self._open_until
+            return self.state == self.HALF_OPEN and self._trial_in_flight
+
+    def release_trial(self):
+        """
+        归还未使用的试探请求名额
+
+        allow_request() 放行后，请求既没有成功也没有失败就放弃时（如截止时间已到、任务被取消）调用，
+        否则半开状态会一直认为试探请求在途，该主机不再放行任何请求
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._trial_in_flight = False
+
+    def record_success(self):
+        """记录一次成功"""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """记录一次失败"""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self._open(self.recovery_timeout)
+
+    def trip(self, cooldown: float):
+        """
+        立即熔断指定时长，用于服务端要求长时间等待的情况
+
+        Args:
+            cooldown: 冷却时间(秒)
+        """
+        with self._lock:
+            self._open(cooldown)
+
+    def _open(self, cooldown: float):
+        """进入熔断状态，调用方需持有锁"""
+        self.state = self.OPEN
+        self.trips += 1
+        self._trial_in_flight = False
+        self._open_until = max(self._open_until, time.monotonic() + cooldown)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取熔断器状态"""
+        with self._lock:
+            return {'state': self.state, 'failures': self.failures, 'trips': self.trips}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(host: str) -> CircuitBreaker:
+    """
+    获取主机共享的熔断器
+
+    Args:
+        host: 主机名
+
+    Returns:
+        CircuitBreaker对象
+    """
+    with _breakers_lock:
+        if host not in _breakers:
+            breaker_config = CRAWLER_CONFIG['circuit_breaker']
+            _breakers[host] = CircuitBreaker(
+                failure_threshold=breaker_config['failure_threshold'],
+                recovery_timeout=breaker_config['recovery_timeout']
+            )
+        return _breakers[host]
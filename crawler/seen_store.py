@@ -0,0 +1,203 @@
+"""
+已采集库 - 基于内存映射布隆过滤器的持久化已采集ID集合，用于增量爬取
+"""
+
+import math
+import mmap
+import struct
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional
+import numpy as np
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import SEEN_STORE_CONFIG
+
+# 文件头：魔数、位数、哈希函数个数、已加入的ID数，位数组从 _HEADER_SIZE 字节处开始
+_MAGIC = b'SEENBLM1'
+_HEADER = struct.Struct('<8sQIQ')
+_HEADER_SIZE = 64
+_MASK64 = (1 << 64) - 1
+
+
+def bloom_parameters(capacity: int, false_positive_rate: float) -> tuple:
+    """
+    按容量和误判率计算布隆过滤器的位数和哈希函数个数
+
+    Args:
+        capacity: 预计ID数
+        false_positive_rate: 达到容量时的误判率
+
+    Returns:
+        (位数, 哈希函数个数)
+    """
+    if capacity <= 0 or not 0 < false_positive_rate < 1:
+        raise ValueError("容量必须为正数，误判率必须在0和1之间")
+    num_bits = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+    num_bits = (num_bits + 7) // 8 * 8
+    num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+    return num_bits, num_hashes
+
+
+def _digest(key: str) -> bytes:
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+
+
+def _hash_pair(key: str) -> tuple:
+    digest = _digest(key)
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+
+class SeenStore:
+    """
+    已采集库
+
+    布隆过滤器的位数组直接保存在文件中，打开时用 mmap 映射而不读入内存，
+    加载时间与ID数无关；查询时计算 k 个位置（双重哈希），只访问这 k 个字节。
+    不会漏判已采集的ID，误判率由容量和 false_positive_rate 决定。
+
+    本次爬取新采集的ID先放在内存中，save() 时才写入文件，
+    中途失败的爬取不会把未保存的数据标记为已采集。
+    查询只看已保存的ID：本次爬取内跨关键词的重复由 DedupIndex 处理，
+    进程内解析和解析进程池的工作进程（只映射文件）得到相同的结果。
+    文件一经创建，位数和哈希函数个数以文件头为准，修改配置只影响新建的文件。
+    """
+
+    def __init__(self, path: Path, capacity: Optional[int] = None, false_positive_rate: Optional[float] = None):
+        """
+        打开已采集库，文件不存在时在首次保存时创建
+
+        Args:
+            path: 文件路径
+            capacity: 预计ID数，默认使用 SEEN_STORE_CONFIG['capacity']
+            false_positive_rate: 达到容量时的误判率，默认使用 SEEN_STORE_CONFIG['false_positive_rate']
+        """
+        self.path = Path(path)
+        self.capacity = capacity or SEEN_STORE_CONFIG['capacity']
+        self.false_positive_rate = false_positive_rate or SEEN_STORE_CONFIG['false_positive_rate']
+        self.num_bits, self.num_hashes = bloom_parameters(self.capacity, self.false_positive_rate)
+        self.count = 0
+
+        self._file = None
+        self._bits = None
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._open()
+
+    def _open(self):
+        """映射已有文件"""
+        if not self.path.exists():
+            return
+        self._file = open(self.path, 'rb')
+        self._bits = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.num_bits, self.num_hashes, self.count = _HEADER.unpack_from(self._bits)
+        if magic != _MAGIC or len(self._bits) < _HEADER_SIZE + self.num_bits // 8:
+            self.close()
+            raise ValueError(f"不是有效的已采集库文件: {self.path}")
+
+    def _positions(self, key: str) -> List[int]:
+        h1, h2 = _hash_pair(key)
+        num_bits = self.num_bits
+        # 与 save() 中 NumPy 的 uint64 运算一致，按 2^64 取模
+        return [((h1 + i * h2) & _MASK64) % num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, key: str) -> bool:
+        """ID是否在以往爬取中已采集（可能误判为已采集，不会漏判；本次爬取新加入、尚未保存的ID不计）"""
+        bits = self._bits
+        if bits is None:
+            return False
+        for position in self._positions(key):
+            if not bits[_HEADER_SIZE + (position >> 3)] >> (position & 7) & 1:
+                return False
+        return True
+
+    def add(self, keys: Iterable[str]):
+        """
+        记录新采集的ID，save() 后写入文件并参与查询
+
+        Args:
+            keys: ID列表
+        """
+        with self._lock:
+            self._pending.update(keys)
+
+    def save(self):
+        """把新采集的ID写入文件，文件不存在时按配置创建"""
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        if not pending:
+            return
+
+        if self._bits is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'wb') as f:
+                f.write(_HEADER.pack(_MAGIC, self.num_bits, self.num_hashes, 0).ljust(_HEADER_SIZE, b'\0'))
+                f.truncate(_HEADER_SIZE + self.num_bits // 8)
+        else:
+            self.close()
+
+        # 位置按哈希一次算好后用 NumPy 批量置位
+        pairs = np.frombuffer(b''.join(map(_digest, pending)), dtype='<u8').reshape(-1, 2)
+        h1, h2 = pairs[:, 0], pairs[:, 1] | np.uint64(1)
+        with open(self.path, 'r+b') as f, mmap.mmap(f.fileno(), 0) as bits:
+            array = np.frombuffer(bits, dtype=np.uint8, offset=_HEADER_SIZE, count=self.num_bits // 8)
+            for i in range(self.num_hashes):
+                positions = (h1 + np.uint64(i) * h2) % np.uint64(self.num_bits)
+                offsets = positions & np.uint64(7)
+                for bit in range(8):
+                    # 同一字节内同一位重复出现时写入的值相同，可以直接用花式索引赋值
+                    index = positions[offsets == bit] >> np.uint64(3)
+                    array[index] |= np.uint8(1 << bit)
+            del array
+            self.count += len(pending)
+            _HEADER.pack_into(bits, 0, _MAGIC, self.num_bits, self.num_hashes, self.count)
+            bits.flush()
+        self._open()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            ID数、文件大小和按当前ID数估算的误判率
+        """
+        fill = 1 - math.exp(-self.num_hashes * self.count / self.num_bits)
+        return {
+            'ID数': self.count,
+            '待保存': len(self._pending),
+            '大小': f"{(_HEADER_SIZE + self.num_bits // 8) / 1024 / 1024:.1f}MB",
+            '误判率': f"{fill ** self.num_hashes:.2e}",
+        }
+
+    def close(self):
+        """关闭文件映射，未保存的ID保留在内存中"""
+        if self._bits is not None:
+            self._bits.close()
+            self._bits = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+_stores: Dict[str, SeenStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_seen_store(platform_name: str) -> SeenStore:
+    """
+    获取平台共享的已采集库，同一进程内的爬虫共用一个文件映射
+
+    Args:
+        platform_name: 平台名称
+
+    Returns:
+        SeenStore对象
+    """
+    with _stores_lock:
+        if platform_name not in _stores:
+            _stores[platform_name] = SeenStore(SEEN_STORE_CONFIG['dir'] / f"{platform_name}.bloom")
+        return _stores[platform_name]
@@ -0,0 +1,177 @@
+"""
+页面状态提取 - 直接在响应字节中定位 window.__INITIAL_STATE__，只解码需要的子树
+"""
+
+import re
+import json
+from typing import List, Any, Optional, Sequence, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时使用标准库 json
+    orjson = None
+
+
+STATE_MARKER = b'window.__INITIAL_STATE__'
+
+# JSON字符串（含转义）或括号，用于跳过字符串内容做括号匹配
+_TOKEN_RE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|([{\[])|[}\]]', re.DOTALL)
+# 键（字符串后接冒号）或字符串、括号，用于只匹配当前对象的直接成员
+_MEMBER_RE = re.compile(rb'("[^"\\]*(?:\\.[^"\\]*)*")[ \t\r\n]*(:)?|([{\[])|[}\]]', re.DOTALL)
+# 字符串或裸 undefined，字符串原样保留
+_UNDEFINED_RE = re.compile(rb'("[^"\\]*(?:\\.[^"\\]*)*")|(?<![\w$"])undefined(?![\w$])', re.DOTALL)
+_WHITESPACE = b' \t\r\n'
+
+
+def loads(data: bytes) -> Any:
+    """解码JSON字节，优先使用 orjson"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _skip_whitespace(content: bytes, pos: int) -> int:
+    """跳过空白字符"""
+    while pos < len(content) and content[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+def find_value_end(content: bytes, start: int) -> int:
+    """
+    查找从 start 开始的JSON对象/数组的结束位置
+
+    Args:
+        content: 字节内容
+        start: '{' 或 '[' 的位置
+
+    Returns:
+        结束括号之后的位置，括号不匹配时返回 -1
+    """
+    depth = 0
+    for match in _TOKEN_RE.finditer(content, start):
+        if match.lastindex:  # 开括号
+            depth += 1
+        elif content[match.start()] != 0x22:  # 闭括号，字符串直接跳过
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    return -1
+
+
+def find_state_start(content: bytes, marker: bytes = STATE_MARKER) -> int:
+    """
+    在页面字节中定位初始状态对象的起始位置
+
+    只定位 '{'，不匹配整个对象的结束括号：状态对象中常有很长的字符串，
+    完整扫描一遍的代价比解码目标子树还高。
+
+    Args:
+        content: 页面字节
+        marker: 状态变量名
+
+    Returns:
+        '{' 的位置，未找到时返回 -1
+    """
+    pos = content.find(marker)
+    while pos != -1:
+        start = _skip_whitespace(content, pos + len(marker))
+        if start < len(content) and content[start] == 0x3D:  # '='
+            start = _skip_whitespace(content, start + 1)
+            if start < len(content) and content[start] == 0x7B:  # '{'
+                return start
+        pos = content.find(marker, pos + len(marker))
+    return -1
+
+
+def find_key_value(content: bytes, key: str, start: int = 0, end: int = -1) -> Optional[Tuple[int, int]]:
+    """
+    查找对象的直接成员 key 对应的对象/数组值
+
+    从对象的 '{' 开始逐个扫描字符串和括号并记录嵌套深度，只接受深度为1（当前对象的直接成员）的键，
+    嵌套对象中的同名键和字符串内容中的 "key": 都不会误匹配。
+
+    Args:
+        content: 字节内容
+        key: 键名
+        start: 对象 '{' 的位置
+        end: 对象的结束位置，-1 表示未知（扫描到对象的闭括号为止）
+
+    Returns:
+        值的 (起始, 结束) 位置，未找到或值不是对象/数组时返回None
+    """
+    end = len(content) if end == -1 else end
+    if start >= end or content[start] != 0x7B:  # '{'
+        return None
+    needle = json.dumps(key, ensure_ascii=False).encode('utf-8')
+    depth = 0
+    for match in _MEMBER_RE.finditer(content, start, end):
+        if match.group(3):  # 开括号
+            depth += 1
+        elif match.group(1) is None:  # 闭括号
+            depth -= 1
+            if depth == 0:
+                return None
+        elif depth == 1 and match.group(2) and match.group(1) == needle:
+            value_start = _skip_whitespace(content, match.end())
+            if value_start < end and content[value_start] in b'{[':
+                value_end = find_value_end(content, value_start)
+                if value_end != -1 and value_end <= end:
+                    return value_start, value_end
+            return None
+    return None
+
+
+def replace_undefined(data: bytes) -> bytes:
+    """把字符串以外的 undefined 字面量替换为 null"""
+    if b'undefined' not in data:
+        return data
+    return _UNDEFINED_RE.sub(lambda m: m.group(1) or b'null', data)
+
+
+class StateExtractor:
+    """
+    初始状态提取器
+
+    页面内嵌的 window.__INITIAL_STATE__ 往往有数百KB，而解析只需要其中的笔记列表。
+    提取器不构建DOM，直接在响应字节中定位状态对象，再按键路径投影到目标子树，
+    只对该子树做 undefined 替换和JSON解码。
+    """
+
+    def __init__(self, path: Sequence[str], marker: bytes = STATE_MARKER):
+        """
+        初始化提取器
+
+        Args:
+            path: 目标子树的键路径，如 ('search', 'feeds')
+            marker: 状态变量名
+        """
+        self.path = tuple(path)
+        self.marker = marker
+
+    def extract(self, content: bytes) -> Optional[Any]:
+        """
+        提取目标子树
+
+        Args:
+            content: 页面字节(UTF-8)
+
+        Returns:
+            解码后的子树，未找到时返回None
+        """
+        start = find_state_start(content, self.marker)
+        if start == -1:
+            return None
+
+        span = (start, -1)
+        for key in self.path:
+            span = find_key_value(content, key, *span)
+            if span is None:
+                return None
+
+        return loads(replace_undefined(content[span[0]:span[1]]))
+
+    def extract_list(self, content: bytes) -> List[Any]:
+        """提取目标子树，不是列表时返回空列表"""
+        value = self.extract(content)
+        return value if isinstance(value, list) else []
@@ -2,12 +2,9 @@
 淘宝爬虫 - 专门爬取淘宝平台的AI硬件产品数据
 """
 
-import re
 import json
-import time
 from typing import Dict, List, Any, Optional
-from urllib.parse import quote, urljoin
-from bs4 import BeautifulSoup
+from urllib.parse import quote, urljoin, urlsplit, parse_qs
 from datetime import datetime
 import sys
 import os
@@ -15,7 +12,8 @@ import os
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from crawler.base_crawler import BaseCrawler
-from config import SEARCH_KEYWORDS, PRODUCT_CATEGORIES
+from crawler.html_parser import SelectorChain
+from crawler.numeric_parser import parse_count, parse_price
 
 class TaobaoCrawler(BaseCrawler):
     """
@@ -26,6 +24,12 @@ class TaobaoCrawler(BaseCrawler):
     def __init__(self):
         super().__init__('taobao')
         self.base_url = "https://s.taobao.com/search"
+        self.item_selectors = SelectorChain('taobao', [
+            'div[data-category="auctions"]',
+            '.item',
+            '.ctx-box',
+            '[data-auction]'
+        ])
         self.setup_taobao_headers()
         
     def setup_taobao_headers(self):
@@ -62,106 +66,62 @@ class TaobaoCrawler(BaseCrawler):
         提取并清理价格信息
         
         Args:
-            price_text: 价格文本
+            price_text: 价格文本，如 ¥1,299.00、¥199-299（区间取下限）
             
         Returns:
             清理后的价格数值
         """
         if not price_text:
             return None
-            
-        # 使用正则表达式提取数字
-        price_match = re.search(r'[\d,]+\.?\d*', price_text.replace(',', ''))
-        if price_match:
-            try:
-                return float(price_match.group())
-            except ValueError:
-                return None
-        return None
+        return parse_price(price_text)
     
     def extract_sales(self, sales_text: str) -> Optional[int]:
         """
         提取销量信息
         
         Args:
-            sales_text: 销量文本
+            sales_text: 销量文本，如 1000+人付款、1.2万+人付款
             
         Returns:
             销量数值
         """
         if not sales_text:
             return None
-            
-        # 处理销量格式：1000+人付款，5万+人付款等
-        sales_text = sales_text.replace('人付款', '').replace('+', '').replace('万', '0000')
-        
-        # 提取数字
-        sales_match = re.search(r'\d+', sales_text)
-        if sales_match:
-            try:
-                return int(sales_match.group())
-            except ValueError:
-                return None
-        return None
-    
-    def classify_product(self, title: str, content: str = "") -> str:
-        """
-        根据标题和内容对产品进行分类
-        
-        Args:
-            title: 商品标题
-            content: 商品描述
-            
-        Returns:
-            产品分类
-        """
-        text = (title + " " + content).lower()
-        
-        for category, keywords in PRODUCT_CATEGORIES.items():
-            for keyword in keywords:
-                if keyword.lower() in text:
-                    return category
-                    
-        return "其他AI产品"
+        return parse_count(sales_text)
     
     def parse_item(self, item_element) -> Dict[str, Any]:
         """
         解析单个商品信息
         
         Args:
-            item_element: BeautifulSoup商品元素
+            item_element: 解析后端的商品节点
             
         Returns:
             标准化的商品数据
         """
         try:
-            # 提取标题
-            title_elem = item_element.find('a', class_='title')
-            title = title_elem.get_text(strip=True) if title_elem else ""
+            parser = self.html_parser
             
-            # 提取价格
-            price_elem = item_element.find('span', class_='price')
-            price_text = price_elem.get_text(strip=True) if price_elem else ""
-            price = self.extract_price(price_text)
-            
-            # 提取销量
-            sales_elem = item_element.find('span', class_='deal-cnt')
-            sales_text = sales_elem.get_text(strip=True) if sales_elem else ""
-            sales = self.extract_sales(sales_text)
+            def field_text(selector: str) -> str:
+                node = parser.select_one(item_element, selector)
+                return parser.text(node) if node is not None else ""
             
-            # 提取商品链接
-            link_elem = item_element.find('a', class_='title')
-            product_url = link_elem.get('href') if link_elem else ""
+            # 提取标题和商品链接
+            title_elem = parser.select_one(item_element, 'a.title')
+            title = parser.text(title_elem) if title_elem is not None else ""
+            product_url = (parser.attr(title_elem, 'href') or "") if title_elem is not None else ""
             if product_url and not product_url.startswith('http'):
                 product_url = 'https:' + product_url
             
-            # 提取店铺信息
-            shop_elem = item_element.find('a', class_='shopname')
-            shop_name = shop_elem.get_text(strip=True) if shop_elem else ""
+            # 提取价格
+            price = self.extract_price(field_text('span.price'))
+            
+            # 提取销量
+            sales = self.extract_sales(field_text('span.deal-cnt'))
             
-            # 提取位置信息
-            location_elem = item_element.find('span', class_='location')
-            location = location_elem.get_text(strip=True) if location_elem else ""
+            # 提取店铺和位置信息
+            shop_name = field_text('a.shopname')
+            location = field_text('span.location')
             
             # 构建原始数据
             raw_data = {
@@ -177,7 +137,7 @@ class TaobaoCrawler(BaseCrawler):
                 'comments_count': 0,  # 评论数需要进入详情页获取，此处设为0
                 'shares': 0,  # 淘宝没有分享概念，设为0
                 'publish_date': datetime.now().strftime('%Y-%m-%d'),  # 爬取日期
-                'tags': [self.classify_product(title)],
+                'tags': self.product_classifier.labels(title),
             }
             
             return self.standardize_data(raw_data)
@@ -186,119 +146,60 @@ class TaobaoCrawler(BaseCrawler):
             self.logger.error(f"解析商品信息失败: {e}")
             return {}
     
-    def search(self, keyword: str, max_pages: int = 3) -> List[Dict[str, Any]]:
+    def get_item_key(self, record: Dict[str, Any]) -> str:
         """
-        搜索淘宝商品
+        商品去重键：商品链接中的 id 参数，同一商品的淘宝/天猫链接得到同一个键
         
         Args:
-            keyword: 搜索关键词
-            max_pages: 最大搜索页数
+            record: 商品数据
             
         Returns:
-            商品信息列表
+            去重键
         """
-        all_products = []
-        self.logger.info(f"开始搜索淘宝关键词: {keyword}")
+        item_id = parse_qs(urlsplit(record.get('source_url') or '').query).get('id')
+        if item_id and item_id[0]:
+            return f"item:{item_id[0]}"
+        return super().get_item_key(record)
+    
+    def get_raw_item_id(self, item_element) -> Optional[str]:
+        """
+        从商品节点取出去重键：优先 data-nid 属性，其次商品链接中的 id 参数
         
-        for page in range(1, max_pages + 1):
-            self.logger.info(f"正在爬取第 {page} 页...")
-            
-            # 构建搜索URL
-            search_url = self.build_search_url(keyword, page)
-            
-            # 发送请求
-            response = self.safe_request(search_url)
-            if not response:
-                self.logger.warning(f"第 {page} 页请求失败，跳过")
-                continue
-            
-            # 解析页面
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 查找商品列表
-            # 淘宝的商品容器可能有多种class名
-            item_selectors = [
-                'div[data-category="auctions"]',
-                '.item',
-                '.ctx-box',
-                '[data-auction]'
-            ]
-            
-            items = []
-            for selector in item_selectors:
-                items = soup.select(selector)
-                if items:
-                    break
-            
-            if not items:
-                self.logger.warning(f"第 {page} 页未找到商品，可能需要调整选择器")
-                # 保存HTML用于调试
-                with open(f'debug_taobao_page_{page}.html', 'w', encoding='utf-8') as f:
-                    f.write(response.text[:5000])  # 保存前5000字符
-                continue
-            
-            self.logger.info(f"第 {page} 页找到 {len(items)} 个商品")
-            
-            # 解析每个商品
-            page_products = []
-            for item in items:
-                try:
-                    product_data = self.parse_item(item)
-                    if product_data and self.validate_data(product_data):
-                        page_products.append(product_data)
-                except Exception as e:
-                    self.logger.error(f"解析商品失败: {e}")
-                    continue
-            
-            all_products.extend(page_products)
-            self.logger.info(f"第 {page} 页成功解析 {len(page_products)} 个商品")
+        Args:
+            item_element: 解析后端的商品节点
             
-            # 添加页面间延时
-            if page < max_pages:
-                time.sleep(2)
-        
-        self.logger.info(f"搜索完成，总共获取 {len(all_products)} 个商品")
-        return all_products
+        Returns:
+            与 get_item_key 相同格式的去重键，取不到时返回None
+        """
+        parser = self.html_parser
+        item_id = parser.attr(item_element, 'data-nid')
+        if not item_id:
+            title_elem = parser.select_one(item_element, 'a.title')
+            href = (parser.attr(title_elem, 'href') or "") if title_elem is not None else ""
+            item_id = (parse_qs(urlsplit(href).query).get('id') or [None])[0]
+        return f"item:{item_id}" if item_id else None
     
-    def crawl_all_keywords(self, max_pages_per_keyword: int = 2) -> List[Dict[str, Any]]:
+    def extract_page_items(self, response, page: int = 1) -> List[Any]:
         """
-        爬取所有配置的关键词
+        从搜索结果页中提取商品元素
         
         Args:
-            max_pages_per_keyword: 每个关键词的最大页数
+            response: 搜索页响应
+            page: 页码
             
         Returns:
-            所有商品数据列表
+            解析后端的商品节点列表
         """
-        all_data = []
+        document = self.html_parser.parse(response.text)
         
-        # 获取所有关键词
-        all_keywords = (
-            SEARCH_KEYWORDS['primary'] + 
-            SEARCH_KEYWORDS['secondary'] + 
-            SEARCH_KEYWORDS['brands']
-        )
+        # 查找商品列表，淘宝的商品容器可能有多种class名，上次命中的选择器优先
+        items, _ = self.item_selectors.select(self.html_parser, document)
         
-        self.logger.info(f"开始爬取 {len(all_keywords)} 个关键词")
-        
-        for i, keyword in enumerate(all_keywords, 1):
-            self.logger.info(f"[{i}/{len(all_keywords)}] 爬取关键词: {keyword}")
-            
-            try:
-                keyword_data = self.search(keyword, max_pages_per_keyword)
-                all_data.extend(keyword_data)
-                self.logger.info(f"关键词 '{keyword}' 获取 {len(keyword_data)} 条数据")
-                
-                # 关键词间休息
-                if i < len(all_keywords):
-                    time.sleep(3)
-                    
-            except Exception as e:
-                self.logger.error(f"爬取关键词 '{keyword}' 失败: {e}")
-                continue
+        if not items:
+            self.logger.warning(f"第 {page} 页未找到商品，可能需要调整选择器")
+            self.save_debug_page(response, page)
         
-        self.logger.info(f"所有关键词爬取完成，共获取 {len(all_data)} 条数据")
-        return all_data
+        return items
 
 def main():
     """主函数 - 运行淘宝爬虫"""
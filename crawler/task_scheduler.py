@@ -0,0 +1,137 @@
+"""
+任务调度器 - 以(平台, 关键词, 页码)为粒度的全局爬取任务队列
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, Callable, Iterable, NamedTuple, Optional
+
+
+class CrawlTask(NamedTuple):
+    """单个爬取任务：某平台某关键词的某一页"""
+    platform: str
+    keyword: str
+    page: int
+
+
+class TaskScheduler:
+    """
+    全局任务调度器
+
+    所有平台的任务放在同一个队列中，由固定大小的工作线程池消费。
+    每个平台有独立的并发上限，某个平台占满时工作线程会跳过它去执行其他平台的任务，
+    因此慢平台或慢关键词不会拖住整个批次。处于暂停状态（如熔断）的平台任务会留在队列中，
+    直到恢复后再派发。
+    """
+
+    # 存在暂停平台时重新检查的间隔(秒)
+    pause_poll_interval = 0.5
+
+    def __init__(self, max_workers: int = 4, platform_limits: Optional[Dict[str, int]] = None,
+                 logger: Optional[logging.Logger] = None,
+                 pause_check: Optional[Callable[[str], bool]] = None):
+        """
+        初始化调度器
+
+        Args:
+            max_workers: 工作线程数
+            platform_limits: 各平台最大并发任务数，未配置的平台不限制
+            logger: 日志对象
+            pause_check: 判断平台是否暂停派发的函数
+        """
+        self.max_workers = max(1, max_workers)
+        self.platform_limits = platform_limits or {}
+        self.logger = logger or logging.getLogger('TaskScheduler')
+        self.pause_check = pause_check
+
+        self._pending = deque()
+        self._active = {}
+        self._running = 0
+        self._results = {}
+        self._condition = threading.Condition()
+
+    def _can_start(self, platform: str) -> bool:
+        """判断平台是否还有空闲并发额度"""
+        limit = self.platform_limits.get(platform)
+        return limit is None or self._active.get(platform, 0) < limit
+
+    def _next_task(self) -> Optional[CrawlTask]:
+        """
+        取出下一个可执行任务，没有可执行任务时阻塞等待
+
+        Returns:
+            任务对象，队列已全部完成时返回None
+        """
+        with self._condition:
+            while True:
+                paused = {}
+                for task in self._pending:
+                    if not self._can_start(task.platform):
+                        continue
+                    if self.pause_check:
+                        if task.platform not in paused:
+                            paused[task.platform] = self.pause_check(task.platform)
+                        if paused[task.platform]:
+                            continue
+                    self._pending.remove(task)
+                    self._active[task.platform] = self._active.get(task.platform, 0) + 1
+                    self._running += 1
+                    return task
+
+                if not self._pending and self._running == 0:
+                    return None
+                # 有平台处于暂停状态时定期醒来检查是否已恢复
+                self._condition.wait(self.pause_poll_interval if any(paused.values()) else None)
+
+    def _finish_task(self, task: CrawlTask, result: Any):
+        """记录任务结果并唤醒等待中的工作线程"""
+        with self._condition:
+            self._results[task] = result
+            self._active[task.platform] -= 1
+            self._running -= 1
+            self._condition.notify_all()
+
+    def _worker(self, handler: Callable[[CrawlTask], Any]):
+        """工作线程主循环"""
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+
+            result = None
+            try:
+                result = handler(task)
+            except Exception as e:
+                self.logger.error(f"任务执行失败 {task}: {e}")
+            finally:
+                self._finish_task(task, result)
+
+    def run(self, tasks: Iterable[CrawlTask], handler: Callable[[CrawlTask], Any]) -> Dict[CrawlTask, Any]:
+        """
+        执行全部任务直到队列清空
+
+        Args:
+            tasks: 任务列表
+            handler: 任务处理函数，接收CrawlTask并返回结果
+
+        Returns:
+            任务到结果的映射，执行失败的任务结果为None
+        """
+        with self._condition:
+            self._pending.extend(tasks)
+            self._results = {}
+            total = len(self._pending)
+
+        self.logger.info(f"调度器启动: {total} 个任务, {self.max_workers} 个工作线程")
+
+        workers = [
+            threading.Thread(target=self._worker, args=(handler,), name=f"crawl-worker-{i}", daemon=True)
+            for i in range(min(self.max_workers, total))
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        return self._results
@@ -0,0 +1,274 @@
+"""
+文本规范化 - 预编译正则和字符转换表实现的文本清理，支持按列批量处理
+"""
+
+import re
+import time
+import threading
+from typing import Dict, List, Any, Iterable, Optional
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import TEXT_CONFIG
+
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_HTML_TAG_BATCH_RE = re.compile(r'<[^>\x00]+>')  # 批量处理时标签不跨越记录分隔符
+_TOPIC_RE = re.compile(r'#([^#\s]+)#')
+
+# 批量处理时的记录分隔符
+_SEPARATOR = '\x00'
+
+
+def _char_class(ranges) -> str:
+    return ''.join(f'\\U{start:08X}-\\U{end:08X}' for start, end in ranges)
+
+
+# clean_text 保留的字符：中文、数字、英文、全角字符、中文标点（另外保留空白）
+_ALLOWED_RANGES = (
+    (0x4E00, 0x9FFF),
+    (0x0030, 0x0039),
+    (0x0041, 0x005A),
+    (0x0061, 0x007A),
+    (0xFF01, 0xFF5E),
+    (0x3000, 0x303F),
+)
+_DISALLOWED_RE = re.compile(f'[^{_char_class(_ALLOWED_RANGES)}\\s]+')
+_DISALLOWED_BATCH_RE = re.compile(f'[^{_char_class(_ALLOWED_RANGES)}\\s\\x00]+')
+
+# 全角字母和数字 -> 半角
+_FULLWIDTH_ALNUM_RE = re.compile('[\uFF10-\uFF19\uFF21-\uFF3A\uFF41-\uFF5A]')
+_FOLD_TABLE = {
+    code: code - 0xFEE0
+    for start, end in ((0xFF10, 0xFF19), (0xFF21, 0xFF3A), (0xFF41, 0xFF5A))
+    for code in range(start, end + 1)
+}
+
+# emoji：表情符号和区域旗帜、杂项符号、装饰符号；组合用字符：零宽连接符、变体选择符、键帽
+_EMOJI_RANGES = (
+    (0x1F000, 0x1FAFF),
+    (0x2600, 0x27BF),
+    (0x2B00, 0x2BFF),
+    (0x2300, 0x23FF),
+)
+_EMOJI_MODIFIERS = '\uFE0E\uFE0F\u20E3\U0001F3FB-\U0001F3FF'
+_EMOJI_CHARS_RE = re.compile(f'[{_char_class(_EMOJI_RANGES)}{_EMOJI_MODIFIERS}\u200D]+')
+_EMOJI_RE = re.compile(
+    '[\U0001F1E6-\U0001F1FF]{2}|'  # 旗帜由两个区域指示符组成
+    f'[{_char_class(_EMOJI_RANGES)}][{_EMOJI_MODIFIERS}]*'
+    f'(?:\u200D[{_char_class(_EMOJI_RANGES)}][{_EMOJI_MODIFIERS}]*)*'
+)
+
+
+class TextNormalizer:
+    """
+    文本规范化器
+
+    清理文本用到的正则全部预编译：空白用 str.split 合并，字符过滤用一个字符类正则一次删除，
+    全角/半角转换只在文本中确实有全角字母数字时才做一次 str.translate。
+    批量接口先逐条合并空白，再把整列用分隔符拼接后一次完成过滤和转换。
+    """
+
+    def __init__(self, fold_width: Optional[bool] = None):
+        """
+        初始化规范化器
+
+        Args:
+            fold_width: 是否把全角字母和数字转为半角，默认使用 TEXT_CONFIG['fold_width']
+        """
+        self.fold_width = TEXT_CONFIG['fold_width'] if fold_width is None else fold_width
+
+    # ---------- 单条文本 ----------
+
+    @staticmethod
+    def collapse_whitespace(text: str) -> str:
+        """合并连续空白为一个空格并去除首尾空白，等价于 re.sub(r'\\s+', ' ', text).strip()"""
+        return ' '.join(text.split())
+
+    @staticmethod
+    def strip_html(text: str) -> str:
+        """去除HTML标签"""
+        return _HTML_TAG_RE.sub('', text) if '<' in text else text
+
+    @staticmethod
+    def fold(text: str) -> str:
+        """全角字母和数字转为半角"""
+        return text.translate(_FOLD_TABLE) if _FULLWIDTH_ALNUM_RE.search(text) else text
+
+    @staticmethod
+    def strip_emoji(text: str) -> str:
+        """去除emoji及其组合字符"""
+        return _EMOJI_CHARS_RE.sub('', text)
+
+    @staticmethod
+    def extract_emoji(text: str) -> List[str]:
+        """
+        提取emoji，组合emoji（肤色、零宽连接序列）作为一个整体
+
+        Args:
+            text: 文本
+
+        Returns:
+            emoji列表，按出现顺序
+        """
+        return _EMOJI_RE.findall(text)
+
+    @staticmethod
+    def extract_topics(text: str) -> List[str]:
+        """提取 #话题# 格式的标签"""
+        return _TOPIC_RE.findall(text)
+
+    def normalize(self, text: str) -> str:
+        """
+        规范化网页文本：去除HTML标签并合并空白
+
+        Args:
+            text: 原始文本
+
+        Returns:
+            规范化后的文本
+        """
+        return ' '.join(self.strip_html(text).split())
+
+    def clean(self, text: Any) -> str:
+        """
+        清理文本：合并空白后只保留中文、英文、数字和基本标点
+
+        Args:
+            text: 原始文本
+
+        Returns:
+            清理后的文本
+        """
+        if not isinstance(text, str):
+            return str(text) if text is not None else ""
+        text = _DISALLOWED_RE.sub('', ' '.join(text.split()))
+        return self.fold(text) if self.fold_width else text
+
+    # ---------- 批量 ----------
+
+    def clean_batch(self, texts: Iterable[Any]) -> Any:
+        """
+        批量清理一整列文本，结果与逐条调用 clean 相同
+
+        Args:
+            texts: 文本列表或 pandas.Series
+
+        Returns:
+            清理后的列表；texts 为 pandas.Series 时返回同索引的 Series
+        """
+        values = [' '.join(self._as_text(text).split()) for text in texts]
+        joined = _SEPARATOR.join(values)
+        if not values or joined.count(_SEPARATOR) != len(values) - 1:
+            # 文本本身含有分隔符时逐条处理
+            return self._wrap(texts, [self.clean(value) for value in values])
+
+        joined = _DISALLOWED_BATCH_RE.sub('', joined)
+        if self.fold_width:
+            joined = self.fold(joined)
+        return self._wrap(texts, joined.split(_SEPARATOR))
+
+    def normalize_batch(self, texts: Iterable[Any]) -> Any:
+        """
+        批量规范化网页文本，结果与逐条调用 normalize 相同
+
+        Args:
+            texts: 文本列表或 pandas.Series
+
+        Returns:
+            规范化后的列表；texts 为 pandas.Series 时返回同索引的 Series
+        """
+        values = [self._as_text(text) for text in texts]
+        joined = _SEPARATOR.join(values)
+        if not values or joined.count(_SEPARATOR) != len(values) - 1:
+            return self._wrap(texts, [self.normalize(value) for value in values])
+
+        if '<' in joined:
+            joined = _HTML_TAG_BATCH_RE.sub('', joined)
+        return self._wrap(texts, [' '.join(part.split()) for part in joined.split(_SEPARATOR)])
+
+    @staticmethod
+    def _as_text(text: Any) -> str:
+        if isinstance(text, str):
+            return text
+        return str(text) if text is not None else ""
+
+    @staticmethod
+    def _wrap(texts: Iterable[Any], results: List[str]) -> Any:
+        if hasattr(texts, 'index') and hasattr(texts, 'to_numpy'):
+            import pandas as pd
+            return pd.Series(results, index=texts.index, name=getattr(texts, 'name', None))
+        return results
+
+
+def benchmark_throughput(texts: List[str], repeat: int = 3) -> Dict[str, float]:
+    """
+    测量清理吞吐量
+
+    Args:
+        texts: 测试文本
+        repeat: 重复次数，取最快一次
+
+    Returns:
+        {方法: 字符/秒}
+    """
+    normalizer = TextNormalizer(fold_width=False)
+    total_chars = sum(len(text) for text in texts)
+
+    def regex_clean():
+        # 原 DataValidator.clean_text 的实现，作为对照
+        for text in texts:
+            text = re.sub(r'\s+', ' ', text).strip()
+            re.sub(r'[^\u4e00-\u9fff\u0030-\u0039\u0041-\u005a\u0061-\u007a\uff01-\uff5e\u3000-\u303f\s]', '', text)
+
+    methods = {
+        'regex': regex_clean,
+        'clean': lambda: [normalizer.clean(text) for text in texts],
+        'clean_batch': lambda: normalizer.clean_batch(texts),
+    }
+    results = {}
+    for name, method in methods.items():
+        method()  # 预热
+        best = min(_timed(method) for _ in range(repeat))
+        results[name] = total_chars / best if best > 0 else float('inf')
+    return results
+
+
+def _timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+_normalizer = None
+_normalizer_lock = threading.Lock()
+
+
+def get_text_normalizer() -> TextNormalizer:
+    """
+    获取全局共享的文本规范化器
+
+    Returns:
+        TextNormalizer对象
+    """
+    global _normalizer
+    with _normalizer_lock:
+        if _normalizer is None:
+            _normalizer = TextNormalizer()
+    return _normalizer
+
+
+def main():
+    """测试文本清理吞吐量"""
+    sample = [
+        "小米AI智能音箱Pro 2代\t蓝牙家用 😀语音控制  正品！",
+        "天猫精灵 方糖R 智能音箱 <b>AI语音助手</b> ＡＩ 👍🏻 蓝牙音响\n\n包邮",
+        "这只AI狗太可爱了吧～每天下班回家都会迎接我 ❤️ #陪伴机器人# #智能宠物#",
+    ] * 2000
+    for name, chars_per_sec in benchmark_throughput(sample).items():
+        print(f"{name}: {chars_per_sec / 1e6:.1f} M字符/秒")
+
+
+if __name__ == "__main__":
+    main()
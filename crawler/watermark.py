@@ -0,0 +1,127 @@
+"""
+增量水位 - 记录每个(平台, 关键词)上次采集到的条目，增量爬取时遇到旧内容即停止翻页
+"""
+
+import os
+import json
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Optional
+import sys
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import INCREMENTAL_CONFIG
+
+
+class WatermarkStore:
+    """
+    增量水位
+
+    每个关键词保存最近采集到的条目去重键（新的在前，最多 max_ids 个）。
+    搜索结果按相关度而非时间排序，淘宝的发布日期也只是爬取日期，
+    因此水位用"上次见过的ID集合"而不是最新发布时间：
+    一页中已见过的条目比例达到 stale_ratio 时，认为后面的页也是旧内容，停止该关键词的翻页。
+
+    判断只使用打开时加载的水位，本次采集的ID在 save() 时才合并写入。
+    """
+
+    def __init__(self, path: Path, stale_ratio: Optional[float] = None, max_ids: Optional[int] = None):
+        """
+        打开水位文件
+
+        Args:
+            path: 水位文件路径(JSON)
+            stale_ratio: 判定为旧页面的已见条目比例，默认使用 INCREMENTAL_CONFIG['stale_ratio']
+            max_ids: 每个关键词保存的ID数上限，默认使用 INCREMENTAL_CONFIG['max_ids']
+        """
+        self.path = Path(path)
+        self.stale_ratio = stale_ratio if stale_ratio is not None else INCREMENTAL_CONFIG['stale_ratio']
+        self.max_ids = max_ids or INCREMENTAL_CONFIG['max_ids']
+
+        self._watermarks: Dict[str, Dict[str, Any]] = {}
+        self._known: Dict[str, set] = {}
+        self._collected: Dict[str, Dict[int, List[str]]] = {}
+        self._stopped: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._watermarks = json.load(f).get('keywords', {})
+        except (json.JSONDecodeError, OSError):
+            self._watermarks = {}
+        self._known = {keyword: set(mark.get('ids', [])) for keyword, mark in self._watermarks.items()}
+
+    def has(self, keyword: str) -> bool:
+        """关键词是否有上次的水位（没有水位的关键词照常爬取全部页）"""
+        return bool(self._known.get(keyword))
+
+    def observe(self, keyword: str, page: int, keys: Iterable[str], skipped: int = 0) -> bool:
+        """
+        记录一页采集到的条目，并判断该页是否基本都是旧内容
+
+        Args:
+            keyword: 搜索关键词
+            page: 页码
+            keys: 该页数据的去重键
+            skipped: 解析前因已采集而跳过的条目数（计为已见）
+
+        Returns:
+            是否应停止该关键词的翻页
+        """
+        keys = list(keys)
+        known = self._known.get(keyword)
+        with self._lock:
+            self._collected.setdefault(keyword, {})[page] = keys
+            if not known:
+                return False
+            total = len(keys) + skipped
+            seen = skipped + sum(key in known for key in keys)
+            if total and seen / total >= self.stale_ratio:
+                self._stopped[keyword] = min(page, self._stopped.get(keyword, page))
+            return keyword in self._stopped
+
+    def is_stopped(self, keyword: str) -> bool:
+        """关键词是否已遇到旧内容"""
+        return keyword in self._stopped
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            有水位的关键词数、提前停止的关键词及停止页码
+        """
+        with self._lock:
+            stopped = dict(self._stopped)
+        return {
+            '水位关键词数': len(self._watermarks),
+            '提前停止': stopped,
+        }
+
+    def save(self):
+        """把本次采集的ID合并进水位（按页码顺序在前），写入文件"""
+        with self._lock:
+            collected, self._collected = self._collected, {}
+        if not collected:
+            return
+
+        updated = datetime.now().isoformat(timespec='seconds')
+        for keyword, pages in collected.items():
+            ids = [key for page in sorted(pages) for key in pages[page]]
+            ids.extend(self._watermarks.get(keyword, {}).get('ids', []))
+            self._watermarks[keyword] = {
+                'ids': list(dict.fromkeys(ids))[:self.max_ids],
+                'updated': updated,
+            }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'keywords': self._watermarks}, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
@@ -3,11 +3,8 @@
 """
 
 import re
-import json
-import time
 from typing import Dict, List, Any, Optional
 from urllib.parse import quote, urljoin
-from bs4 import BeautifulSoup
 from datetime import datetime
 import sys
 import os
@@ -15,7 +12,13 @@ import os
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from crawler.base_crawler import BaseCrawler
-from config import SEARCH_KEYWORDS, PRODUCT_CATEGORIES
+from crawler.state_extractor import StateExtractor, loads as json_loads
+from crawler.numeric_parser import parse_count
+from config import SEARCH_KEYWORDS
+
+# 笔记链接中的笔记ID
+NOTE_ID_RE = re.compile(r'/(?:explore|discovery/item)/([0-9a-zA-Z]+)')
+
 
 class XiaoHongShuCrawler(BaseCrawler):
     """
@@ -27,6 +30,7 @@ class XiaoHongShuCrawler(BaseCrawler):
         super().__init__('xiaohongshu')
         self.base_url = "https://www.xiaohongshu.com"
         self.search_url = "https://www.xiaohongshu.com/search_result"
+        self.state_extractor = StateExtractor(('search', 'feeds'))
         self.setup_xiaohongshu_headers()
         
     def setup_xiaohongshu_headers(self):
@@ -78,26 +82,22 @@ class XiaoHongShuCrawler(BaseCrawler):
             'shares': 0
         }
         
-        try:
-            # 提取点赞数
-            if 'liked_count' in note_data:
-                engagement['likes'] = int(note_data['liked_count'])
-            elif 'interact_info' in note_data:
-                interact_info = note_data['interact_info']
-                engagement['likes'] = int(interact_info.get('liked_count', 0))
-            
-            # 提取评论数
-            if 'comment_count' in note_data:
-                engagement['comments_count'] = int(note_data['comment_count'])
-            elif 'interact_info' in note_data:
-                interact_info = note_data['interact_info']
-                engagement['comments_count'] = int(interact_info.get('comment_count', 0))
-            
-            # 提取分享数（小红书通常不显示分享数，设为0）
-            engagement['shares'] = 0
-            
-        except (ValueError, KeyError) as e:
-            self.logger.warning(f"提取互动数据失败: {e}")
+        # 提取点赞数和评论数，如 "1.2万"、"10万+"
+        interact_info = note_data.get('interact_info')
+        if not isinstance(interact_info, dict):
+            interact_info = {}
+        if 'liked_count' in note_data:
+            engagement['likes'] = parse_count(note_data['liked_count']) or 0
+        elif interact_info:
+            engagement['likes'] = parse_count(interact_info.get('liked_count', 0)) or 0
+        
+        if 'comment_count' in note_data:
+            engagement['comments_count'] = parse_count(note_data['comment_count']) or 0
+        elif interact_info:
+            engagement['comments_count'] = parse_count(interact_info.get('comment_count', 0)) or 0
+        
+        # 提取分享数（小红书通常不显示分享数，设为0）
+        engagement['shares'] = 0
         
         return engagement
     
@@ -159,10 +159,9 @@ class XiaoHongShuCrawler(BaseCrawler):
                             content = note_data[field]['text']
                             break
             
-            # 清理HTML标签和特殊字符
+            # 去除HTML标签并规范化空格
             if content:
-                content = re.sub(r'<[^>]+>', '', content)  # 去除HTML标签
-                content = re.sub(r'\s+', ' ', content).strip()  # 规范化空格
+                content = self.text_normalizer.normalize(content)
                 
         except Exception as e:
             self.logger.warning(f"提取内容文本失败: {e}")
@@ -196,8 +195,7 @@ class XiaoHongShuCrawler(BaseCrawler):
             content = self.extract_content_text(note_data)
             if content:
                 # 提取#话题#格式的标签
-                topic_matches = re.findall(r'#([^#\s]+)#', content)
-                tags.extend(topic_matches)
+                tags.extend(self.text_normalizer.extract_topics(content))
                 
         except Exception as e:
             self.logger.warning(f"提取标签失败: {e}")
@@ -275,141 +273,122 @@ class XiaoHongShuCrawler(BaseCrawler):
             self.logger.error(f"解析笔记数据失败: {e}")
             return {}
     
-    def search(self, keyword: str, max_pages: int = 3) -> List[Dict[str, Any]]:
+    def get_item_key(self, record: Dict[str, Any]) -> str:
         """
-        搜索小红书笔记
+        笔记去重键：笔记链接中的笔记ID
         
         Args:
-            keyword: 搜索关键词
-            max_pages: 最大搜索页数
+            record: 笔记数据
             
         Returns:
-            笔记信息列表
+            去重键
+        """
+        match = NOTE_ID_RE.search(record.get('source_url') or '')
+        if match:
+            return f"note:{match.group(1)}"
+        return super().get_item_key(record)
+    
+    def get_raw_item_id(self, note_data: Dict) -> Optional[str]:
         """
-        all_notes = []
-        self.logger.info(f"开始搜索小红书关键词: {keyword}")
+        从笔记原始数据取出去重键
         
-        for page in range(1, max_pages + 1):
-            self.logger.info(f"正在爬取第 {page} 页...")
+        Args:
+            note_data: 笔记原始数据字典
             
-            # 构建搜索URL
-            search_url = self.build_search_url(keyword, page)
+        Returns:
+            与 get_item_key 相同格式的去重键，没有笔记ID时返回None
+        """
+        note_id = note_data.get('id', note_data.get('note_id', ''))
+        return f"note:{note_id}" if note_id else None
+    
+    def extract_page_items(self, response, page: int = 1) -> List[Any]:
+        """
+        从搜索结果中提取笔记数据
+        
+        Args:
+            response: 搜索页响应
+            page: 页码
             
-            # 发送请求
-            response = self.safe_request(search_url)
-            if not response:
-                self.logger.warning(f"第 {page} 页请求失败，跳过")
-                continue
+        Returns:
+            笔记原始数据字典列表
+        """
+        notes_data = []
+        
+        # 小红书返回的可能是JSON数据
+        if response.headers.get('content-type', '').startswith('application/json'):
+            data = json_loads(response.content)
             
-            try:
-                # 小红书返回的可能是JSON数据
-                if response.headers.get('content-type', '').startswith('application/json'):
-                    data = response.json()
-                    
-                    # 根据小红书API结构提取笔记列表
-                    notes_data = []
-                    if 'data' in data:
-                        if 'notes' in data['data']:
-                            notes_data = data['data']['notes']
-                        elif isinstance(data['data'], list):
-                            notes_data = data['data']
-                    
-                else:
-                    # 如果是HTML页面，尝试解析
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # 查找包含笔记数据的script标签
-                    script_tags = soup.find_all('script')
-                    notes_data = []
-                    
-                    for script in script_tags:
-                        if script.string and 'window.__INITIAL_STATE__' in script.string:
-                            # 提取初始状态数据
-                            try:
-                                script_content = script.string
-                                start_idx = script_content.find('{')
-                                end_idx = script_content.rfind('}') + 1
-                                json_str = script_content[start_idx:end_idx]
-                                
-                                initial_data = json.loads(json_str)
-                                # 根据实际结构提取笔记数据
-                                # 这部分需要根据小红书的实际页面结构调整
-                                
-                            except json.JSONDecodeError:
-                                continue
-                
-                if not notes_data:
-                    self.logger.warning(f"第 {page} 页未找到笔记数据")
-                    # 保存HTML用于调试
-                    with open(f'debug_xiaohongshu_page_{page}.html', 'w', encoding='utf-8') as f:
-                        f.write(response.text[:5000])
-                    continue
-                
-                self.logger.info(f"第 {page} 页找到 {len(notes_data)} 条笔记")
-                
-                # 解析每条笔记
-                page_notes = []
-                for note_data in notes_data:
-                    try:
-                        parsed_note = self.parse_item(note_data)
-                        if parsed_note and self.validate_data(parsed_note):
-                            page_notes.append(parsed_note)
-                    except Exception as e:
-                        self.logger.error(f"解析笔记失败: {e}")
-                        continue
-                
-                all_notes.extend(page_notes)
-                self.logger.info(f"第 {page} 页成功解析 {len(page_notes)} 条笔记")
-                
-            except Exception as e:
-                self.logger.error(f"处理第 {page} 页数据失败: {e}")
-                continue
+            # 根据小红书API结构提取笔记列表
+            if 'data' in data:
+                if 'notes' in data['data']:
+                    notes_data = data['data']['notes']
+                elif isinstance(data['data'], list):
+                    notes_data = data['data']
+            
+        else:
+            # HTML页面：直接从响应字节中提取初始状态里的笔记列表
+            content = response.content
+            if (response.encoding or 'utf-8').lower().replace('_', '-') not in ('utf-8', 'utf8'):
+                content = response.text.encode('utf-8')
             
-            # 添加页面间延时
-            if page < max_pages:
-                time.sleep(3)
+            try:
+                feeds = self.state_extractor.extract_list(content)
+            except ValueError as e:
+                self.logger.warning(f"解析初始状态失败: {e}")
+                feeds = []
+            notes_data = [note for note in map(self.flatten_feed, feeds) if note]
         
-        self.logger.info(f"搜索完成，总共获取 {len(all_notes)} 条笔记")
-        return all_notes
+        if not notes_data:
+            self.logger.warning(f"第 {page} 页未找到笔记数据")
+            self.save_debug_page(response, page)
+        
+        return notes_data
     
-    def crawl_all_keywords(self, max_pages_per_keyword: int = 2) -> List[Dict[str, Any]]:
+    def flatten_feed(self, feed: Dict) -> Dict[str, Any]:
         """
-        爬取所有配置的关键词
+        把初始状态中的笔记条目展开为 parse_item 使用的结构
+        
+        条目形如 {"id": ..., "noteCard": {...}}，键名为驼峰式；
+        展开后笔记字段位于顶层，键名统一为下划线式。
         
         Args:
-            max_pages_per_keyword: 每个关键词的最大页数
+            feed: 初始状态中的条目
             
         Returns:
-            所有笔记数据列表
+            笔记数据字典，非笔记条目返回空字典
         """
-        all_data = []
+        if not isinstance(feed, dict):
+            return {}
         
-        # 获取适合小红书的关键词（偏向用户体验和评测）
-        xiaohongshu_keywords = (
-            SEARCH_KEYWORDS['primary'][:5] +  # 前5个主要关键词
-            ['AI音箱评测', 'AI陪伴机器人', '智能助手使用感受', '二次元AI']  # 小红书特色关键词
-        )
+        card = feed.get('noteCard', feed.get('note_card'))
+        if not isinstance(card, dict):
+            return {}
         
-        self.logger.info(f"开始爬取 {len(xiaohongshu_keywords)} 个关键词")
+        note = {}
+        for key, value in card.items():
+            if isinstance(value, dict) and key in ('interactInfo', 'user'):
+                value = {self.to_snake_case(k): v for k, v in value.items()}
+            note[self.to_snake_case(key)] = value
         
-        for i, keyword in enumerate(xiaohongshu_keywords, 1):
-            self.logger.info(f"[{i}/{len(xiaohongshu_keywords)}] 爬取关键词: {keyword}")
-            
-            try:
-                keyword_data = self.search(keyword, max_pages_per_keyword)
-                all_data.extend(keyword_data)
-                self.logger.info(f"关键词 '{keyword}' 获取 {len(keyword_data)} 条数据")
-                
-                # 关键词间休息
-                if i < len(xiaohongshu_keywords):
-                    time.sleep(5)  # 小红书需要更长的间隔
-                    
-            except Exception as e:
-                self.logger.error(f"爬取关键词 '{keyword}' 失败: {e}")
-                continue
+        note.setdefault('id', feed.get('id', ''))
+        return note
+    
+    @staticmethod
+    def to_snake_case(key: str) -> str:
+        """驼峰式键名转为下划线式"""
+        return re.sub(r'(?<=[a-z0-9])([A-Z])', r'_\1', key).lower()
+    
+    def get_search_keywords(self) -> List[str]:
+        """
+        获取适合小红书的关键词（偏向用户体验和评测）
         
-        self.logger.info(f"所有关键词爬取完成，共获取 {len(all_data)} 条数据")
-        return all_data
+        Returns:
+            关键词列表
+        """
+        return (
+            SEARCH_KEYWORDS['primary'][:5] +  # 前5个主要关键词
+            ['AI音箱评测', 'AI陪伴机器人', '智能助手使用感受', '二次元AI']  # 小红书特色关键词
+        )
 
 def main():
     """主函数 - 运行小红书爬虫"""
@@ -97,6 +97,821 @@ def test_taobao_crawler():
         print(f"❌ 淘宝爬虫测试失败: {e}")
         return False
 
+def test_rate_limiter():
+    """测试平台限速器"""
+    print("\n=== 测试平台限速器 ===")
+    try:
+        from crawler.rate_limiter import TokenBucket, get_rate_limiter
+        
+        bucket = TokenBucket(requests_per_second=10, burst=2, jitter=0)
+        waits = [bucket.reserve() for _ in range(4)]
+        print(f"✅ 令牌预约等待时间: {[round(w, 2) for w in waits]}")
+        assert waits[0] == 0 and waits[1] == 0 and waits[3] > waits[2] > 0
+        
+        assert get_rate_limiter('taobao') is get_rate_limiter('taobao')
+        print("✅ 同一平台共享限速器")
+        
+        return True
+    except Exception as e:
+        print(f"❌ 限速器测试失败: {e}")
+        return False
+
+def test_task_scheduler():
+    """测试任务调度器"""
+    print("\n=== 测试任务调度器 ===")
+    try:
+        import threading
+        from crawler.task_scheduler import CrawlTask, TaskScheduler
+        
+        tasks = [CrawlTask(platform, f"关键词{i}", 1) for platform in ['taobao', 'xiaohongshu'] for i in range(5)]
+        active = {'taobao': 0, 'xiaohongshu': 0}
+        peak = {'taobao': 0, 'xiaohongshu': 0}
+        lock = threading.Lock()
+        
+        def handle(task):
+            with lock:
+                active[task.platform] += 1
+                peak[task.platform] = max(peak[task.platform], active[task.platform])
+            with lock:
+                active[task.platform] -= 1
+            return [task.keyword]
+        
+        scheduler = TaskScheduler(max_workers=4, platform_limits={'taobao': 2, 'xiaohongshu': 1})
+        results = scheduler.run(tasks, handle)
+        assert len(results) == len(tasks)
+        assert peak['taobao'] <= 2 and peak['xiaohongshu'] <= 1
+        print(f"✅ 完成 {len(results)} 个任务，平台峰值并发: {peak}")
+        
+        return True
+    except Exception as e:
+        print(f"❌ 任务调度器测试失败: {e}")
+        return False
+
+def test_retry_policy():
+    """测试重试策略和熔断器"""
+    print("\n=== 测试重试策略 ===")
+    try:
+        from crawler.retry_policy import RetryPolicy, CircuitBreaker
+        from crawler.http_utils import build_response
+        
+        policy = RetryPolicy(backoff_base=1.0, backoff_max=8.0, max_retry_after=60)
+        assert policy.is_retryable_status(503) and policy.is_retryable_status(429)
+        assert not policy.is_retryable_status(404)
+        assert all(0 <= policy.backoff(5) <= 8.0 for _ in range(20))
+        
+        throttled = build_response('https://example.com', 429, {'Retry-After': '7'}, b'')
+        assert policy.get_wait(0, throttled) == 7
+        too_long = build_response('https://example.com', 429, {'Retry-After': '600'}, b'')
+        assert policy.get_wait(0, too_long) is None
+        print("✅ 状态码分类、指数退避和 Retry-After 解析正常")
+        
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+        breaker.record_failure()
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert not breaker.allow_request() and breaker.is_paused()
+        print("✅ 熔断器连续失败后暂停请求")
+        
+        import asyncio
+        from crawler.deadline import Deadline
+        from crawler.retry_policy import get_circuit_breaker
+        from crawler.taobao_crawler import TaobaoCrawler
+        
+        crawler = TaobaoCrawler()
+        crawler.throttle = lambda: None
+        url = 'http://breaker-test.invalid/search'
+        breaker = get_circuit_breaker('breaker-test.invalid')
+        breaker.trip(0)
+        assert crawler.safe_request(url, deadline=Deadline(0)) is None
+        assert not breaker.is_paused() and breaker.allow_request()
+        breaker.release_trial()
+        assert breaker.state == breaker.HALF_OPEN and not breaker.is_paused()
+        
+        async def cancelled(url, **kwargs):
+            raise asyncio.CancelledError()
+        crawler._async_get = cancelled
+        try:
+            asyncio.run(crawler.async_safe_request(url))
+            raise AssertionError("取消应当向上抛出")
+        except asyncio.CancelledError:
+            pass
+        assert not breaker.is_paused() and breaker.allow_request()
+        breaker.release_trial()
+        print("✅ 截止时间已到或请求被取消时，半开状态的试探名额被归还")
+        
+        return True
+    except Exception as e:
+        print(f"❌ 重试策略测试失败: {e}")
+        return False
+
+def test_html_parser():
+    """测试HTML解析后端"""
+    print("\n=== 测试HTML解析后端 ===")
+    try:
+        from crawler.html_parser import BACKENDS, get_parser_backend, SelectorChain
+        
+        html = (
+            '<html><body><div class="item" data-nid="1">'
+            '<a class="title" href="//item.taobao.com/1"> AI <b>眼镜</b> </a>'
+            '<span class="price">¥ 1,299.00</span></div></body></html>'
+        )
+        for name in BACKENDS:
+            try:
+                parser = get_parser_backend(name)
+            except ImportError:
+                print(f"⚠️ {name} 未安装，跳过")
+                continue
+            document = parser.parse(html)
+            items, selector = SelectorChain(f'test_{name}', ['.ctx-box', '.item']).select(parser, document)
+            assert selector == '.item' and len(items) == 1
+            title = parser.select_one(items[0], 'a.title')
+            assert parser.text(title) == 'AI眼镜'
+            assert parser.attr(title, 'href') == '//item.taobao.com/1'
+            assert parser.select_one(items[0], 'span.location') is None
+            print(f"✅ {name} 解析结果与 BeautifulSoup 一致")
+        
+        return True
+    except Exception as e:
+        print(f"❌ HTML解析后端测试失败: {e}")
+        return False
+
+def test_state_extractor():
+    """测试初始状态提取"""
+    print("\n=== 测试初始状态提取 ===")
+    try:
+        from crawler.state_extractor import StateExtractor
+        
+        html = (
+            '<script>var s = "}";</script><script>window.__INITIAL_STATE__ = '
+            '{"global":{"feeds":[0],"x":undefined},"search":{"feeds":['
+            '{"id":"n1","noteCard":{"displayTitle":"AI音箱 \\"}[","cover":undefined}}]}}</script>'
+        ).encode('utf-8')
+        feeds = StateExtractor(('search', 'feeds')).extract_list(html)
+        assert feeds == [{"id": "n1", "noteCard": {"displayTitle": 'AI音箱 "}[', "cover": None}}]
+        print("✅ 按键路径提取笔记列表，undefined 转为 null")
+        
+        extractor = StateExtractor(('search', 'feeds'))
+        nested_first = (
+            b'<script>window.__INITIAL_STATE__={"user":{"search":{"history":[1]}},'
+            b'"search":{"feeds":[{"id":"n2"}]}}</script>'
+        )
+        assert extractor.extract(nested_first) == [{"id": "n2"}]
+        deeper_first = (
+            b'<script>window.__INITIAL_STATE__={"search":{"query":{"feeds":[9]},'
+            b'"tip":"\\"feeds\\":[7]","feeds":[{"id":"n3"}]}}</script>'
+        )
+        assert extractor.extract(deeper_first) == [{"id": "n3"}]
+        print("✅ 只匹配当前对象的直接成员，嵌套对象和字符串中的同名键被跳过")
+        
+        return True
+    except Exception as e:
+        print(f"❌ 初始状态提取测试失败: {e}")
+        return False
+
+def test_parse_pool():
+    """测试解析进程池"""
+    print("\n=== 测试解析进程池 ===")
+    try:
+        from crawler.taobao_crawler import TaobaoCrawler
+        from crawler.parse_pool import ParsePool
+        from crawler.http_utils import build_response
+        
+        html = '<html><body>' + ''.join(
+            f'<div class="item"><a class="title" href="//item.taobao.com/{i}">AI音箱 {i}</a>'
+            f'<span class="price">{100 + i}</span></div>'
+            for i in range(5)
+        ) + '</body></html>'
+        response = build_response('https://s.taobao.com/search', 200,
+                                  {'Content-Type': 'text/html; charset=utf-8'}, html.encode('utf-8'))
+        
+        crawler = TaobaoCrawler()
+        expected = [item['title'] for item in crawler.parse_search_page(response, 'AI音箱', 1)]
+        with ParsePool(max_workers=1) as pool:
+            futures = [pool.submit(crawler, response, 'AI音箱', page) for page in (1, 2)]
+            results = [[item['title'] for item in future.result(timeout=60)] for future in futures]
+        assert results == [expected, expected] and len(expected) == 5
+        print(f"✅ 工作进程解析结果与当前进程一致: {len(expected)} 条/页")
+        
+        return True
+    except Exception as e:
+        print(f"❌ 解析进程池测试失败: {e}")
+        return False
+
+def test_crawl_record():
+    """测试紧凑记录类型"""
+    print("\n=== 测试紧凑记录 ===")
+    try:
+        import pickle
+        from crawler.crawl_record import RecordBuilder
+        from crawler.data_validator import DataValidator
+        
+        builder = RecordBuilder('淘宝')
+        records = [builder.build({'title': f'AI智能音箱 测试商品{i}', 'content': '测试商品描述内容', 'price': '¥299'})
+                   for i in range(3)]
+        record = records[0]
+        assert record['platform'] == '淘宝' and record['sales'] is None and 'sales' in record
+        
+        record['shop_name'] = '测试店铺'
+        assert dict(record)['shop_name'] == '测试店铺' and list(record)[:2] == ['platform', 'crawl_time']
+        assert pickle.loads(pickle.dumps(record)) == record
+        print("✅ 记录支持字典接口和序列化")
+        
+        validator = DataValidator()
+        cleaned = validator.clean_dataset(records)
+        assert len(cleaned) == 3 and cleaned[0]['price'] == 299.0
+        print("✅ 数据验证器直接处理记录")
+        
+        return True
+    except Exception as e:
+        print(f"❌ 紧凑记录测试失败: {e}")
+        return False
+
+def test_columnar_store():
+    """测试列式存储"""
+    print("\n=== 测试列式存储 ===")
+    try:
+        import tempfile
+        try:
+            import pyarrow
+        except ImportError:
+            print("⚠️ pyarrow 未安装，跳过")
+            return True
+        from crawler.columnar_store import ColumnarStore
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = ColumnarStore(tmp_dir)
+            written = store.write([
+                {'platform': '小红书', 'crawl_time': '2024-12-10 10:00:00', 'title': 'AI陪伴机器人体验', 'likes': 356, 'tags': ['AI陪伴']},
+                {'platform': '淘宝', 'crawl_time': '2024-12-11 09:30:00', 'title': 'AI智能音箱', 'price': 299.0, 'sales': 1234},
+            ])
+            assert written == 2
+            
+            df = store.read(columns=['title', 'likes'], filters=[('platform', '==', '小红书')])
+            assert list(df.columns) == ['title', 'likes'] and df['likes'].tolist() == [356]
+            df = store.read(columns=['title'], filters=[('crawl_date', '>=', '2024-12-11')])
+            assert df['title'].tolist() == ['AI智能音箱']
+        print("✅ 分区写入、列投影和条件过滤正常")
+        
+        return True
+    except Exception as e:
+        print(f"❌ 列式存储测试失败: {e}")
+        return False
+
+def test_product_classifier():
+    """测试产品分类器"""
+    print("\n=== 测试产品分类器 ===")
+    try:
+        from crawler.product_classifier import ProductClassifier, DEFAULT_CATEGORY
+        
+        classifier = ProductClassifier({
+            'AI音箱': ['智能音箱', '小爱同学'],
+            '陪伴机器人': ['AI狗', '宠物机器人'],
+        })
+        assert classifier.classify("小米AI智能音箱") == 'AI音箱'
+        assert classifier.classify("普通蓝牙耳机") == DEFAULT_CATEGORY
+        
+        # 多标签计数，命中次数多的类别优先，与类别顺序无关
+        scores = classifier.score("小爱同学智能音箱", "ai狗 宠物机器人 AI狗")
+        print(f"✅ 多标签评分: {scores}")
+        assert scores == {'陪伴机器人': 3, 'AI音箱': 2}
+        assert classifier.classify("小爱同学智能音箱", "ai狗 宠物机器人 AI狗") == '陪伴机器人'
+        assert classifier.labels("无关文本") == [DEFAULT_CATEGORY]
+        
+        batch = classifier.classify_batch(["智能音箱", None, "AI狗"])
+        print(f"✅ 批量分类: {batch}")
+        assert batch == ['AI音箱', DEFAULT_CATEGORY, '陪伴机器人']
+        
+        return True
+    except Exception as e:
+        print(f"❌ 产品分类器测试失败: {e}")
+        return False
+
+def test_batch_validator():
+    """测试批量验证"""
+    print("\n=== 测试批量验证 ===")
+    try:
+        import pandas as pd
+        from crawler.data_validator import DataValidator
+        
+        validator = DataValidator()
+        test_data = [
+            {'platform': '淘宝', 'title': 'AI智能音箱测试商品', 'content': '这是一个测试商品描述', 'price': 299.99},
+            {'platform': '淘宝', 'title': '', 'content': '短', 'price': -10, 'sales': '1000'},
+            {'platform': '小红书', 'title': 'english title', 'content': '测试内容描述', 'likes': 10 ** 8},
+        ]
+        
+        result = validator.validate_batch(test_data)
+        for i, item in enumerate(test_data):
+            assert result.errors(i) == validator.validate_item(item)[1]
+        print(f"✅ 错误位图还原结果与逐条验证一致: {result.masks.tolist()}")
+        
+        report = validator.validate_dataset(test_data)
+        assert report['有效数'] == 1 and report['错误统计']['缺失必需字段'] == 1
+        assert list(report) == ['总数', '有效数', '无效数', '有效率', '错误统计', '字段完整性']
+        
+        frame_result = validator.validate_batch(pd.DataFrame(test_data))
+        assert frame_result.valid.tolist() == [True, False, False]
+        print("✅ DataFrame 按列验证正常")
+        
+        base = test_data[0]
+        items = [
+            {**base, 'title': '小度智能音箱推荐', 'content': '卧室床头使用', 'product_type': '未知'},
+            {**base, 'title': '测试商品标题', 'content': '桌面陪伴机器人', 'product_type': '错误类别'},
+            {**base, 'title': '普通测试商品', 'product_type': 'AI音箱', 'tags': ['  好物 ', '']},
+        ]
+        cleaned = validator.clean_dataset(items)
+        assert [item['product_type'] for item in cleaned] == [
+            validator.clean_item(item)['product_type'] for item in items]
+        assert cleaned[2]['product_type'] == 'AI音箱' and cleaned[2]['tags'] == ['好物']
+        print("✅ 清理阶段批量重新分类与逐条清理一致")
+        
+        return True
+    except Exception as e:
+        print(f"❌ 批量验证测试失败: {e}")
+        return False
+
+def test_text_normalizer():
+    """测试文本规范化"""
+    print("\n=== 测试文本规范化 ===")
+    try:
+        from crawler.text_normalizer import TextNormalizer
+        
+        normalizer = TextNormalizer(fold_width=True)
+        assert normalizer.clean("  小米ＡＩ音箱１号\t\n推荐😀！ ") == "小米AI音箱1号 推荐！"
+        assert normalizer.clean(None) == "" and normalizer.clean(12) == "12"
+        assert normalizer.normalize("<p>好物  推荐</p>\n") == "好物 推荐"
+        assert normalizer.strip_emoji("好看👍🏻了") == "好看了"
+        assert normalizer.extract_emoji("好看👍🏻了❤️") == ['👍🏻', '❤️']
+        print("✅ 空白合并、字符过滤、全角转换和emoji处理正常")
+        
+        texts = ["AI 音箱\n测试", None, "", "<b>标签</b> 文本😀", "ｘ\x00ｙ"]
+        assert normalizer.clean_batch(texts) == [normalizer.clean(text) for text in texts]
+        assert normalizer.normalize_batch(texts[:4]) == [normalizer.normalize(text or "") for text in texts[:4]]
+        print("✅ 批量处理结果与逐条处理一致")
+        
+        return True
+    except Exception as e:
+        print(f"❌ 文本规范化测试失败: {e}")
+        return False
+
+def test_numeric_parser():
+    """测试数值解析"""
+    print("\n=== 测试数值解析 ===")
+    try:
+        from crawler.numeric_parser import parse_count, parse_price, parse_counts, parse_prices
+        
+        assert parse_count("1.2万") == 12000 and parse_count("3.5k") == 3500
+        assert parse_count("10万+") == 100000 and parse_count("1000+人付款") == 1000
+        assert parse_price("¥199-299") == 199.0 and parse_price("¥199-299", range_mode='high') == 299.0
+        assert parse_price("￥1,299.00") == 1299.0 and parse_count("暂无") is None
+        print("✅ 单位、小数、区间和 + 号解析正常")
+        
+        values = ["1.2万", None, "3kg", 15, "暂无", "1-2万"]
+        counts, missing = parse_counts(values)
+        assert counts.tolist() == [12000, 0, 3, 15, 0, 10000]
+        assert missing.tolist() == [False, True, False, False, True, False]
+        prices, price_missing = parse_prices(["¥99", "面议"])
+        assert prices[0] == 99.0 and price_missing.tolist() == [False, True]
+        print(f"✅ 按列解析: {counts.tolist()}")
+        
+        assert parse_count(float('inf')) is None and parse_count(float('-inf')) is None
+        counts, missing = parse_counts([float('inf'), "3"])
+        assert counts.tolist() == [0, 3] and missing.tolist() == [True, False]
+        print("✅ inf 等非有限数值按无法解析处理")
+        
+        return True
+    except Exception as e:
+        print(f"❌ 数值解析测试失败: {e}")
+        return False
+
+def test_dedup_index():
+    """测试去重索引"""
+    print("\n=== 测试去重索引 ===")
+    try:
+        import tempfile
+        from pathlib import Path
+        from crawler.dedup_index import DedupIndex, normalize_url
+        from crawler.taobao_crawler import TaobaoCrawler
+        
+        assert normalize_url("//www.Example.com/item/?b=2&a=1&spm=x#top") == "example.com/item?a=1&b=2"
+        
+        crawler = TaobaoCrawler()
+        tmall = {'source_url': 'https://detail.tmall.com/item.htm?id=123&spm=a1'}
+        taobao = {'source_url': 'https://item.taobao.com/item.htm?id=123'}
+        assert crawler.get_item_key(tmall) == crawler.get_item_key(taobao) == "item:123"
+        no_url = {'platform': '淘宝', 'title': '小米 智能音箱', 'source_url': ''}
+        assert crawler.get_item_key(no_url) == crawler.get_item_key({**no_url, 'title': '小米  智能音箱'})
+        print("✅ 商品ID、规范化URL和内容哈希去重键正常")
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "taobao.idx"
+            index = DedupIndex(path)
+            first = index.filter([tmall, no_url], "智能音箱", crawler.get_item_key)
+            second = index.filter([taobao, {'source_url': 'https://item.taobao.com/item.htm?id=456'}],
+                                  "小米音箱", crawler.get_item_key)
+            assert len(first) == 2 and len(second) == 1
+            stats = index.get_stats()
+            assert stats['重复数'] == 1 and stats['关键词']['小米音箱']['重复率'] == "50.0%"
+            index.save()
+            
+            reloaded = DedupIndex(path)
+            assert len(reloaded) == 3 and not reloaded.filter([taobao], "智能音箱", crawler.get_item_key)
+            print(f"✅ 跨关键词、跨次爬取去重正常: {stats['关键词']}")
+        
+        return True
+    except Exception as e:
+        print(f"❌ 去重索引测试失败: {e}")
+        return False
+
+def test_seen_store():
+    """测试已采集库"""
+    print("\n=== 测试已采集库 ===")
+    try:
+        import tempfile
+        from pathlib import Path
+        from crawler.seen_store import SeenStore
+        from crawler.xiaohongshu_crawler import XiaoHongShuCrawler
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "xiaohongshu.bloom"
+            store = SeenStore(path, capacity=10000, false_positive_rate=0.01)
+            keys = [f"note:{i}" for i in range(5000)]
+            store.add(keys)
+            # 本次爬取新加入的ID保存前不参与查询，同一次爬取内的重复交给去重索引
+            assert "note:1" not in store and not path.exists()
+            store.save()
+            store.close()
+            
+            reloaded = SeenStore(path)
+            assert all(key in reloaded for key in keys)
+            false_positives = sum(f"note:x{i}" in reloaded for i in range(5000))
+            assert false_positives < 5000 * 0.02
+            reloaded.close()
+            print(f"✅ 保存后重新映射无漏判，误判 {false_positives}/5000")
+        
+        crawler = XiaoHongShuCrawler()
+        note = {'id': 'abc123', 'display_title': 'AI陪伴机器人体验', 'desc': '很可爱'}
+        assert crawler.get_raw_item_id(note) == crawler.get_item_key(crawler.parse_item(note)) == "note:abc123"
+        print("✅ 解析前的原始ID与解析后的去重键一致")
+        
+        return True
+    except Exception as e:
+        print(f"❌ 已采集库测试失败: {e}")
+        return False
+
+def test_watermark():
+    """测试增量水位"""
+    print("\n=== 测试增量水位 ===")
+    try:
+        import pickle
+        import tempfile
+        from pathlib import Path
+        from crawler.watermark import WatermarkStore
+        from crawler.base_crawler import PageData
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "taobao.json"
+            first = WatermarkStore(path, stale_ratio=0.8)
+            assert not first.has("智能音箱")
+            assert not first.observe("智能音箱", 1, [f"item:{i}" for i in range(10)])
+            first.observe("智能音箱", 2, [f"item:{i}" for i in range(10, 20)])
+            first.save()
+            
+            second = WatermarkStore(path, stale_ratio=0.8)
+            assert second.has("智能音箱")
+            # 8条旧内容 + 解析前跳过的1条，达到80%
+            assert not second.observe("智能音箱", 1, ["item:new1", "item:new2", "item:new3"] + [f"item:{i}" for i in range(7)])
+            assert second.observe("智能音箱", 2, ["item:new4", "item:new5"] + [f"item:{i}" for i in range(10, 17)], skipped=1)
+            assert second.is_stopped("智能音箱") and second.get_stats()['提前停止'] == {"智能音箱": 2}
+            second.save()
+            assert WatermarkStore(path, max_ids=5)._watermarks["智能音箱"]['ids'][:3] == ["item:new1", "item:new2", "item:new3"]
+            print("✅ 水位保存、加载和旧页面判断正常")
+        
+        page_data = PageData([{'title': 'a'}])
+        page_data.skipped = 3
+        restored = pickle.loads(pickle.dumps(page_data))
+        assert restored == [{'title': 'a'}] and restored.skipped == 3
+        print("✅ 跳过条目数可随解析结果从工作进程传回")
+        
+        return True
+    except Exception as e:
+        print(f"❌ 增量水位测试失败: {e}")
+        return False
+
+def test_metrics():
+    """测试性能指标"""
+    print("\n=== 测试性能指标 ===")
+    try:
+        import json
+        import tempfile
+        from pathlib import Path
+        from crawler.metrics import MetricsRegistry
+        
+        registry = MetricsRegistry()
+        for seconds in (0.08, 0.2, 0.3, 1.5):
+            registry.observe('crawler_request_duration_seconds', seconds, '请求耗时（秒）', platform='taobao')
+        registry.inc('crawler_requests_total', 3, platform='taobao', status=200)
+        registry.inc('crawler_requests_total', 1, platform='taobao', status='error')
+        registry.inc('crawler_sleep_seconds_total', 0.5, platform='taobao', reason='rate_limit')
+        
+        assert registry.total('crawler_requests_total', platform='taobao') == 4
+        assert registry.total('crawler_requests_total', status='error') == 1
+        histogram = registry.histogram('crawler_request_duration_seconds')
+        median = histogram.quantile((('platform', 'taobao'),), 0.5)
+        assert 0.1 <= median <= 0.25
+        print(f"✅ 计数器合计和直方图分位数正常，中位数约 {median:.3f} 秒")
+        
+        text = registry.to_prometheus()
+        assert '# TYPE crawler_request_duration_seconds histogram' in text
+        assert 'crawler_request_duration_seconds_bucket{platform="taobao",le="+Inf"} 4' in text
+        assert 'crawler_requests_total{platform="taobao",status="error"} 1' in text
+        with tempfile.TemporaryDirectory() as tmp:
+            registry.export(Path(tmp) / "metrics.json", Path(tmp) / "metrics.prom")
+            exported = json.loads((Path(tmp) / "metrics.json").read_text(encoding='utf-8'))
+            assert exported['metrics']['crawler_requests_total']['type'] == 'counter'
+            assert (Path(tmp) / "metrics.prom").read_text(encoding='utf-8') == text
+        print("✅ JSON 和 Prometheus 文本导出正常")
+        
+        return True
+    except Exception as e:
+        print(f"❌ 性能指标测试失败: {e}")
+        return False
+
+def test_profiler():
+    """测试分阶段性能剖析"""
+    print("\n=== 测试分阶段性能剖析 ===")
+    try:
+        import json
+        import tempfile
+        from pathlib import Path
+        from crawler.profiler import StageProfiler
+        from crawler.data_validator import DataValidator
+        
+        validator = DataValidator()
+        records = [{
+            'platform': '淘宝', 'title': f'AI智能音箱测试商品{i}',
+            'content': '这是一个测试商品描述，包含智能语音功能', 'price': 199.0 + i, 'sales': 1000,
+        } for i in range(50)]
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler = StageProfiler(Path(tmp), top_n=5, snapshot_samples=1)
+            try:
+                for _ in range(2):
+                    with profiler.stage('clean'):
+                        cleaned = validator.clean_dataset(records)
+                with profiler.stage('validate'):
+                    with profiler.stage('clean'):
+                        validator.validate_dataset(cleaned)
+                paths = profiler.write({'summary': {'total_data_count': len(cleaned)}})
+            finally:
+                profiler.close()
+            
+            summary = profiler.summary()
+            assert list(summary) == ['validate', 'clean']
+            assert summary['clean']['调用次数'] == 2 and summary['validate']['调用次数'] == 1
+            print(f"✅ 阶段摘要正常，嵌套阶段计入外层: {summary['clean']}")
+            
+            assert paths['clean'].exists() and paths['validate'].exists()
+            report_text = paths['report'].read_text(encoding='utf-8')
+            assert 'clean_dataset' in report_text and '分配内存最多的' in report_text
+            assert json.loads(paths['crawl_report'].read_text(encoding='utf-8'))['summary']['total_data_count'] == 50
+            print("✅ 剖析文件、热点函数和内存分配报告已生成")
+        
+        return True
+    except Exception as e:
+        print(f"❌ 分阶段性能剖析测试失败: {e}")
+        return False
+
+def test_benchmarks():
+    """测试基准测试套件"""
+    print("\n=== 测试基准测试套件 ===")
+    try:
+        import tempfile
+        from pathlib import Path
+        from benchmarks.run_benchmarks import run_benchmarks, compare_results, save_results, load_baseline
+        
+        results = run_benchmarks(sizes=[200], repeats=1, min_seconds=0)
+        assert results['taobao.parse_search_page']['items'] == 44
+        assert results['xiaohongshu.parse_search_page[html]']['items'] == 20
+        assert results['clean_dataset[200]']['items'] == 200
+        assert all(result['items_per_sec'] > 0 and result['peak_memory_mb'] >= 0 for result in results.values())
+        print(f"✅ 基准测试运行完成: {len(results)} 项")
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "baseline.json"
+            save_results(path, results)
+            baseline = load_baseline(path)
+        assert compare_results(baseline, results) == []
+        slower = {name: dict(result, items_per_sec=result['items_per_sec'] * 0.5) for name, result in results.items()}
+        heavier = {'clean_dataset[200]': dict(results['clean_dataset[200]'], peak_memory_mb=100.0)}
+        assert len(compare_results(baseline, slower, max_regression=0.25)) == len(results)
+        assert len(compare_results(baseline, heavier, max_regression=0.25, memory_floor_mb=1.0)) == 1
+        print("✅ 吞吐量下降和峰值内存增加超过阈值时判为退化")
+        
+        return True
+    except Exception as e:
+        print(f"❌ 基准测试套件测试失败: {e}")
+        return False
+
+def test_cassette():
+    """测试录制回放"""
+    print("\n=== 测试录制回放 ===")
+    try:
+        import asyncio
+        import tempfile
+        import requests
+        from pathlib import Path
+        from crawler.cassette import CassetteStore, CassetteTransport, CassetteMiss
+        from crawler.http_utils import build_response
+        
+        url = 'https://s.taobao.com/search?q=智能音箱&s=0'
+        with tempfile.TemporaryDirectory() as tmp:
+            store = CassetteStore(Path(tmp) / "cassette.sqlite3")
+            recorder = CassetteTransport(store, 'record')
+            recorder.record('GET', url, build_response(url, 503, {}, b''), 0.05)
+            recorder.record('GET', url, build_response(url, 200, {'Content-Type': 'text/html; charset=utf-8'},
+                                                       '<html>商品</html>'.encode('utf-8')), 0.2)
+            assert store.count() == 2
+            
+            player = CassetteTransport(store, 'replay', latency=0)
+            session = requests.Session()
+            player.mount(session)
+            statuses = [session.get(url).status_code for _ in range(3)]
+            assert statuses == [503, 200, 200], statuses
+            assert session.get(url).text == '<html>商品</html>'
+            print("✅ 同一请求按录制顺序回放（先503后200），之后重复最后一次响应")
+            
+            response = asyncio.run(CassetteTransport(store, 'replay', latency='recorded', latency_scale=0.1)
+                                   .async_replay('GET', 'https://s.taobao.com/search?q=%E6%99%BA%E8%83%BD%E9%9F%B3%E7%AE%B1&s=0'))
+            assert response.status_code == 503 and abs(response.elapsed.total_seconds() - 0.005) < 1e-9
+            print("✅ 异步回放使用规范化后的URL匹配，并按录制耗时模拟延迟")
+            
+            try:
+                session.get('https://s.taobao.com/search?q=other')
+                raise AssertionError("未录制的请求应当失败")
+            except CassetteMiss as e:
+                assert isinstance(e, ValueError)
+            assert player.get_stats()['misses'] == 1
+            print("✅ 未录制的请求直接失败，不访问网络")
+            store.close()
+        
+        return True
+    except Exception as e:
+        print(f"❌ 录制回放测试失败: {e}")
+        return False
+
+def test_response_archive():
+    """测试响应归档和重新解析"""
+    print("\n=== 测试响应归档 ===")
+    try:
+        import tempfile
+        import shutil
+        from pathlib import Path
+        from crawler.response_archive import ResponseArchive
+        from crawler.crawler_manager import CrawlerManager
+        from crawler.http_utils import build_response
+        
+        html = (Path(__file__).parent / "benchmarks" / "fixtures" / "taobao_search.html").read_bytes()
+        headers = {'Content-Type': 'text/html; charset=utf-8'}
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = ResponseArchive(Path(tmp) / "archive", segment_max_mb=0.01)
+            for page in (1, 2, 1):
+                url = f'https://s.taobao.com/search?q=智能音箱&s={(page - 1) * 44}'
+                archive.append('taobao', '智能音箱', page, build_response(url, 200, headers, html))
+            archive.append('xiaohongshu', 'AI陪伴', 1, build_response('https://www.xiaohongshu.com/search', 200, headers, b'{}'))
+            stats = archive.get_stats()
+            assert stats['记录数'] == 4
+            print(f"✅ 写入 {stats['记录数']} 页, 压缩率 {stats['压缩率']} ({stats['压缩算法']})")
+            
+            assert len(archive.query(platform='taobao')) == 3
+            latest = archive.query(platform='taobao', latest=True)
+            assert [entry['page'] for entry in latest] == [1, 2]
+            assert latest[0]['id'] == 3
+            assert archive.query(since='2999-01-01') == []
+            assert archive.read_response(latest[0]).content == html
+            print("✅ 按平台、抓取时间过滤，同一页取最近一次，响应体原样还原")
+            archive.close()
+            
+            # 段文件复制到新目录，只靠扫描重建索引
+            rebuilt_dir = Path(tmp) / "rebuilt"
+            rebuilt_dir.mkdir()
+            segments = list((Path(tmp) / "archive").glob("*.warcz"))
+            assert len(segments) > 1
+            for segment in segments:
+                shutil.copy(segment, rebuilt_dir)
+            rebuilt = ResponseArchive(rebuilt_dir)
+            assert rebuilt.rebuild_index() == 4 and rebuilt.rebuild_index() == 0
+            rebuilt.close()
+            print(f"✅ 从 {len(segments)} 个段文件重建索引")
+            
+            manager = CrawlerManager()
+            platform_data = manager.reparse_archive(Path(tmp) / "archive", platform='taobao', latest=True, max_workers=2)
+            assert len(platform_data['taobao']) > 0
+            # 第2页与第1页内容相同，去重后只剩第1页的记录，抓取时间沿用归档中的时间
+            crawl_time = latest[0]['fetched_at'][:19].replace('T', ' ')
+            assert all(record['crawl_time'] == crawl_time for record in platform_data['taobao'])
+            print(f"✅ 并行重新解析归档: {len(platform_data['taobao'])} 条有效数据")
+            
+            # 工作进程中的爬虫挂载了已采集库时，回填任务仍解析以往已采集的条目
+            from crawler.seen_store import SeenStore
+            from crawler.taobao_crawler import TaobaoCrawler
+            from crawler import parse_pool
+            worker = TaobaoCrawler()
+            worker.seen_store = SeenStore(Path(tmp) / "taobao.bloom", capacity=1000, false_positive_rate=0.01)
+            worker.seen_store.add(map(worker.get_item_key, platform_data['taobao']))
+            worker.seen_store.save()
+            parse_pool._worker_crawlers[TaobaoCrawler] = worker
+            try:
+                args = (TaobaoCrawler, latest[0]['url'], 200, headers, html, None, '智能音箱', 1)
+                assert len(parse_pool.parse_page_worker(*args)) == 0
+                assert len(parse_pool.parse_page_worker(*args, save_debug_pages=False, incremental=False)) == 44
+            finally:
+                del parse_pool._worker_crawlers[TaobaoCrawler]
+                worker.seen_store.close()
+            print("✅ 回填任务不按已采集库跳过条目")
+        
+        return True
+    except Exception as e:
+        print(f"❌ 响应归档测试失败: {e}")
+        return False
+
+def test_crawl_journal():
+    """测试爬取日志"""
+    print("\n=== 测试爬取日志 ===")
+    try:
+        import tempfile
+        from pathlib import Path
+        from crawler.crawl_journal import CrawlJournal
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "crawl_test.jsonl"
+            journal = CrawlJournal(path, fsync=False)
+            journal.record_page('taobao', '智能音箱', 1, [{'title': '商品1'}, {'title': '商品2'}])
+            journal.record_page('taobao', '智能音箱', 2, [{'title': '商品3'}])
+            journal.close()
+            
+            # 模拟崩溃时写了一半的末尾行
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write('{"type": "page", "platform": "taobao", "keyw')
+            
+            resumed = CrawlJournal(path, fsync=False)
+            assert resumed.is_done('taobao', '智能音箱', 2) and not resumed.is_done('taobao', '智能音箱', 3)
+            resumed.record_page('taobao', '智能音箱', 3, [{'title': '商品4'}])
+            resumed.close()
+            
+            reloaded = CrawlJournal(path, fsync=False)
+            assert reloaded.get_page('taobao', '智能音箱', 3) == [{'title': '商品4'}]
+            assert reloaded.get_page('taobao', '智能音箱', 1) == [{'title': '商品1'}, {'title': '商品2'}]
+            assert reloaded.get_stats() == {'已完成页数': 3, '数据条数': 4}
+            reloaded.mark_complete()
+            reloaded.close()
+            assert CrawlJournal.find_resumable(Path(tmp)) is None
+            print("✅ 截掉写了一半的末尾行，恢复后追加的页在下次恢复时仍可读取")
+        
+        return True
+    except Exception as e:
+        print(f"❌ 爬取日志测试失败: {e}")
+        return False
+
+def test_manager_cleanup():
+    """测试爬取中断时的资源清理"""
+    print("\n=== 测试爬取中断时的资源清理 ===")
+    import config
+    saved = {name: dict(getattr(config, name)) for name in ('JOURNAL_CONFIG', 'ARCHIVE_CONFIG', 'SINK_CONFIG', 'PARSE_POOL_CONFIG')}
+    try:
+        import tempfile
+        from pathlib import Path
+        from crawler.crawler_manager import CrawlerManager
+        from crawler.crawl_journal import CrawlJournal
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            config.JOURNAL_CONFIG.update(enabled=True, dir=Path(tmp) / "journal")
+            config.ARCHIVE_CONFIG.update(enabled=True, dir=Path(tmp) / "archive")
+            config.SINK_CONFIG['enabled'] = False
+            config.PARSE_POOL_CONFIG['enabled'] = False
+            
+            manager = CrawlerManager()
+            def interrupted(*args, **kwargs):
+                raise KeyboardInterrupt
+            manager.crawl_platform = interrupted
+            try:
+                manager.crawl_all_platforms(1)
+                raise AssertionError("中断应当向上抛出")
+            except KeyboardInterrupt:
+                pass
+            assert manager.journal is None and manager.archive is None
+            assert all(crawler.journal is None and crawler.archive is None for crawler in manager.crawlers.values())
+            assert CrawlJournal.find_resumable(Path(tmp) / "journal") is not None
+            print("✅ 中断后关闭爬取日志和响应归档，日志未标记完成，可以恢复")
+        
+        return True
+    except Exception as e:
+        print(f"❌ 资源清理测试失败: {e}")
+        return False
+    finally:
+        for name, values in saved.items():
+            getattr(config, name).update(values)
+
 def main():
     """主测试函数"""
     print(f"开始测试时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -107,7 +922,29 @@ def main():
         test_config,
         test_data_validator, 
         test_base_crawler,
-        test_taobao_crawler
+        test_taobao_crawler,
+        test_rate_limiter,
+        test_task_scheduler,
+        test_retry_policy,
+        test_html_parser,
+        test_state_extractor,
+        test_parse_pool,
+        test_crawl_record,
+        test_columnar_store,
+        test_product_classifier,
+        test_batch_validator,
+        test_text_normalizer,
+        test_numeric_parser,
+        test_dedup_index,
+        test_seen_store,
+        test_watermark,
+        test_metrics,
+        test_profiler,
+        test_benchmarks,
+        test_cassette,
+        test_response_archive,
+        test_crawl_journal,
+        test_manager_cleanup
     ]
     
     passed = 0